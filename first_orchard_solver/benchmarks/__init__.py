@@ -0,0 +1 @@
+"""Benchmarks for the solver, simulator and UI hot paths of the Orchard game."""
@@ -0,0 +1,71 @@
+"""
+Run the benchmark suite from the command line.
+
+    python -m first_orchard_solver.benchmarks [--quick] [--only NAME ...]
+        [--output results.json] [--baseline baseline.json] [--threshold 0.25]
+        [--update-baseline]
+
+Exits with status 1 if any result regressed past the threshold or is over its budget
+in BUDGETS, like the cold start taking more than COLD_START_BUDGET seconds.
+"""
+
+import argparse
+import sys
+from typing import List
+
+from first_orchard_solver.benchmarks.suite import (
+    BASELINE_PATH,
+    BENCHMARKS,
+    BUDGETS,
+    DEFAULT_THRESHOLD,
+    compare_to_baseline,
+    load_results,
+    over_budget,
+    run_benchmarks,
+    save_results,
+)
+
+
+def main(argv: List[str] | None = None) -> int:
+    """Run the benchmarks, save them and compare them to the baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--quick", action="store_true", help="fewer games, repeats")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), default=None)
+    parser.add_argument("--output", default=None, help="JSON file for the results")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="overwrite the baseline with this run instead of comparing",
+    )
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.only, args.quick)
+    for result in results:
+        print(f"{result.name:<28} {result.value:>14.4f} {result.unit}")
+    if args.output is not None:
+        save_results(results, args.output)
+    over = over_budget(results)
+    for result in over:
+        print(
+            f"OVER BUDGET {result.name}: {result.value:.4f} > "
+            f"{BUDGETS[result.name]:.4f} {result.unit}"
+        )
+    if args.update_baseline:
+        save_results(results, args.baseline)
+        return 1 if over else 0
+
+    regressions = compare_to_baseline(
+        results, load_results(args.baseline), args.threshold
+    )
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression.name}: {regression.baseline:.4f} -> "
+            f"{regression.current:.4f} ({regression.change:+.0%})"
+        )
+    return 1 if regressions or over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
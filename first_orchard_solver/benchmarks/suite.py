@@ -0,0 +1,469 @@
+"""
+Module to time the hot paths of the Orchard game and compare them to a baseline.
+
+Every benchmark returns one or more BenchmarkResult, each a single number with its
+unit and whether higher is better. Results are saved as JSON together with the
+Python, NumPy and platform versions, and compare_to_baseline flags every result that
+got worse than a stored baseline by more than a relative threshold.
+
+Timings are the best of several repeats, which is the least noisy estimate on a
+shared machine. The UI benchmarks render to the SDL dummy video driver, so they run
+without a display.
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from functools import partial
+from itertools import product
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from first_orchard_solver.gameplay import eventhandler as eh
+from first_orchard_solver.gameplay import rend_dynamic as dyna
+from first_orchard_solver.gameplay.context import GameContext, init_game_context
+from first_orchard_solver.gameplay.gamelogic import BASE_RULES, GameState, RuleSet
+from first_orchard_solver.gameplay.gamesims import _play_with_strat, run_batches
+from first_orchard_solver.gameplay.gamesolver import _decrement_logic, win_perc
+from first_orchard_solver.gameplay.policyeval import (
+    evaluate_policies,
+    evaluate_rule_sets,
+    padded_rules,
+)
+from first_orchard_solver.gameplay.recorder import TrajectoryReader, TrajectoryRecorder
+from first_orchard_solver.gameplay.regret import analyze_regret
+from first_orchard_solver.gameplay.uireplay import play_recording
+from first_orchard_solver.gameplay.vecenv import OrchardVecEnv
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+DEFAULT_THRESHOLD = 0.25
+RUN_BATCHES_SIZES = (1_000, 10_000, 100_000)
+QUICK_RUN_BATCHES_SIZES = (1_000, 10_000)
+COLD_START_BUDGET = 2.5  # seconds from launching Python to the first frame
+# Largest value allowed for results held to an absolute limit, not just the baseline
+BUDGETS = {"cold_start_first_frame": COLD_START_BUDGET}
+
+# Startup of main.py up to its first frame, on the SDL dummy video driver
+_COLD_START_SCRIPT = """
+import pygame
+from first_orchard_solver.gameplay import eventhandler as eh
+from first_orchard_solver.gameplay import rend_static as static
+from first_orchard_solver.gameplay.context import init_game_context
+
+game_context = init_game_context(headless=True)
+static.draw_background(game_context)
+game_context.screen.blit(game_context.background, (0, 0))
+pygame.display.flip()
+eh.draw_all_screen(game_context, None, None)
+"""
+
+# Mid-game state for the UI benchmarks: the player just chose green on a wild roll
+_UI_FRUIT = (4, 3, 2, 4)
+_UI_RAVEN = 3
+_UI_CHOICE = 5
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    """
+    Class to hold a single benchmark measurement.
+
+    Attributes
+    ----------
+        name (str): Unique name of the measurement.
+        value (float): The measured number.
+        unit (str): Unit of value, e.g. "s", "ms" or "games/s".
+        higher_is_better (bool): True for rates, False for times.
+
+    """
+
+    name: str
+    value: float
+    unit: str
+    higher_is_better: bool
+
+
+@dataclass(frozen=True)
+class Regression:
+    """
+    Class to hold a result that got worse than its baseline.
+
+    Attributes
+    ----------
+        name (str): Name of the measurement.
+        baseline (float): Value in the baseline.
+        current (float): Value in the current run.
+        change (float): Relative slowdown, e.g. 0.3 for 30% worse.
+
+    """
+
+    name: str
+    baseline: float
+    current: float
+    change: float
+
+
+def _best_time(func: Callable[[], object], number: int, repeat: int) -> float:
+    """Return the best time in seconds of a single call to func."""
+    return min(timeit.Timer(func).repeat(repeat=repeat, number=number)) / number
+
+
+def _live_states() -> List[Tuple[Tuple[int, ...], int]]:
+    """Return every (fruit counts, raven spaces) of the base game still in play."""
+    fruit_range = range(BASE_RULES.fruit_per_type + 1)
+    return [
+        (fruit, raven)
+        for fruit in product(fruit_range, repeat=BASE_RULES.fruit_types)
+        for raven in range(1, BASE_RULES.raven_spaces + 1)
+        if any(fruit)
+    ]
+
+
+def bench_win_perc(quick: bool = False) -> List[BenchmarkResult]:
+    """Time a cold full-table solve and a warm lookup of every state."""
+    start = BASE_RULES.start
+    fruit_count, raven_track = start[:-1], start[-1]
+
+    def cold_solve() -> None:
+        win_perc.cache_clear()
+        win_perc(fruit_count, raven_track, "most")
+
+    cold = _best_time(cold_solve, number=1, repeat=1 if quick else 3)
+    states = _live_states()
+
+    def warm_sweep() -> None:
+        for fruit, raven in states:
+            win_perc(fruit, raven, "most")
+
+    warm = _best_time(warm_sweep, number=1, repeat=3 if quick else 10)
+    return [
+        BenchmarkResult("win_perc_cold_solve", cold, "s", False),
+        BenchmarkResult("win_perc_warm_sweep", warm * 1e3, "ms", False),
+    ]
+
+
+def bench_rule_sweep(quick: bool = False) -> List[BenchmarkResult]:
+    """Time solving a sweep of rule sets in one pass against the largest one alone."""
+    rule_sets = [
+        RuleSet(4, fruit_per_type, raven_spaces, wild_faces)
+        for fruit_per_type, raven_spaces, wild_faces in product(
+            range(1, 6), range(1, 9), range(1 if quick else 5)
+        )
+    ]
+    repeat = 3 if quick else 5
+    sweep = _best_time(
+        partial(evaluate_rule_sets, rule_sets, ["most", "random"]), 1, repeat
+    )
+    largest = _best_time(
+        partial(evaluate_policies, ["most", "random"], padded_rules(rule_sets)),
+        1,
+        repeat,
+    )
+    return [
+        BenchmarkResult("rule_sweep_solve", sweep * 1e3, "ms", False),
+        BenchmarkResult("rule_sweep_vs_largest", sweep / largest, "x", False),
+    ]
+
+
+def _expand_all(game_states: List[GameState], strat: str) -> None:
+    """Generate the children of every state once."""
+    for game_state in game_states:
+        _decrement_logic(game_state, strat)
+
+
+def bench_decrement_logic(quick: bool = False) -> List[BenchmarkResult]:
+    """Measure how many child states _decrement_logic generates per second."""
+    game_states = []
+    for fruit, raven in _live_states()[: 500 if quick else None]:
+        game_state = GameState()
+        game_state.set_state(fruit, raven)
+        game_states.append(game_state)
+    results = []
+    for strat in ("most", "random"):
+        n_nodes = sum(len(_decrement_logic(g, strat)) for g in game_states)
+        seconds = _best_time(
+            partial(_expand_all, game_states, strat),
+            number=1,
+            repeat=1 if quick else 3,
+        )
+        results.append(
+            BenchmarkResult(
+                f"decrement_logic_{strat}", n_nodes / seconds, "nodes/s", True
+            )
+        )
+    return results
+
+
+def bench_play_with_strat(quick: bool = False) -> List[BenchmarkResult]:
+    """Measure how many scalar games _play_with_strat plays per second."""
+    n_games = 20 if quick else 200
+    seconds = _best_time(
+        lambda: [_play_with_strat(GameState(), "most") for _ in range(n_games)],
+        number=1,
+        repeat=3,
+    )
+    return [BenchmarkResult("play_with_strat", n_games / seconds, "games/s", True)]
+
+
+def bench_run_batches(quick: bool = False) -> List[BenchmarkResult]:
+    """Measure the vectorized simulator throughput at several batch sizes."""
+    results = []
+    for n_games in QUICK_RUN_BATCHES_SIZES if quick else RUN_BATCHES_SIZES:
+        seconds = _best_time(
+            partial(run_batches, GameState(), n_games, 1, ["most"]),
+            number=1,
+            repeat=3,
+        )
+        results.append(
+            BenchmarkResult(
+                f"run_batches_{n_games}", n_games / seconds, "games/s", True
+            )
+        )
+    return results
+
+
+def _step_envs(env: OrchardVecEnv, n_envs: int, steps: int) -> None:
+    """Reset n_envs games and step them with the most strategy."""
+    observation = env.reset(n_envs)
+    for _ in range(steps):
+        observation = env.step(np.argmax(observation.fruit, axis=1)).observation
+
+
+def bench_vec_env(quick: bool = False) -> List[BenchmarkResult]:
+    """Measure how many environment steps OrchardVecEnv takes per second."""
+    n_envs = 100_000
+    steps = 10 if quick else 100
+    env = OrchardVecEnv(seed=0)
+    seconds = _best_time(partial(_step_envs, env, n_envs, steps), number=1, repeat=3)
+    return [BenchmarkResult("vec_env_step", n_envs * steps / seconds, "steps/s", True)]
+
+
+def _mid_game_context() -> GameContext:
+    """Return a headless context right after the player chose a fruit on a wild."""
+    game_context = init_game_context(headless=True)
+    game_state = game_context.game_state
+    game_state.set_state(_UI_FRUIT, _UI_RAVEN)
+    game_state.fruit_inventory.increment_fruit(_UI_CHOICE)
+    eh.die_results_wild(game_context)
+    game_state.fruit_inventory.decrement_fruit(_UI_CHOICE)
+    game_state.stats_flag = True
+    return game_context
+
+
+def bench_compare_odds(quick: bool = False) -> List[BenchmarkResult]:
+    """Time get_compare_odds with the solver table already warm."""
+    game_context = _mid_game_context()
+    dyna.get_compare_odds(game_context, _UI_CHOICE)
+    seconds = _best_time(
+        lambda: dyna.get_compare_odds(game_context, _UI_CHOICE),
+        number=100 if quick else 1000,
+        repeat=3,
+    )
+    return [BenchmarkResult("get_compare_odds", seconds * 1e3, "ms", False)]
+
+
+def bench_draw_all_screen(quick: bool = False) -> List[BenchmarkResult]:
+    """Time a full redraw of draw_all_screen, a raven move and an idle frame."""
+    game_context = _mid_game_context()
+    raven_track = game_context.game_state.raven_track
+    color = game_context.assets.COLORS.GREEN
+
+    def frame() -> None:
+        game_context.screen_changes.mark_all()
+        eh.draw_all_screen(game_context, color, _UI_CHOICE)
+
+    def raven_frame() -> None:
+        raven_track.spaces = (
+            _UI_RAVEN - 1 if raven_track.spaces == _UI_RAVEN else _UI_RAVEN
+        )
+        eh.draw_all_screen(game_context, color, _UI_CHOICE)
+
+    def idle_frame() -> None:
+        eh.draw_all_screen(game_context, color, _UI_CHOICE)
+
+    frame()
+    number = 20 if quick else 200
+    seconds = _best_time(frame, number=number, repeat=3)
+    raven_seconds = _best_time(raven_frame, number=number, repeat=3)
+    # Idle frames take well under a microsecond, time many to steady the result
+    idle_seconds = _best_time(idle_frame, number=number * 50, repeat=3)
+    return [
+        BenchmarkResult("draw_all_screen", seconds * 1e3, "ms", False),
+        BenchmarkResult("draw_all_screen_raven", raven_seconds * 1e3, "ms", False),
+        BenchmarkResult("draw_all_screen_idle", idle_seconds * 1e3, "ms", False),
+    ]
+
+
+def bench_ui_replay(quick: bool = False) -> List[BenchmarkResult]:
+    """Replay recorded games through the headless UI and time their frames."""
+    n_games = 10 if quick else 100
+    game_context = init_game_context(headless=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "games.bin"
+        with TrajectoryRecorder(path) as recorder:
+            run_batches(GameState(), n_games, 1, ["most"], seed=0, recorder=recorder)
+        reader = TrajectoryReader(path)
+        play_recording(game_context, reader, range(1))
+        stats = play_recording(game_context, reader)
+        del reader
+    return [
+        BenchmarkResult("ui_replay_mean_frame", stats.mean_ms, "ms", False),
+        BenchmarkResult("ui_replay_p95_frame", stats.percentile_ms(95), "ms", False),
+    ]
+
+
+def bench_regret_analysis(quick: bool = False) -> List[BenchmarkResult]:
+    """Measure how many recorded wild choices analyze_regret grades per second."""
+    n_games = 10_000 if quick else 100_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "games.bin"
+        with TrajectoryRecorder(path) as recorder:
+            run_batches(GameState(), n_games, 1, ["random"], seed=0, recorder=recorder)
+        reader = TrajectoryReader(path)
+        decisions = analyze_regret(reader).decisions
+        seconds = _best_time(partial(analyze_regret, reader), number=1, repeat=3)
+        del reader
+    return [
+        BenchmarkResult("regret_analysis", decisions / seconds, "decisions/s", True)
+    ]
+
+
+def measure_cold_start() -> float:
+    """Return the seconds a new Python process takes to draw the first frame."""
+    root = str(Path(__file__).resolve().parents[2])
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", _COLD_START_SCRIPT],
+        check=True,
+        env=env,
+        capture_output=True,
+    )
+    return time.perf_counter() - start
+
+
+def bench_cold_start(quick: bool = False) -> List[BenchmarkResult]:
+    """Time launching the game up to its first frame, the solver table included."""
+    seconds = min(measure_cold_start() for _ in range(1 if quick else 3))
+    return [BenchmarkResult("cold_start_first_frame", seconds, "s", False)]
+
+
+BENCHMARKS: Dict[str, Callable[[bool], List[BenchmarkResult]]] = {
+    "win_perc": bench_win_perc,
+    "rule_sweep": bench_rule_sweep,
+    "decrement_logic": bench_decrement_logic,
+    "play_with_strat": bench_play_with_strat,
+    "run_batches": bench_run_batches,
+    "vec_env": bench_vec_env,
+    "compare_odds": bench_compare_odds,
+    "draw_all_screen": bench_draw_all_screen,
+    "ui_replay": bench_ui_replay,
+    "regret_analysis": bench_regret_analysis,
+    "cold_start": bench_cold_start,
+}
+
+
+def run_benchmarks(
+    names: Sequence[str] | None = None, quick: bool = False
+) -> List[BenchmarkResult]:
+    """
+    Run the selected benchmarks in order.
+
+    Args:
+    ----
+            names (Sequence[str] | None): Keys of BENCHMARKS to run. Defaults to all.
+
+            quick (bool): Use fewer games and repeats, for smoke tests.
+
+    Returns:
+    -------
+            results (List[BenchmarkResult]): Every measurement of every benchmark.
+
+    """
+    if names is None:
+        names = list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {sorted(unknown)}.")
+    results: List[BenchmarkResult] = []
+    for name in names:
+        results.extend(BENCHMARKS[name](quick))
+    return results
+
+
+def save_results(results: Sequence[BenchmarkResult], path: str | Path) -> None:
+    """Write results to a JSON file along with the versions they were run with."""
+    document = {
+        "metadata": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+        },
+        "results": {result.name: asdict(result) for result in results},
+    }
+    Path(path).write_text(json.dumps(document, indent=2) + "\n")
+
+
+def load_results(path: str | Path) -> List[BenchmarkResult]:
+    """Read results written by save_results."""
+    document = json.loads(Path(path).read_text())
+    return [BenchmarkResult(**result) for result in document["results"].values()]
+
+
+def compare_to_baseline(
+    results: Sequence[BenchmarkResult],
+    baseline: Sequence[BenchmarkResult],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[Regression]:
+    """
+    Find every result more than threshold worse than the same result in baseline.
+
+    Args:
+    ----
+            results (Sequence[BenchmarkResult]): The current run.
+
+            baseline (Sequence[BenchmarkResult]): The stored run to compare against.
+            Results missing from either run are skipped.
+
+            threshold (float): Allowed relative slowdown, e.g. 0.25 for 25%.
+
+    Returns:
+    -------
+            regressions (List[Regression]): The results that got too much worse.
+
+    """
+    baseline_values = {result.name: result.value for result in baseline}
+    regressions = []
+    for result in results:
+        if result.name not in baseline_values:
+            continue
+        old = baseline_values[result.name]
+        if result.higher_is_better:
+            change = old / result.value - 1 if result.value > 0 else float("inf")
+        else:
+            change = result.value / old - 1 if old > 0 else float("inf")
+        if change > threshold:
+            regressions.append(Regression(result.name, old, result.value, change))
+    return regressions
+
+
+def over_budget(
+    results: Sequence[BenchmarkResult], budgets: Dict[str, float] = BUDGETS
+) -> List[BenchmarkResult]:
+    """Return every result above its budget, results without one are skipped."""
+    return [
+        result
+        for result in results
+        if result.name in budgets and result.value > budgets[result.name]
+    ]
@@ -1,11 +1,26 @@
-"""Assets for the First Orchard game. All created using pygame."""
+"""
+Assets for the First Orchard game. All created using pygame.
 
+Fonts are loaded on first use, so starting the game only loads the fonts of the first
+frame. Looking up a system font by name scans every installed font, so the resolved
+path is cached in FONT_CACHE_PATH and later launches skip the scan. Delete that file
+after installing or removing fonts.
+"""
+
+import json
+import os
 from dataclasses import dataclass
-from typing import Tuple
+from functools import cached_property
+from pathlib import Path
+from typing import Dict, Tuple
 
 import pygame
 
-from first_orchard_solver.gameplay.gamelogic import GameState
+FONT_CACHE_PATH = (
+    Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    / "first_orchard_solver"
+    / "fonts.json"
+)
 
 
 # ------------------------
@@ -51,6 +66,7 @@ class Positions:
     RESTART_POS_YES: Tuple[int, int] = (420, 300)
     RESTART_POS_NO: Tuple[int, int] = (720, 300)
     THANKS_POS: Tuple[int, int] = (640, 150)
+    WILD_ODDS_OFFSET: Tuple[int, int] = (-35, -105)
 
 
 # ------------------------
@@ -156,11 +172,48 @@ class Options:
     """Class to hold predefined other options."""
 
     WIN_PERC_OPTION: Tuple[str, ...] = ("most", "fewest", "random")
+    SHOW_WILD_ODDS: bool = False  # odds of each choice above the circles on a wild
+
+
+# ------------------------
+# Fonts
+# ------------------------
+def system_font_path(name: str, cache_path: Path | None = None) -> str | None:
+    """
+    Return the path of an installed font, or None if it is not installed.
+
+    The answer is read from the JSON file at cache_path, FONT_CACHE_PATH by default,
+    if it is there, and added to it otherwise. A cached path whose file is gone is
+    looked up again.
+    """
+    if cache_path is None:
+        cache_path = FONT_CACHE_PATH
+    try:
+        cached: Dict[str, str | None] = json.loads(cache_path.read_text())
+    except (OSError, ValueError):
+        cached = {}
+    if name in cached:
+        path = cached[name]
+        if path is None or os.path.exists(path):
+            return path
+    path = pygame.font.match_font(name)
+    cached[name] = path
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json.dumps(cached, indent=2))
+    except OSError:
+        pass  # a read-only cache only costs the next launch a font scan
+    return path
+
+
+def system_font(name: str, size: int) -> pygame.font.Font:
+    """Load an installed font by name, falling back to the default font like SysFont."""
+    return pygame.font.Font(system_font_path(name), size)
 
 
 @dataclass(frozen=True)
 class Assets:
-    """Class to hold all assets for the game."""
+    """Class to hold all assets for the game. Fonts are loaded on first use."""
 
     COLORS: Color
     RECTANGLES: Rects
@@ -168,19 +221,51 @@ class Assets:
     POSITIONS: Positions
     ANTIALIASING: Antialiasing
     OPTIONS: Options
-    GAME_STATE: GameState
-    # ------------------------
-    # Fonts
-    # ------------------------
-    INSTRUCTION_FONT: pygame.font.Font
-    FRUIT_CIRCLE_FONT: pygame.font.Font
-    ODDS_FONT: pygame.font.Font
-    DIE_REPLACEMENT_FONT: pygame.font.Font
-    COACHING_FONT: pygame.font.Font
-    CHOOSE_FRUIT_FONT: pygame.font.Font
-    GAME_RESULT_FONT: pygame.font.Font
-    RESTART_FONT: pygame.font.Font
-    THANKS_FONT: pygame.font.Font
+
+    @cached_property
+    def INSTRUCTION_FONT(self) -> pygame.font.Font:
+        """Font of the roll instruction."""
+        return pygame.font.Font(None, 72)
+
+    @cached_property
+    def FRUIT_CIRCLE_FONT(self) -> pygame.font.Font:
+        """Font of the fruit counts in the circles."""
+        return pygame.font.Font(None, 96)
+
+    @cached_property
+    def ODDS_FONT(self) -> pygame.font.Font:
+        """Font of the odds of winning."""
+        return pygame.font.Font(None, 48)
+
+    @cached_property
+    def DIE_REPLACEMENT_FONT(self) -> pygame.font.Font:
+        """Font of the text replacing the die on a raven or wild."""
+        return pygame.font.Font(None, 36)
+
+    @cached_property
+    def COACHING_FONT(self) -> pygame.font.Font:
+        """Font of the coaching text."""
+        return system_font("Consolas", 24)
+
+    @cached_property
+    def CHOOSE_FRUIT_FONT(self) -> pygame.font.Font:
+        """Font of the wild instruction."""
+        return pygame.font.Font(None, 48)
+
+    @cached_property
+    def GAME_RESULT_FONT(self) -> pygame.font.Font:
+        """Font of the end result."""
+        return pygame.font.Font(None, 96)
+
+    @cached_property
+    def RESTART_FONT(self) -> pygame.font.Font:
+        """Font of the restart yes and no."""
+        return pygame.font.Font(None, 144)
+
+    @cached_property
+    def THANKS_FONT(self) -> pygame.font.Font:
+        """Font of the final message."""
+        return pygame.font.Font(None, 96)
 
 
 def load_assets() -> Assets:
@@ -192,14 +277,4 @@ def load_assets() -> Assets:
         POSITIONS=Positions(),
         ANTIALIASING=Antialiasing(),
         OPTIONS=Options(),
-        GAME_STATE=GameState(),
-        INSTRUCTION_FONT=pygame.font.Font(None, 72),
-        FRUIT_CIRCLE_FONT=pygame.font.Font(None, 96),
-        ODDS_FONT=pygame.font.Font(None, 48),
-        DIE_REPLACEMENT_FONT=pygame.font.Font(None, 36),
-        COACHING_FONT=pygame.font.SysFont("Consolas", 24),
-        CHOOSE_FRUIT_FONT=pygame.font.Font(None, 48),
-        GAME_RESULT_FONT=pygame.font.Font(None, 96),
-        RESTART_FONT=pygame.font.Font(None, 144),
-        THANKS_FONT=pygame.font.Font(None, 96),
     )
@@ -5,13 +5,18 @@ Which holds references to the main game screen,
 background, assets, and current game state for the First Orchard game.
 """
 
-from dataclasses import dataclass
-from typing import Tuple
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
 
 import pygame
 
 from first_orchard_solver.gameplay.assets import Assets, load_assets
 from first_orchard_solver.gameplay.gamelogic import GameState
+from first_orchard_solver.gameplay.screenparts import ScreenChanges
+from first_orchard_solver.gameplay.textcache import TextCache
+
+FrameArgs = Tuple[Tuple[int, int, int] | None, int | None]
 
 
 @dataclass
@@ -25,6 +30,13 @@ class GameContext:
         background (pygame.Surface): The background surface.
         assets (Assets): The game assets.
         game_state (GameState): The current state of the game.
+        part_rects (Dict[str, List[pygame.Rect]]): Screen areas each part of the
+        screen (see screenparts.py) drew over, erased before it is drawn again.
+        screen_changes (ScreenChanges): Parts to draw again, kept up to date from the
+        GameEvents of game_state.
+        last_frame_args (FrameArgs | None): Die face color and wild choice the last
+        frame was drawn with.
+        text_cache (TextCache): Text surfaces already rendered.
 
     """
 
@@ -32,10 +44,33 @@ class GameContext:
     background: pygame.Surface
     assets: Assets
     game_state: GameState
+    part_rects: Dict[str, List[pygame.Rect]] = field(default_factory=dict)
+    screen_changes: ScreenChanges = field(default_factory=ScreenChanges)
+    last_frame_args: FrameArgs | None = None
+    text_cache: TextCache = field(default_factory=TextCache)
+
+    def __post_init__(self) -> None:
+        """Listen to the changes of the game state."""
+        self.game_state.subscribe(self.screen_changes)
 
+    @property
+    def dirty_rects(self) -> List[pygame.Rect]:
+        """Screen areas drawn over by every part on screen."""
+        return [rect for rects in self.part_rects.values() for rect in rects]
 
-def init_game_context() -> GameContext:
-    """Initialize the Pygame environment and returns the inital game context."""
+
+def init_game_context(headless: bool = False) -> GameContext:
+    """
+    Initialize the Pygame environment and returns the inital game context.
+
+    Args:
+    ----
+            headless (bool): Draw on SDL's dummy video driver instead of opening a
+            window, for running the game without a display.
+
+    """
+    if headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
     pygame.init()
     assets = load_assets()
     screen = pygame.display.set_mode(assets.POSITIONS.INITIAL_SCREEN_SIZE)
@@ -43,7 +78,7 @@ def init_game_context() -> GameContext:
     background = pygame.Surface(screen.get_size())
     background = background.convert()
     background.fill(assets.COLORS.PURPLE)
-    game_state = assets.GAME_STATE
+    game_state = GameState()
     return GameContext(
         screen=screen, background=background, assets=assets, game_state=game_state
     )
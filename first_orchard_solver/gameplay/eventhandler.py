@@ -6,13 +6,14 @@ eventhandler.py should not reference background or screen at all. If something n
 needs to be drawn this should be handled in renderer.py
 """
 
-from typing import Tuple
+from typing import List, Set, Tuple
 
 import pygame
 
 from first_orchard_solver.gameplay import rend_dynamic as dyna
 from first_orchard_solver.gameplay import rend_static as static
 from first_orchard_solver.gameplay.context import GameContext, unpack_game_context
+from first_orchard_solver.gameplay.screenparts import SCREEN_PARTS
 
 
 def die_results_color(game_context: GameContext) -> Tuple[int, int, int] | None:
@@ -39,13 +40,38 @@ def die_results_raven(game_context: GameContext) -> None:
 
 
 def die_results_wild(game_context: GameContext) -> None:
-    """Handle events when die roll is wild."""
+    """Handle events when die roll is wild, solving the odds of every choice."""
     assets, _, _, game_state = unpack_game_context(game_context)
+    game_state.wild_odds = dyna.solve_wild_odds(
+        game_context, game_state.fruit_inventory.fruit_inventory
+    )
     game_state.replace_text = assets.TEXT.CHOOSE_FRUIT_TEXT
     game_state.die_click_enabled = False
     game_state.pending_fruit_click = True
 
 
+def apply_die_result(game_context: GameContext) -> Tuple[int, int, int] | None:
+    """
+    Handle the result of a die roll.
+
+    Returns
+    -------
+            Tuple[int, int, int] | None: Color of the die face if a fruit was rolled.
+
+    """
+    _, _, _, game_state = unpack_game_context(game_context)
+    game_state.stats_flag = False
+    game_state.wild_odds = {}
+    if game_state.orchard_die.die_result == 1:
+        die_results_raven(game_context)
+        return None
+    if game_state.orchard_die.die_result == 2:
+        die_results_wild(game_context)
+        return None
+    game_state.replace_text = None
+    return die_results_color(game_context)
+
+
 def choose_fruit(game_context: GameContext, event: pygame.event.Event) -> int | None:
     """Handle events relating to choosing the fruit when die roll is wild."""
     assets, _, _, game_state = unpack_game_context(game_context)
@@ -58,31 +84,106 @@ def choose_fruit(game_context: GameContext, event: pygame.event.Event) -> int |
     return None
 
 
-def end_of_game(game_context: GameContext) -> None:
+def end_of_game(game_context: GameContext) -> List[pygame.Rect]:
     """Handle events at end of game."""
     _, _, _, game_state = unpack_game_context(game_context)
     if not game_state.is_game_over():
-        return
+        return []
     if sum(game_state.fruit_inventory.fruit_values) == 0:
-        static.draw_end_screen(game_context, True)
+        return static.draw_end_screen(game_context, True)
     elif game_state.raven_track.spaces == 0:
-        static.draw_end_screen(game_context, False)
+        return static.draw_end_screen(game_context, False)
+    return []
+
+
+def restart_game(game_context: GameContext) -> None:
+    """Start a new game in the same context, reusing its fonts and surfaces."""
+    _, _, _, game_state = unpack_game_context(game_context)
+    game_state.reset()
+    game_context.part_rects.clear()
+    game_context.last_frame_args = None
+    static.redraw_for_new_game(game_context)
+
+
+def _draw_part(
+    game_context: GameContext,
+    part: str,
+    color: Tuple[int, int, int] | None,
+    idx: int | None,
+) -> List[pygame.Rect]:
+    """Draw one part of the screen and return the areas it drew over."""
+    assets, _, _, game_state = unpack_game_context(game_context)
+    if part == "fruit":
+        return dyna.draw_fruit_circle_texts(game_context)
+    if part == "die":
+        rects = dyna.draw_die(game_context)
+        rects += dyna.draw_new_die_face(game_context, color)
+        if game_state.replace_text:
+            rects += dyna.draw_die_replace_text(game_context, game_state.replace_text)
+        return rects
+    if part == "raven":
+        return dyna.draw_raven_track(game_context)
+    if part == "odds":
+        return dyna.draw_odds_text(game_context)
+    if part == "wild_odds":
+        if assets.OPTIONS.SHOW_WILD_ODDS and not game_state.die_click_enabled:
+            return dyna.draw_wild_odds_text(game_context)
+        return []
+    if part == "coaching":
+        if game_state.stats_flag:
+            odds_result = dyna.get_compare_odds(game_context, idx)
+            return dyna.draw_coaching_text(game_context, odds_result)
+        return []
+    return end_of_game(game_context)
+
+
+def _damaged_parts(game_context: GameContext, dirty: Set[str]) -> Set[str]:
+    """Add to the dirty parts every part that erasing them would erase too."""
+    part_rects = game_context.part_rects
+    erased = [rect for part in dirty for rect in part_rects.get(part, [])]
+    damaged = set(dirty)
+    grew = True
+    while grew:
+        grew = False
+        for part, rects in part_rects.items():
+            if part not in damaged and any(r.collidelist(erased) != -1 for r in rects):
+                damaged.add(part)
+                erased += rects
+                grew = True
+    return damaged
 
 
 def draw_all_screen(
     game_context: GameContext, color: Tuple[int, int, int] | None, idx: int | None
 ) -> None:
-    """Draw all necessary game elements on the screen."""
+    """
+    Draw the parts of the screen that changed since the last frame.
+
+    The GameEvents of the game state mark the parts they change (see screenparts.py),
+    as do a new die face color or wild choice. Nothing is drawn if nothing changed.
+    Otherwise only the changed parts, and the parts overlapping them, are erased and
+    drawn again, and only those areas are updated on the display.
+    """
     _, _, _, game_state = unpack_game_context(game_context)
-    dyna.draw_fruit_circle_texts(game_context)
-    dyna.draw_die(game_context)
-    dyna.draw_new_die_face(game_context, color)
-    dyna.draw_raven_track(game_context)
-    if game_state.replace_text:
-        dyna.draw_die_replace_text(game_context, game_state.replace_text)
-    dyna.draw_odds_text(game_context)
-    if game_state.stats_flag:
-        odds_result = dyna.get_compare_odds(game_context, idx)
-        dyna.draw_coaching_text(game_context, odds_result)
-    end_of_game(game_context)
-    pygame.display.flip()
+    dirty = game_context.screen_changes.take()
+    last_args = game_context.last_frame_args
+    if last_args is None or last_args[0] != color:
+        dirty.add("die")
+    if last_args is None or last_args[1] != idx:
+        dirty.add("coaching")
+    game_context.last_frame_args = (color, idx)
+    if not dirty:
+        return
+    game_context.text_cache.sync(game_state.game_status)
+    dirty = _damaged_parts(game_context, dirty)
+    erased = dyna.restore_background(
+        game_context,
+        [rect for part in dirty for rect in game_context.part_rects.pop(part, [])],
+    )
+
+    rects = []
+    for part in SCREEN_PARTS:
+        if part in dirty:
+            game_context.part_rects[part] = _draw_part(game_context, part, color, idx)
+            rects += game_context.part_rects[part]
+    pygame.display.update(erased + rects)
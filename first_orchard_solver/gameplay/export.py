@@ -0,0 +1,420 @@
+"""
+Module to export the solved odds of every state of the Orchard game to a file.
+
+Every state of every rule set is solved under every strategy with policyeval.py and
+written as one row with typed columns:
+
+    fruit_types, fruit_per_type, raven_spaces, wild_faces (uint8): Rule set of the
+    row.
+
+    fruit_0, ..., raven (uint8): The state, like GameState.game_status. Rule sets with
+    fewer fruit types than the widest one have 0 in the extra fruit columns.
+
+    strat (string): Strategy used on every wild roll.
+
+    win, loss (float64): Probability of winning and of losing from the state.
+
+    expected_length (float64): Expected number of die rolls until the game ends.
+
+    best_move (int8): Fruit column with the highest win probability to take on a wild
+    roll, assuming strat afterwards, or -1 if the game is over.
+
+    gap (float64): Win probability of the best exported strategy in the state minus
+    the one of strat.
+
+Rule sets with the same number of fruit types form a group solved together in one pass
+by evaluate_rule_sets. Groups are solved one at a time, and the rows of a group are
+built as NumPy arrays and written in chunks of chunk_rows before the next group is
+solved. Memory use is therefore set by the full tables of the largest group, not by
+the size of the file: a single huge rule set is still solved whole in memory. The
+format is
+taken from the file suffix: .csv, .npz (one array per column) or .arrow (Arrow IPC
+file, needs pyarrow).
+
+    python -m first_orchard_solver.gameplay.export solved.npz --rules 4,4,5 3,4,6
+
+exports the base game and a game with 3 fruit types of 4 fruit and 6 raven spaces for
+every registered strategy.
+"""
+
+import argparse
+import sys
+from abc import ABC, abstractmethod
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Sequence, Tuple, Type
+
+import numpy as np
+import numpy.typing as npt
+
+from first_orchard_solver.gameplay.gamelogic import BASE_RULES, RuleSet
+from first_orchard_solver.gameplay.policyeval import (
+    _fruit_strides,
+    evaluate_rule_sets,
+    expected_lengths_rule_sets,
+    padded_rules,
+    policy_table,
+    state_grid,
+)
+from first_orchard_solver.gameplay.stateindex import canonical_index
+from first_orchard_solver.gameplay.strategies import Strategy, available_strategies
+
+DEFAULT_CHUNK_ROWS = 65_536
+EXPORT_FORMATS = (".csv", ".npz", ".arrow")
+
+Chunk = Dict[str, npt.NDArray[Any]]
+Columns = List[Tuple[str, np.dtype]]
+
+
+def export_columns(
+    rule_sets: Sequence[RuleSet], strategies: Sequence[Strategy]
+) -> Columns:
+    """Return the name and dtype of every exported column, in file order."""
+    fruit_slots = max(rules.fruit_types for rules in rule_sets)
+    strat_width = max(len(strat) for strat in strategies)
+    return [
+        ("fruit_types", np.dtype(np.uint8)),
+        ("fruit_per_type", np.dtype(np.uint8)),
+        ("raven_spaces", np.dtype(np.uint8)),
+        ("wild_faces", np.dtype(np.uint8)),
+        *[(f"fruit_{slot}", np.dtype(np.uint8)) for slot in range(fruit_slots)],
+        ("raven", np.dtype(np.uint8)),
+        ("strat", np.dtype(f"<U{strat_width}")),
+        ("win", np.dtype(np.float64)),
+        ("loss", np.dtype(np.float64)),
+        ("expected_length", np.dtype(np.float64)),
+        ("best_move", np.dtype(np.int8)),
+        ("gap", np.dtype(np.float64)),
+    ]
+
+
+def _export_states(rules: RuleSet, canonical: bool) -> npt.NDArray[np.intp]:
+    """Return the table entries to export, only canonical states if canonical."""
+    if not canonical:
+        return np.arange(int(np.prod(rules.shape)))
+    index = canonical_index(rules)
+    return index.table_index(np.arange(index.size))
+
+
+def _best_moves(
+    win_probs: npt.NDArray[np.float64], rules: RuleSet
+) -> npt.NDArray[np.int8]:
+    """Return the best fruit column to take on a wild in every state, -1 if over."""
+    counts, raven = state_grid(rules)
+    states = np.arange(len(raven))[:, None]
+    children = np.where(counts > 0, states - _fruit_strides(rules), states)
+    odds = np.where(counts > 0, win_probs[:, children], -np.inf)
+    best: npt.NDArray[np.int8] = np.argmax(odds, axis=-1).astype(np.int8)
+    best[:, (raven == 0) | (counts.sum(axis=1) == 0)] = -1
+    return best
+
+
+def _rule_set_groups(rule_sets: Sequence[RuleSet]) -> List[List[RuleSet]]:
+    """Group the rule sets by number of fruit types, in order of first appearance."""
+    groups: Dict[int, List[RuleSet]] = {}
+    for rules in rule_sets:
+        groups.setdefault(rules.fruit_types, []).append(rules)
+    return list(groups.values())
+
+
+def _solve_group(
+    group: Sequence[RuleSet], strats: Sequence[Strategy]
+) -> List[Tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]]:
+    """Return the win and expected length tables of every rule set of a group."""
+    padded = padded_rules(group)
+    tables = np.stack([policy_table(strat, padded) for strat in strats])
+    wins = evaluate_rule_sets(group, tables)
+    lengths = expected_lengths_rule_sets(group, tables)
+    return list(zip(wins, lengths))
+
+
+def _rule_set_chunks(
+    rules: RuleSet,
+    solved: Tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]],
+    strats: Sequence[Strategy],
+    columns: Columns,
+    fruit_slots: int,
+    chunk_rows: int,
+    canonical: bool,
+) -> Iterator[Chunk]:
+    """Yield the chunks of one rule set from its win and expected length tables."""
+    counts, raven = state_grid(rules)
+    win_probs, lengths = (table.reshape(len(strats), -1) for table in solved)
+    best_moves = _best_moves(win_probs, rules)
+    gaps = win_probs.max(axis=0) - win_probs
+    exported = _export_states(rules, canonical)
+    for strat_index, strat in enumerate(strats):
+        for start in range(0, len(exported), chunk_rows):
+            states = exported[start : start + chunk_rows]
+            win = win_probs[strat_index, states]
+            chunk: Chunk = {
+                "fruit_types": np.full(len(states), rules.fruit_types),
+                "fruit_per_type": np.full(len(states), rules.fruit_per_type),
+                "raven_spaces": np.full(len(states), rules.raven_spaces),
+                "wild_faces": np.full(len(states), rules.wild_faces),
+                "raven": raven[states],
+                "strat": np.full(len(states), strat),
+                "win": win,
+                "loss": 1.0 - win,
+                "expected_length": lengths[strat_index, states],
+                "best_move": best_moves[strat_index, states],
+                "gap": gaps[strat_index, states],
+            }
+            for slot in range(fruit_slots):
+                chunk[f"fruit_{slot}"] = (
+                    counts[states, slot]
+                    if slot < rules.fruit_types
+                    else np.zeros(len(states))
+                )
+            yield {name: chunk[name].astype(dtype) for name, dtype in columns}
+
+
+def solved_chunks(
+    rule_sets: Sequence[RuleSet] = (BASE_RULES,),
+    strategies: Sequence[Strategy] | None = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    canonical: bool = False,
+) -> Iterator[Chunk]:
+    """
+    Solve every state of every rule set under every strategy, chunk by chunk.
+
+    Args:
+    ----
+            rule_sets (Sequence[RuleSet]): Rule sets to solve.
+
+            strategies (Sequence[Strategy] | None): Strategies to solve, every
+            registered one if None.
+
+            chunk_rows (int): Maximum number of rows in a chunk.
+
+            canonical (bool): Only export states with fruit counts in ascending
+            order, one per state type since fruit colors are interchangeable.
+
+    Returns:
+    -------
+            chunks (Iterator[Chunk]): Column name to array of every column of
+            export_columns, rule set by rule set and strategy by strategy. Rule sets
+            are grouped by number of fruit types, in order of first appearance, and
+            a group is only solved once the chunks of the one before are consumed.
+
+    """
+    strats = list(available_strategies() if strategies is None else strategies)
+    columns = export_columns(rule_sets, strats)
+    fruit_slots = max(rules.fruit_types for rules in rule_sets)
+    for group in _rule_set_groups(rule_sets):
+        for rules, solved in zip(group, _solve_group(group, strats)):
+            yield from _rule_set_chunks(
+                rules, solved, strats, columns, fruit_slots, chunk_rows, canonical
+            )
+
+
+class _ChunkWriter(ABC):
+    """
+    Abstract base class of the writers of export_solved, one per file format.
+
+    Args:
+    ----
+            path (Path): File to write.
+
+            columns (Columns): Name and dtype of every column, from export_columns.
+
+            n_rows (int): Number of rows that will be written in total.
+
+    """
+
+    @abstractmethod
+    def __init__(self, path: Path, columns: Columns, n_rows: int) -> None:
+        """Open the file."""
+
+    @abstractmethod
+    def write(self, chunk: Chunk) -> None:
+        """Append the rows of a chunk."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Finish the file and close it."""
+
+
+class _CsvWriter(_ChunkWriter):
+    """Writes chunks as rows of a CSV file with a header line."""
+
+    def __init__(self, path: Path, columns: Columns, n_rows: int) -> None:
+        """Open the file and write the header."""
+        self._file = open(path, "w")
+        self._file.write(",".join(name for name, _ in columns) + "\n")
+        self._dtype = np.dtype(columns)
+        self._fmt = ["%.17g" if dtype.kind == "f" else "%s" for _, dtype in columns]
+        return None
+
+    def write(self, chunk: Chunk) -> None:
+        """Append the rows of a chunk."""
+        rows = np.empty(len(chunk["win"]), dtype=self._dtype)
+        for name, array in chunk.items():
+            rows[name] = array
+        np.savetxt(self._file, rows, fmt=self._fmt, delimiter=",")
+
+    def close(self) -> None:
+        """Close the file."""
+        self._file.close()
+
+
+class _NpzWriter(_ChunkWriter):
+    """
+    Writes chunks into one .npy array per column, zipped into a .npz at the end.
+
+    The columns are filled in place through memory-mapped .npy files in a temporary
+    directory next to the output, so no column is ever held in memory whole.
+    """
+
+    def __init__(self, path: Path, columns: Columns, n_rows: int) -> None:
+        """Create a memory-mapped .npy file of n_rows for every column."""
+        self._path = path
+        self._tmp = tempfile.TemporaryDirectory(dir=path.parent)
+        self._arrays = {
+            name: np.lib.format.open_memmap(
+                Path(self._tmp.name) / f"{name}.npy",
+                mode="w+",
+                dtype=dtype,
+                shape=(n_rows,),
+            )
+            for name, dtype in columns
+        }
+        self._row = 0
+        return None
+
+    def write(self, chunk: Chunk) -> None:
+        """Copy a chunk into the next rows of every column."""
+        rows = len(chunk["win"])
+        for name, array in chunk.items():
+            self._arrays[name][self._row : self._row + rows] = array
+        self._row += rows
+
+    def close(self) -> None:
+        """Flush the columns and zip them into the .npz file."""
+        try:
+            with zipfile.ZipFile(self._path, "w", allowZip64=True) as archive:
+                for name, array in self._arrays.items():
+                    array.flush()
+                    archive.write(Path(self._tmp.name) / f"{name}.npy", f"{name}.npy")
+        finally:
+            self._arrays.clear()
+            self._tmp.cleanup()
+
+
+class _ArrowWriter(_ChunkWriter):
+    """Writes every chunk as a record batch of an Arrow IPC file."""
+
+    def __init__(self, path: Path, columns: Columns, n_rows: int) -> None:
+        """Open an Arrow IPC file with the schema of the columns."""
+        try:
+            import pyarrow as pa
+        except ImportError as error:
+            raise ImportError(
+                "Arrow export needs pyarrow, pip install pyarrow."
+            ) from error
+        self._pa = pa
+        self._schema = pa.schema(
+            [
+                (name, pa.string() if dtype.kind == "U" else pa.from_numpy_dtype(dtype))
+                for name, dtype in columns
+            ]
+        )
+        self._writer = pa.ipc.new_file(str(path), self._schema)
+        return None
+
+    def write(self, chunk: Chunk) -> None:
+        """Append a chunk as one record batch."""
+        arrays = [
+            self._pa.array(chunk[field.name], type=field.type) for field in self._schema
+        ]
+        self._writer.write_batch(self._pa.record_batch(arrays, schema=self._schema))
+
+    def close(self) -> None:
+        """Write the file footer and close it."""
+        self._writer.close()
+
+
+_WRITERS: Dict[str, Type[_ChunkWriter]] = {
+    ".csv": _CsvWriter,
+    ".npz": _NpzWriter,
+    ".arrow": _ArrowWriter,
+}
+
+
+def export_solved(
+    path: str | Path,
+    rule_sets: Sequence[RuleSet] = (BASE_RULES,),
+    strategies: Sequence[Strategy] | None = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    canonical: bool = False,
+) -> int:
+    """
+    Write every state × strategy × rule set to a file and return the rows written.
+
+    The format is taken from the suffix of path, see EXPORT_FORMATS. Raises a
+    ValueError for any other suffix, and an ImportError for .arrow without pyarrow.
+    The other arguments are passed to solved_chunks.
+    """
+    path = Path(path)
+    if path.suffix not in EXPORT_FORMATS:
+        raise ValueError(
+            f"Unknown export format {path.suffix!r}, use one of "
+            f"{', '.join(EXPORT_FORMATS)}."
+        )
+    strats = list(available_strategies() if strategies is None else strategies)
+    n_rows = len(strats) * sum(
+        len(_export_states(rules, canonical)) for rules in rule_sets
+    )
+    writer = _WRITERS[path.suffix](path, export_columns(rule_sets, strats), n_rows)
+    try:
+        for chunk in solved_chunks(rule_sets, strats, chunk_rows, canonical):
+            writer.write(chunk)
+    finally:
+        writer.close()
+    return n_rows
+
+
+def parse_rules(text: str) -> RuleSet:
+    """Parse "fruit_types,fruit_per_type,raven_spaces[,wild_faces]" into a RuleSet."""
+    try:
+        sizes = [int(n) for n in text.split(",")]
+        if len(sizes) not in (3, 4):
+            raise ValueError(text)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(
+            f"Invalid rule set {text!r}, expected e.g. 4,4,5 or 4,4,5,2."
+        ) from error
+    return RuleSet(*sizes)
+
+
+def main(argv: List[str] | None = None) -> int:
+    """Export the solved states given on the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("output", help="file to write, .csv, .npz or .arrow")
+    parser.add_argument(
+        "--rules",
+        nargs="+",
+        type=parse_rules,
+        default=[BASE_RULES],
+        help="rule sets as fruit_types,fruit_per_type,raven_spaces[,wild_faces]",
+    )
+    parser.add_argument("--strat", nargs="+", default=None, help="default: all")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument(
+        "--canonical", action="store_true", help="one state per fruit multiset"
+    )
+    args = parser.parse_args(argv)
+    try:
+        rows = export_solved(
+            args.output, args.rules, args.strat, args.chunk_rows, args.canonical
+        )
+    except (ValueError, ImportError) as error:
+        print(error, file=sys.stderr)
+        return 1
+    print(f"Wrote {rows} rows to {args.output}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
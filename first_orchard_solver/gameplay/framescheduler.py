@@ -0,0 +1,82 @@
+"""
+Module to schedule frames of the pygame version of the Orchard game.
+
+The game only changes after a click, so between clicks the game loop sleeps in
+pygame.event.wait instead of polling for events and redrawing at a fixed frame rate.
+Code that animates something calls request_animation, which makes the scheduler wake
+the loop at the animation frame rate until the animation is over. Once idle again the
+loop blocks until the next event, using next to no CPU.
+"""
+
+from typing import List
+
+import pygame
+
+ANIMATION_FPS = 60
+IDLE_TIMEOUT_MS = 0  # block until the next event
+
+
+class FrameScheduler:
+    """
+    Decides how long the game loop waits for events before drawing a frame.
+
+    Args:
+    ----
+            animation_fps (int): Frame rate while an animation is running.
+
+            idle_timeout_ms (int): Longest wait for an event while idle, 0 to wait
+            until one arrives.
+
+    """
+
+    def __init__(
+        self, animation_fps: int = ANIMATION_FPS, idle_timeout_ms: int = IDLE_TIMEOUT_MS
+    ) -> None:
+        """Start idle."""
+        if animation_fps < 1:
+            raise ValueError(f"animation_fps must be at least 1, got {animation_fps}.")
+        self.animation_fps = animation_fps
+        self.idle_timeout_ms = idle_timeout_ms
+        self.frames = 0
+        self._animate_until = 0
+        self._clock = pygame.time.Clock()
+        return None
+
+    def request_animation(self, duration_ms: int) -> None:
+        """Run at the animation frame rate for at least the next duration_ms."""
+        self._animate_until = max(
+            self._animate_until, pygame.time.get_ticks() + duration_ms
+        )
+
+    @property
+    def animating(self) -> bool:
+        """Whether an animation is running."""
+        return pygame.time.get_ticks() < self._animate_until
+
+    @property
+    def timeout_ms(self) -> int:
+        """Longest wait for the next event, 0 meaning no limit."""
+        if self.animating:
+            return max(1, 1000 // self.animation_fps)
+        return self.idle_timeout_ms
+
+    def wait_events(self) -> List[pygame.event.Event]:
+        """
+        Block until an event arrives or the next frame is due.
+
+        Returns
+        -------
+                List[pygame.event.Event]: The event that ended the wait followed by
+                every other queued event, empty if the wait timed out.
+
+        """
+        event = pygame.event.wait(self.timeout_ms)
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event, *pygame.event.get()]
+
+    def end_frame(self) -> None:
+        """Count the frame and cap the frame rate while animating."""
+        self.frames += 1
+        if self.animating:
+            self._clock.tick(self.animation_fps)
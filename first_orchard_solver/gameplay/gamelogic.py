@@ -3,10 +3,121 @@ Module contains the core game logic for the Orchard game and strategies for bot
 
 It includes classes for managing game state, the raven track, the fruit inventory.
 
+Every change to a GameState is announced to the listeners added with
+GameState.subscribe, as one of the typed events below, so the odds, coaching, drawing
+and recording code only recomputes what a change touched:
+
+    FruitChanged: a fruit count went up or down.
+    RavenMoved: the raven spaces left changed.
+    DieRolled: the die shows a new result, even if it is the same face.
+    UiStateChanged: one of the UI attributes of GameState (die_click_enabled,
+        fruit_click_enabled, replace_text, pending_fruit_click, stats_flag or
+        wild_odds) was set to a new value.
+    GameReset: the game was reset to its starting state.
+
+Changes made through the mutators and attribute setters are announced; changing the
+fruit_inventory dict in place is not. The listeners are not copied with the state, so
+the solver's deep copies stay silent.
 """
 
 import random
-from typing import Tuple
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    Tuple,
+    TypeVar,
+    Union,
+    overload,
+)
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    """
+    Class to hold the size of an Orchard game for the table-based solvers.
+
+    Attributes
+    ----------
+        fruit_types (int): Number of fruit colors, one die face each.
+        fruit_per_type (int): Number of fruits of each color at the start.
+        raven_spaces (int): Number of spaces on the raven track.
+        wild_faces (int): Number of wild faces on the die, which also has one face
+            per fruit color and one raven face.
+
+    """
+
+    fruit_types: int = 4
+    fruit_per_type: int = 4
+    raven_spaces: int = 5
+    wild_faces: int = 1
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        """Shape of a table indexed by (fruit1, ..., fruitN, spaces)."""
+        return (self.fruit_per_type + 1,) * self.fruit_types + (self.raven_spaces + 1,)
+
+    @property
+    def start(self) -> Tuple[int, ...]:
+        """Starting state as (fruit1, ..., fruitN, spaces) like game_status."""
+        return (self.fruit_per_type,) * self.fruit_types + (self.raven_spaces,)
+
+
+BASE_RULES = RuleSet()
+
+
+@dataclass(frozen=True)
+class FruitChanged:
+    """Event of the count of one fruit type changing."""
+
+    fruit_id: int
+    count: int
+
+
+@dataclass(frozen=True)
+class RavenMoved:
+    """Event of the raven spaces left changing."""
+
+    spaces: int
+
+
+@dataclass(frozen=True)
+class DieRolled:
+    """Event of the die showing a new result."""
+
+    die_result: int
+
+
+@dataclass(frozen=True)
+class UiStateChanged:
+    """Event of a UI attribute of GameState being set to a new value."""
+
+    name: str
+    value: Any
+
+
+@dataclass(frozen=True)
+class GameReset:
+    """Event of the game being reset, with the starting game_status."""
+
+    status: Tuple[int, ...]
+
+
+GameEvent = Union[FruitChanged, RavenMoved, DieRolled, UiStateChanged, GameReset]
+Listener = Callable[[GameEvent], None]
+
+T = TypeVar("T")
+
+
+class _Listeners(List[Listener]):
+    """Listeners of a GameState, shared with its parts and left out of copies."""
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "_Listeners":
+        """Give a copied state no listeners."""
+        return _Listeners()
 
 
 # In the Orchard game, the player loses when the raven reaches the end of the track
@@ -19,23 +130,53 @@ class RavenTrack:
             spaces (int): The number of spaces the raven can move. Defaults to 5. When
             this is 0, the game is over and player loses.
 
+            listeners (List[Listener] | None): Listeners told about every move.
+
     """
 
-    def __init__(self, spaces: int = 5) -> None:
+    def __init__(
+        self, spaces: int = 5, listeners: List[Listener] | None = None
+    ) -> None:
         """Initialize the RavenTrack with a given number of spaces."""
-        self.spaces = spaces
+        self._spaces = spaces
+        self._listeners = _Listeners() if listeners is None else listeners
         return None
 
+    @property
+    def spaces(self) -> int:
+        """Number of spaces left for the raven to move."""
+        return self._spaces
+
+    @spaces.setter
+    def spaces(self, spaces: int) -> None:
+        """Move the raven, telling the listeners if it moved."""
+        if spaces == self._spaces:
+            return
+        self._spaces = spaces
+        if not self._listeners:
+            return
+        for listener in self._listeners:
+            listener(RavenMoved(spaces))
+
     def decrement_raven(self) -> None:
         """Decrement the number of spaces left for the raven to move."""
-        self.spaces -= 1
+        self._spaces -= 1
+        if not self._listeners:
+            return
+        for listener in self._listeners:
+            listener(RavenMoved(self._spaces))
         return None
 
 
 class OrchardDie:
     """A class to represent a die used in the Orchard game."""
 
-    def __init__(self, sides: int = 6, die_result: int = 0) -> None:
+    def __init__(
+        self,
+        sides: int = 6,
+        die_result: int = 0,
+        listeners: List[Listener] | None = None,
+    ) -> None:
         """
         Initialize OrchardDie with a given number of sides & placeholder result.
 
@@ -47,21 +188,43 @@ class OrchardDie:
 
                 die_result (int): represents the result of the rolled die
 
+                listeners (List[Listener] | None): Listeners told about every roll.
+
         """
         self.sides = sides
-        self.die_result = die_result
+        self._die_result = die_result
+        self._listeners = _Listeners() if listeners is None else listeners
         return None
 
+    @property
+    def die_result(self) -> int:
+        """Result of the last roll."""
+        return self._die_result
+
+    @die_result.setter
+    def die_result(self, die_result: int) -> None:
+        """Show a new result, telling the listeners even if the face is the same."""
+        self._die_result = die_result
+        if not self._listeners:
+            return
+        for listener in self._listeners:
+            listener(DieRolled(die_result))
+
     def roll(self) -> int:
         """Roll the die and return the result."""
-        self.die_result = random.randint(1, self.sides)
-        return self.die_result
+        self._die_result = random.randint(1, self.sides)
+        if self._listeners:
+            for listener in self._listeners:
+                listener(DieRolled(self._die_result))
+        return self._die_result
 
 
 class FruitInventory:
     """A class to manage the inventory of fruits in the Orchard game."""
 
-    def __init__(self, orchard_die: OrchardDie) -> None:
+    def __init__(
+        self, orchard_die: OrchardDie, listeners: List[Listener] | None = None
+    ) -> None:
         """
         Initialize class to manage the inventory of fruits in the Orchard game.
 
@@ -73,14 +236,28 @@ class FruitInventory:
             Minor customization allowed, however, most functions do not support that.
             Considering removing customizability to stick solely to the base game.
 
+            listeners (List[Listener] | None): Listeners told about every fruit count
+            change.
+
         """
         self.fruit_types: int = orchard_die.sides - 2
         self.fruit_amt: int = 4
         self.fruit_inventory: dict[int, int] = {}
         for fruit in range(self.fruit_types):
             self.fruit_inventory[fruit + 3] = 4
+        self._listeners = _Listeners() if listeners is None else listeners
         return None
 
+    def set_fruit(self, fruit_id: int, count: int) -> None:
+        """Set the count of a fruit type, telling the listeners if it changed."""
+        if self.fruit_inventory[fruit_id] == count:
+            return
+        self.fruit_inventory[fruit_id] = count
+        if not self._listeners:
+            return
+        for listener in self._listeners:
+            listener(FruitChanged(fruit_id, count))
+
     @property
     def fruit_values(self) -> tuple[int, ...]:
         """Converts the fruit_inventory dictionary values into a tuple."""
@@ -100,11 +277,13 @@ class FruitInventory:
             and self.fruit_inventory[die_result] > 0
         ):
             self.fruit_inventory[die_result] -= 1
+            for listener in self._listeners:
+                listener(FruitChanged(die_result, self.fruit_inventory[die_result]))
 
     def increment_fruit(self, die_result: int) -> None:
         """Increment specific fruit by one to restore previous game state in drawing."""
         if die_result in self.fruit_inventory.keys():
-            self.fruit_inventory[die_result] += 1
+            self.set_fruit(die_result, self.fruit_inventory[die_result] + 1)
 
     def fewest_strat(self) -> None:
         """Implement a strategy of decrementing the fruit with the least amount."""
@@ -112,58 +291,132 @@ class FruitInventory:
             k: v for k, v in self.fruit_inventory.items() if v > 0
         }
         fewest_fruit = min(non_zero_fruits, key=lambda k: non_zero_fruits[k])
-        self.fruit_inventory[fewest_fruit] -= 1
+        self.set_fruit(fewest_fruit, self.fruit_inventory[fewest_fruit] - 1)
 
     def most_strat(self) -> None:
         """Implement a strategy of decrementing the fruit with the most amount."""
         largest_fruit = max(self.fruit_inventory, key=lambda k: self.fruit_inventory[k])
-        self.fruit_inventory[largest_fruit] -= 1
+        self.set_fruit(largest_fruit, self.fruit_inventory[largest_fruit] - 1)
 
     def random_strat(self) -> None:
         """
         Implement a strategy of decrementing a random fruit from the inventory.
 
-        Note: This logic is used in win_perc that is otherwise deterministic. This is a
-        known limitation of the current code and should be kept in mind. A future
-        refactor might make this deterministic as well. But this is honestly probably
-        not something that is strictly necessary.
+        Note: win_perc does not call this, it uses the analytic form of the random
+        strategy registered in strategies.py so the solver stays deterministic.
         """
         non_zero_fruits: dict[int, int] = {
             k: v for k, v in self.fruit_inventory.items() if v > 0
         }
         random_fruit: int = random.choice(list(non_zero_fruits.keys()))
-        self.fruit_inventory[random_fruit] -= 1
+        self.set_fruit(random_fruit, self.fruit_inventory[random_fruit] - 1)
 
     def check_not_zero(self) -> bool:
         """Return True if there are any fruits remaining."""
         return any(value != 0 for value in self.fruit_inventory.values())
 
 
+class _Announced(Generic[T]):
+    """Attribute of GameState whose new values are announced as UiStateChanged."""
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        """Store the value under a private name."""
+        self.name = name
+        self.private_name = "_" + name
+
+    @overload
+    def __get__(self, game_state: None, owner: type) -> "_Announced[T]": ...
+
+    @overload
+    def __get__(self, game_state: "GameState", owner: type) -> T: ...
+
+    def __get__(
+        self, game_state: "GameState | None", owner: type
+    ) -> "T | _Announced[T]":
+        """Return the value, or the descriptor on the class."""
+        if game_state is None:
+            return self
+        value: T = game_state.__dict__[self.private_name]
+        return value
+
+    def __set__(self, game_state: "GameState", value: T) -> None:
+        """Set the value, telling the listeners if it changed."""
+        state = game_state.__dict__
+        if not game_state.listeners:
+            state[self.private_name] = value
+            return
+        if self.private_name in state and state[self.private_name] == value:
+            return
+        state[self.private_name] = value
+        for listener in game_state.listeners:
+            listener(UiStateChanged(self.name, value))
+
+
 class GameState:
-    """Initializing a class to represent the state of the Orchard game."""
+    """
+    Initializing a class to represent the state of the Orchard game.
+
+    Attributes
+    ----------
+        listeners (List[Listener]): Called with every GameEvent, see subscribe.
+
+    """
+
+    die_click_enabled = _Announced[bool]()
+    fruit_click_enabled = _Announced[bool]()
+    replace_text = _Announced[str | None]()
+    pending_fruit_click = _Announced[bool]()
+    stats_flag = _Announced[bool]()
+    wild_odds = _Announced[Dict[int, float]]()
 
     def __init__(self) -> None:
         """Initialize game state with an OrchardDie, RavenTrack, and FruitInventory."""
+        self.listeners = _Listeners()
         self.reset()
 
     def reset(self) -> None:
-        """Reset the game state to initial conditions."""
-        self.orchard_die: OrchardDie = OrchardDie()
-        self.raven_track: RavenTrack = RavenTrack()
-        self.fruit_inventory: FruitInventory = FruitInventory(self.orchard_die)
-        self.die_click_enabled: bool = True
-        self.fruit_click_enabled: bool = False
-        self.replace_text: str | None = None
-        self.pending_fruit_click: bool = False
-        self.stats_flag: bool = False
+        """Reset the game state to initial conditions and announce a GameReset."""
+        self.orchard_die: OrchardDie = OrchardDie(listeners=self.listeners)
+        self.raven_track: RavenTrack = RavenTrack(listeners=self.listeners)
+        self.fruit_inventory: FruitInventory = FruitInventory(
+            self.orchard_die, self.listeners
+        )
+        self.die_click_enabled = True
+        self.fruit_click_enabled = False
+        self.replace_text = None
+        self.pending_fruit_click = False
+        self.stats_flag = False
+        self.wild_odds = {}
+        if not self.listeners:
+            return
+        for listener in self.listeners:
+            listener(GameReset(self.game_status))
+
+    def subscribe(self, listener: Listener) -> Callable[[], None]:
+        """
+        Call listener with every GameEvent of this game.
+
+        Listeners stay subscribed across reset, until the returned function is called.
+        """
+        self.listeners.append(listener)
+        return lambda: self.listeners.remove(listener)
+
+    def set_state(self, fruit: Tuple[int, ...], raven: int) -> None:
+        """Set every fruit count, in fruit ID order, and the raven spaces."""
+        for fruit_id, count in zip(self.fruit_inventory.fruit_inventory, fruit):
+            self.fruit_inventory.set_fruit(fruit_id, count)
+        self.raven_track.spaces = raven
 
     @property
     def game_status(self) -> Tuple[int, ...]:
         """Returns full passable tuple of fruit_inventory and raven_track."""
         status_list = list(self.fruit_inventory.fruit_inventory.values())
-        status_list.append(self.raven_track.spaces)
+        status_list.append(self.raven_track._spaces)
         return tuple(status_list)
 
     def is_game_over(self) -> bool:
         """Check if the game is over."""
-        return self.raven_track.spaces <= 0 or not self.fruit_inventory.check_not_zero()
+        # Read the raven's backing field, this runs on every roll of the simulators
+        return (
+            self.raven_track._spaces <= 0 or not self.fruit_inventory.check_not_zero()
+        )
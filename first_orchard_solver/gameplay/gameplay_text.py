@@ -2,12 +2,191 @@
 Module to handle gameplay for the Orchard Text version of the game.
 
 Includes functions to play the game with different strategies and manage game state.
+
+Besides the interactive game, scripted sessions can be coached without any prompts.
+A script has one session per line, each a whitespace separated list of die rolls from
+the starting state. A wild roll is written as 2:<fruit type chosen>, so
+
+    3 2:5 1 6 2:3
+
+rolls a 3, a wild taking fruit type 5, a raven, a 6 and a wild taking fruit type 3.
+Blank lines and lines starting with # are skipped. Every wild choice is graded against
+the solved odds of all the choices it had and written as one JSON line:
+
+    python -m first_orchard_solver.gameplay.gameplay_text --script games.txt
+
+writes the coaching to stdout, or to a file given with --output. A script of - is
+read from stdin. Without --script the interactive game is played.
 """
 
-import copy
+import argparse
+import json
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, TextIO, Tuple
 
 from first_orchard_solver.gameplay.gamelogic import GameState
-from first_orchard_solver.gameplay.gamesolver import win_perc_comp
+from first_orchard_solver.gameplay.gamesolver import wild_choice_odds
+from first_orchard_solver.gameplay.strategies import Strategy
+
+FIRST_FRUIT = 3  # fruit types are numbered like the die faces, 3 to 6
+ScriptRoll = Tuple[int, int | None]
+
+
+@dataclass(frozen=True)
+class Decision:
+    """
+    Class to hold the coaching for one wild choice.
+
+    Attributes
+    ----------
+        session (int): Index of the session in the script.
+        roll (int): Index of the wild roll in the session.
+        fruit (Tuple[int, ...]): Fruit counts before the choice.
+        raven (int): Raven spaces before the choice.
+        choice (int): Fruit type chosen.
+        odds (Dict[int, float]): Win probability after taking each fruit type left.
+        best_choice (int): Fruit type with the highest win probability.
+
+    """
+
+    session: int
+    roll: int
+    fruit: Tuple[int, ...]
+    raven: int
+    choice: int
+    odds: Dict[int, float]
+    best_choice: int
+
+    @property
+    def player_win(self) -> float:
+        """Win probability after the choice made."""
+        return self.odds[self.choice]
+
+    @property
+    def best_win(self) -> float:
+        """Win probability after the best choice."""
+        return self.odds[self.best_choice]
+
+    @property
+    def regret(self) -> float:
+        """Win probability lost by not making the best choice."""
+        return round(self.best_win - self.player_win, 3)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the decision as a JSON-ready dict."""
+        return {
+            "session": self.session,
+            "roll": self.roll,
+            "fruit": list(self.fruit),
+            "raven": self.raven,
+            "choice": self.choice,
+            "best_choice": self.best_choice,
+            "player_win": self.player_win,
+            "best_win": self.best_win,
+            "regret": self.regret,
+            "odds": {str(fruit): win for fruit, win in self.odds.items()},
+        }
+
+
+def coach_choice(
+    fruit: Tuple[int, ...],
+    raven: int,
+    choice: int,
+    strat: Strategy = "most",
+    session: int = 0,
+    roll: int = 0,
+) -> Decision:
+    """
+    Grade taking fruit type choice on a wild roll against every other choice.
+
+    Raises a ValueError if choice is not a fruit type with any fruit left.
+    """
+    odds = {
+        column + FIRST_FRUIT: win
+        for column, win in wild_choice_odds(fruit, raven, strat).items()
+    }
+    if choice not in odds:
+        raise ValueError(f"Fruit type {choice} has no fruit left in {fruit}.")
+    best_choice = max(odds, key=lambda k: odds[k])
+    return Decision(session, roll, fruit, raven, choice, odds, best_choice)
+
+
+def parse_session(line: str) -> List[ScriptRoll]:
+    """
+    Parse one script line into (die result, fruit type chosen on a wild) rolls.
+
+    Raises a ValueError if a roll is not a die face, or a wild has no choice.
+    """
+    rolls: List[ScriptRoll] = []
+    for token in line.split():
+        face, _, choice = token.partition(":")
+        if not face.isdigit() or not 1 <= int(face) <= 6:
+            raise ValueError(f"Invalid roll {token!r}.")
+        if (int(face) == 2) != bool(choice) or (choice and not choice.isdigit()):
+            raise ValueError(f"Invalid roll {token!r}, only wilds (2) need a choice.")
+        rolls.append((int(face), int(choice) if choice else None))
+    return rolls
+
+
+def coach_session(
+    rolls: Iterable[ScriptRoll],
+    strat: Strategy = "most",
+    session: int = 0,
+    start: Tuple[Tuple[int, ...], int] = ((4, 4, 4, 4), 5),
+) -> Iterator[Decision]:
+    """
+    Play a scripted session and yield the coaching for every wild choice.
+
+    Raises a ValueError if the session goes on after the game is over or a wild takes
+    a fruit type with no fruit left.
+
+    Args:
+    ----
+            rolls (Iterable[ScriptRoll]): (die result, choice) of every roll, choice
+            being the fruit type taken on a wild roll.
+
+            strat (Strategy): Strategy assumed for the rest of the game.
+
+            session (int): Index of the session, copied into every decision.
+
+            start (Tuple[Tuple[int, ...], int]): Starting fruit counts and raven
+            spaces.
+
+    """
+    fruit, raven = list(start[0]), start[1]
+    for roll, (face, choice) in enumerate(rolls):
+        if raven == 0 or not any(fruit):
+            raise ValueError(f"Session {session} goes on after the game is over.")
+        if face == 1:
+            raven -= 1
+        elif face == 2 and choice is not None:
+            yield coach_choice(tuple(fruit), raven, choice, strat, session, roll)
+            fruit[choice - FIRST_FRUIT] -= 1
+        elif fruit[face - FIRST_FRUIT] > 0:
+            fruit[face - FIRST_FRUIT] -= 1
+
+
+def coach_script(lines: Iterable[str], strat: Strategy = "most") -> Iterator[Decision]:
+    """Yield the coaching of every wild choice of every session in a script."""
+    session = 0
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        try:
+            yield from coach_session(parse_session(line), strat, session)
+        except ValueError as error:
+            raise ValueError(f"Line {line_number}: {error}") from error
+        session += 1
+
+
+def write_coaching(decisions: Iterable[Decision], output: TextIO) -> int:
+    """Write every decision as a JSON line and return how many were written."""
+    count = 0
+    for decision in decisions:
+        output.write(json.dumps(decision.as_dict()) + "\n")
+        count += 1
+    return count
 
 
 def play_orchard_text(game_state: GameState) -> None:
@@ -29,18 +208,18 @@ def play_orchard_text(game_state: GameState) -> None:
                             "Enter the fruit type (3-6): "
                         )
                     )
-                    if fruit_choice in game_state.fruit_inventory.fruit_inventory:
-                        game_state_comp = copy.deepcopy(game_state)
-                        game_state_comp.fruit_inventory.most_strat()
-                        user_state = copy.deepcopy(game_state)
-                        user_state.fruit_inventory.decrement_fruit(fruit_choice)
-                        perc_comp = win_perc_comp(game_state_comp, user_state)
+                    if game_state.fruit_inventory.fruit_inventory.get(fruit_choice):
+                        decision = coach_choice(
+                            game_state.fruit_inventory.fruit_values,
+                            game_state.raven_track.spaces,
+                            fruit_choice,
+                        )
                         game_state.fruit_inventory.decrement_fruit(fruit_choice)
                         print(
                             f"You collected fruit type {fruit_choice}. This was "
-                            f"{perc_comp[0]}% worse than the best strategy."
-                            " Your current odds of winning assuming the best"
-                            f" strategy is chosen is {perc_comp[1]}%"
+                            f"{decision.regret * 100:.1f}% worse than the best "
+                            "strategy. Your current odds of winning assuming the "
+                            f"best strategy is chosen is {decision.player_win:.1%}"
                         )
 
                     else:
@@ -53,5 +232,31 @@ def play_orchard_text(game_state: GameState) -> None:
             break
 
 
-game_state = GameState()
-play_orchard_text(game_state)
+def main(argv: List[str] | None = None) -> int:
+    """Coach a script if one is given, otherwise play the interactive game."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--script", help="file of scripted sessions, - for stdin")
+    parser.add_argument("--output", default="-", help="JSONL file, - for stdout")
+    parser.add_argument("--strat", default="most", help="strategy for later wilds")
+    args = parser.parse_args(argv)
+    if args.script is None:
+        play_orchard_text(GameState())
+        return 0
+
+    script = sys.stdin if args.script == "-" else open(args.script)
+    output = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        write_coaching(coach_script(script, args.strat), output)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 1
+    finally:
+        if script is not sys.stdin:
+            script.close()
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
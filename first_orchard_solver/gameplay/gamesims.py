@@ -1,11 +1,35 @@
 """Module to handle game simulations for the Orchard game."""
 
-import copy
-from typing import Callable, List, Literal, Mapping, Tuple
-
-from first_orchard_solver.gameplay.gamelogic import GameState
-
-Strategy = Literal["fewest", "most", "random"]
+import time
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from first_orchard_solver.gameplay.gamelogic import BASE_RULES, GameState, RuleSet
+from first_orchard_solver.gameplay.recorder import (
+    CHOICE_SHIFT,
+    TrajectoryRecorder,
+    encode_event,
+    pack_steps,
+)
+from first_orchard_solver.gameplay.resultstore import ResultStore, SimulationRecord
+from first_orchard_solver.gameplay.simmetrics import (
+    MetricsReporter,
+    ProgressCallback,
+    SimulationMetrics,
+)
+from first_orchard_solver.gameplay.strategies import (
+    Strategy as Strategy,
+    StrategySpec,
+    available_strategies,
+    get_strategy,
+)
+
+MAX_GAME_LENGTH = 200
+CHUNK_GAMES = 1_000_000
 
 
 class GameResults:
@@ -15,31 +39,55 @@ class GameResults:
         """Initialize game results to count raven endings (loss) & fruit ends (wins)."""
         self.raven_end = 0
         self.fruit_end = 0
+        self.stats = GameStats()
 
 
 class MultIterGame:
     """Stores results of multiple game results with particular strategies chosen."""
 
     def __init__(self) -> None:
-        """Initialize the game results with empty lists for different strategies."""
-        self.fewest_strat_runs: List[int] = []
-        self.most_strat_runs: List[int] = []
-        self.random_strat_runs: List[int] = []
+        """Initialize the game results with an empty list per strategy run."""
+        self.strat_runs: Dict[Strategy, List[int]] = {}
+        self.strat_stats: Dict[Strategy, GameStats] = {}
+        self.metrics: SimulationMetrics | None = None
+
+    def runs(self, strat: Strategy) -> List[int]:
+        """Return the list of fruit endings per batch for a strategy."""
+        return self.strat_runs.setdefault(strat, [])
+
+    def stats(self, strat: Strategy) -> "GameStats":
+        """Return the per-game statistics of every game played with a strategy."""
+        return self.strat_stats.setdefault(strat, GameStats())
+
+    @property
+    def fewest_strat_runs(self) -> List[int]:
+        """Fruit endings per batch for the fewest strategy."""
+        return self.runs("fewest")
+
+    @property
+    def most_strat_runs(self) -> List[int]:
+        """Fruit endings per batch for the most strategy."""
+        return self.runs("most")
+
+    @property
+    def random_strat_runs(self) -> List[int]:
+        """Fruit endings per batch for the random strategy."""
+        return self.runs("random")
 
 
 def _choose_strat(
     game_state: GameState, strat: Strategy
 ) -> Tuple[GameState, Callable[[], None]]:
     """Return the strategy from fruit_inventory for simulations and comparisons."""
-    strategies: Mapping[Strategy, Callable[[], None]] = {
-        "fewest": game_state.fruit_inventory.fewest_strat,
-        "most": game_state.fruit_inventory.most_strat,
-        "random": game_state.fruit_inventory.random_strat,
-    }
-    return game_state, strategies[strat]
+    spec = get_strategy(strat)
+    return game_state, partial(spec.scalar, game_state.fruit_inventory)
 
 
-def _play_with_strat(game_state: GameState, strat: Strategy) -> GameState:
+def _play_with_strat(
+    game_state: GameState,
+    strat: Strategy,
+    recorder: TrajectoryRecorder | None = None,
+) -> GameState:
     """
     Play the Orchard game with a specific strategy and return final game state.
 
@@ -59,6 +107,9 @@ def _play_with_strat(game_state: GameState, strat: Strategy) -> GameState:
             Intialiazes to fruit inventory of 4 of each fruit to mimic the start of the
             game if no inventory was given.
 
+            recorder (TrajectoryRecorder | None): If given, the rolls and wild choices
+            of the game are appended to it.
+
     Returns:
     -------
             game_state (GameState): It's game_state includes fruit counts,
@@ -66,20 +117,284 @@ def _play_with_strat(game_state: GameState, strat: Strategy) -> GameState:
 
     """
     game_state, strat_func = _choose_strat(game_state, strat)
+    if recorder is not None:
+        return _play_recorded(game_state, strat_func, recorder)
+    while not game_state.is_game_over():
+        result = game_state.orchard_die.roll()
+        if result == 2:
+            strat_func()
+        elif result == 1:
+            game_state.raven_track.decrement_raven()
+        else:
+            game_state.fruit_inventory.decrement_fruit(result)
+
+    return game_state
+
+
+def _play_recorded(
+    game_state: GameState,
+    strat_func: Callable[[], None],
+    recorder: TrajectoryRecorder,
+) -> GameState:
+    """Play like _play_with_strat and append the rolls and wild choices to recorder."""
+    start_fruit = game_state.fruit_inventory.fruit_values
+    start_raven = game_state.raven_track.spaces
+    events = bytearray()
     while not game_state.is_game_over():
         result = game_state.orchard_die.roll()
         if result == 2:
+            before = game_state.fruit_inventory.fruit_values
             strat_func()
+            after = game_state.fruit_inventory.fruit_values
+            choice = next(i for i, (b, a) in enumerate(zip(before, after)) if b != a)
+            events.append(encode_event(result, choice))
+            continue
         elif result == 1:
             game_state.raven_track.decrement_raven()
         else:
             game_state.fruit_inventory.decrement_fruit(result)
+        events.append(result)
 
+    recorder.record_game(
+        start_fruit, start_raven, bytes(events), game_state.raven_track.spaces > 0
+    )
     return game_state
 
 
+class SimulatedGames(NamedTuple):
+    """
+    Final state of every game played by _simulate_games.
+
+    Attributes
+    ----------
+        fruit (npt.NDArray[np.int64]): (n_games, fruit_types) fruit left.
+        raven (npt.NDArray[np.int64]): Raven spaces left, 0 for a lost game.
+        lengths (npt.NDArray[np.int64]): Number of die rolls in each game.
+        wild_rolls (npt.NDArray[np.int64]): Number of wild rolls in each game.
+        log_weights (npt.NDArray[np.float64]): Log likelihood ratio of each game
+        under the fair die, all 0 unless the die was tilted.
+
+    """
+
+    fruit: npt.NDArray[np.int64]
+    raven: npt.NDArray[np.int64]
+    lengths: npt.NDArray[np.int64]
+    wild_rolls: npt.NDArray[np.int64]
+    log_weights: npt.NDArray[np.float64]
+
+    @property
+    def wins(self) -> npt.NDArray[np.bool_]:
+        """True for every game that ended with the fruit collected."""
+        return self.raven > 0
+
+
+class GameStats:
+    """
+    Fixed-size histograms of per-game statistics, mergeable across runs and workers.
+
+    length_hist counts games by number of die rolls, raven_at_win_hist won games by
+    raven spaces left, fruit_at_loss_hist lost games by total fruit left and
+    wild_rolls_hist games by number of wild rolls.
+
+    Args:
+    ----
+            rules (RuleSet): Sizes the histograms. Defaults to the base game.
+
+            max_length (int): Games with more rolls are counted in the last bin of
+            length_hist. Defaults to MAX_GAME_LENGTH.
+
+    """
+
+    def __init__(
+        self, rules: RuleSet = BASE_RULES, max_length: int = MAX_GAME_LENGTH
+    ) -> None:
+        """Initialize every histogram with zero games."""
+        total_fruit = rules.fruit_types * rules.fruit_per_type
+        self.length_hist = np.zeros(max_length + 1, dtype=np.int64)
+        self.raven_at_win_hist = np.zeros(rules.raven_spaces + 1, dtype=np.int64)
+        self.fruit_at_loss_hist = np.zeros(total_fruit + 1, dtype=np.int64)
+        self.wild_rolls_hist = np.zeros(total_fruit + 1, dtype=np.int64)
+        return None
+
+    @staticmethod
+    def _count(values: npt.NDArray[np.int64], hist: npt.NDArray[np.int64]) -> None:
+        """Add values to a histogram, anything past the end goes in the last bin."""
+        clipped = np.minimum(values, len(hist) - 1)
+        hist += np.bincount(clipped, minlength=len(hist))
+
+    def add(self, games: SimulatedGames) -> None:
+        """Count every game of a vectorized simulation."""
+        wins = games.wins
+        self._count(games.lengths, self.length_hist)
+        self._count(games.raven[wins], self.raven_at_win_hist)
+        self._count(games.fruit[~wins].sum(axis=1), self.fruit_at_loss_hist)
+        self._count(games.wild_rolls, self.wild_rolls_hist)
+
+    def merge(self, other: "GameStats") -> None:
+        """Add the counts of another GameStats with the same histogram sizes."""
+        self.merge_histograms(other.histograms)
+
+    def merge_histograms(self, histograms: Dict[str, npt.NDArray[np.int64]]) -> None:
+        """Add counts given as a dict like the one histograms returns."""
+        for name in vars(self):
+            mine, theirs = getattr(self, name), histograms[name]
+            if mine.shape != theirs.shape:
+                raise ValueError(f"Cannot merge {name} of different sizes.")
+            mine += theirs
+
+    @property
+    def histograms(self) -> Dict[str, npt.NDArray[np.int64]]:
+        """Every histogram by attribute name, e.g. for storing them."""
+        return dict(vars(self))
+
+    @property
+    def n_games(self) -> int:
+        """Total number of games counted."""
+        return int(self.length_hist.sum())
+
+    @property
+    def mean_length(self) -> float:
+        """Average number of die rolls per game (overflowing games count as max)."""
+        return float(self.length_hist @ np.arange(len(self.length_hist))) / max(
+            self.n_games, 1
+        )
+
+
+def _roll_tilted_dice(
+    rng: np.random.Generator, counts: npt.NDArray[np.int64], raven_prob: float
+) -> Tuple[npt.NDArray[np.uint8], npt.NDArray[np.float64]]:
+    """
+    Roll one die per row of counts with the raven face tilted to raven_prob.
+
+    Rolls of colors with no fruit left never change the game, so they are skipped
+    and the wild and remaining colors share 1 - raven_prob evenly. Under the fair
+    die every one of those faces, and the raven, is equally likely.
+
+    Returns
+    -------
+            rolls, log_ratio (Tuple[npt.NDArray[np.uint8], npt.NDArray[np.float64]]):
+            The die faces and the log likelihood ratio of each roll.
+
+    """
+    non_empty = counts > 0
+    useful = non_empty.sum(axis=1) + 1  # the wild and every color with fruit left
+    draws = rng.random(len(counts))
+    is_raven = draws < raven_prob
+    # 0 picks the wild, k picks the k-th color with fruit left
+    pick = ((draws - raven_prob) / (1 - raven_prob) * useful).astype(np.int64)
+    colors = np.argmax(np.cumsum(non_empty, axis=1) >= pick[:, None], axis=1) + 3
+    rolls = np.where(is_raven, 1, np.where(pick == 0, 2, colors)).astype(np.uint8)
+    fair_prob = 1 / (useful + 1)
+    log_ratio = np.where(
+        is_raven,
+        np.log(fair_prob / raven_prob),
+        np.log(fair_prob * useful / (1 - raven_prob)),
+    )
+    return rolls, log_ratio
+
+
+def _simulate_games(
+    fruit_count: Tuple[int, ...],
+    raven_track: int,
+    n_games: int,
+    spec: StrategySpec,
+    rng: np.random.Generator,
+    recorder: TrajectoryRecorder | None = None,
+    raven_prob: float | None = None,
+) -> SimulatedGames:
+    """
+    Play n_games from the same state at once with NumPy and return how they ended.
+
+    Follows the same rules as _play_with_strat: a roll of 1 moves the raven, a roll
+    of 2 is wild and handled by the strategy's vectorized implementation, and any
+    other roll collects that fruit if some is left.
+
+    Args:
+    ----
+            fruit_count (Tuple[int, ...]): Fruit counts of the starting state.
+
+            raven_track (int): Number of spaces left on the Raven Track.
+
+            n_games (int): Number of games to play.
+
+            spec (StrategySpec): Strategy used on wild rolls.
+
+            rng (np.random.Generator): Source of the die rolls.
+
+            recorder (TrajectoryRecorder | None): If given, the rolls and wild choices
+            of every game are appended to it.
+
+            raven_prob (float | None): Tilts the die so the raven is rolled with this
+            chance (see _roll_tilted_dice) and tracks the likelihood ratio of every
+            game. None rolls a fair die. Used for importance sampling.
+
+    Returns:
+    -------
+            games (SimulatedGames): Final fruit, raven, number of rolls, number of
+            wild rolls and log likelihood ratio per game.
+
+    """
+    fruit = np.tile(np.asarray(fruit_count, dtype=np.int64), (n_games, 1))
+    raven = np.full(n_games, raven_track, dtype=np.int64)
+    lengths = np.zeros(n_games, dtype=np.int64)
+    wild_rolls = np.zeros(n_games, dtype=np.int64)
+    log_weights = np.zeros(n_games, dtype=np.float64)
+    faces = fruit.shape[1] + 2
+    active = np.flatnonzero((raven > 0) & (fruit.sum(axis=1) > 0))
+    # When recording, the rolls of each step are kept as-is and regrouped per game
+    # once the batch is over, so recording adds no extra work inside the loop.
+    recording = recorder is not None
+    step_games: List[npt.NDArray[np.intp]] = []
+    step_events: List[npt.NDArray[np.uint8]] = []
+    step = 0
+    while active.size:
+        if raven_prob is None:
+            rolls = rng.integers(1, faces + 1, size=active.size, dtype=np.uint8)
+        else:
+            rolls, log_ratio = _roll_tilted_dice(rng, fruit[active], raven_prob)
+            log_weights[active] += log_ratio
+        raven[active[rolls == 1]] -= 1
+        is_wild, is_color = rolls == 2, rolls > 2
+        wild_rows = active[is_wild]
+        if wild_rows.size:
+            choices = spec.vectorized(fruit[wild_rows], rng)
+            fruit[wild_rows, choices] -= 1
+            wild_rolls[wild_rows] += 1
+            if recording:
+                rolls[is_wild] = 2 | (choices << CHOICE_SHIFT)
+        rows, cols = active[is_color], rolls[is_color] - 3
+        fruit[rows, cols] -= fruit[rows, cols] > 0
+        if recording:
+            step_games.append(active)
+            step_events.append(rolls)
+        step += 1
+        still_playing = (raven[active] > 0) & (fruit[active].sum(axis=1) > 0)
+        lengths[active[~still_playing]] = step
+        active = active[still_playing]
+    if recorder is not None:
+        events = pack_steps(lengths, step_games, step_events)
+        recorder.record_batch(fruit_count, raven_track, events, lengths, raven > 0)
+    return SimulatedGames(fruit, raven, lengths, wild_rolls, log_weights)
+
+
+def _simulate_vectorized(
+    fruit_count: Tuple[int, ...],
+    raven_track: int,
+    n_games: int,
+    spec: StrategySpec,
+    rng: np.random.Generator,
+    recorder: TrajectoryRecorder | None = None,
+) -> npt.NDArray[np.bool_]:
+    """Play n_games with _simulate_games and return which were won."""
+    return _simulate_games(fruit_count, raven_track, n_games, spec, rng, recorder).wins
+
+
 def _run_strat_ntimes(
-    game_state: GameState, n_runs: int, strat: Strategy
+    game_state: GameState,
+    n_runs: int,
+    strat: Strategy,
+    rng: np.random.Generator | None = None,
+    recorder: TrajectoryRecorder | None = None,
 ) -> GameResults:
     """
     Run a specific strategy for a number of iterations and return results.
@@ -96,26 +411,34 @@ def _run_strat_ntimes(
 
             n_runs (int): Number of times to play the game
 
-            strat (str): Indicates which strategy the bot should use. Options are
-            fewest, most, and random. Fewest takes from the fruit type with the
-            least remaining, most from the most, and random chooses a random fruit.
+            strat (str): Name of a registered strategy, e.g. fewest, most, or random.
+            Fewest takes from the fruit type with the least remaining, most from the
+            most, and random chooses a random fruit.
+
+            rng (np.random.Generator | None): Source of the die rolls. A fresh
+            unseeded generator is used if None.
+
+            recorder (TrajectoryRecorder | None): If given, every game is recorded.
 
     Returns:
     -------
             game_results(GameResults): number of fruit endings (wins) vs
-            raven endings (losses).
+            raven endings (losses), and histograms of per-game statistics.
 
     """
+    rng = np.random.default_rng() if rng is None else rng
+    games = _simulate_games(
+        game_state.fruit_inventory.fruit_values,
+        game_state.raven_track.spaces,
+        n_runs,
+        get_strategy(strat),
+        rng,
+        recorder,
+    )
     game_results = GameResults()
-    game_results.raven_end = 0
-    game_results.fruit_end = 0
-    for _ in range(n_runs):
-        state_copy = copy.deepcopy(game_state)
-        _play_with_strat(state_copy, strat)
-        if state_copy.raven_track.spaces == 0:
-            game_results.raven_end += 1
-        else:
-            game_results.fruit_end += 1
+    game_results.fruit_end = int(games.wins.sum())
+    game_results.raven_end = n_runs - game_results.fruit_end
+    game_results.stats.add(games)
     return game_results
 
 
@@ -124,10 +447,19 @@ def run_batches(
     n_runs: int,
     n_times: int,
     strat: List[Strategy] | None = ["most"],
+    seed: int | None = None,
+    recorder: TrajectoryRecorder | None = None,
+    store: ResultStore | None = None,
+    progress: ProgressCallback | None = None,
+    metrics_path: str | Path | None = None,
 ) -> MultIterGame:
     """
     Run multiple iterations of game with different strategies & return results.
 
+    The n_runs * n_times games of a strategy are simulated in vectorized chunks of
+    whole batches, about CHUNK_GAMES games each, which bounds memory use and lets
+    progress be reported after every chunk. Raises a ValueError if n_runs is below 1.
+
     Args:
     ----
             game_state (GameState): Contains the following properties used in this
@@ -143,30 +475,89 @@ def run_batches(
 
             n_times (int): Number of times to run simulation of n_run number of games
 
-            strat (Strategy | None): If none will run all strategies, will also take a
-            list of strategies to run. Will default to largest strategy.
+            strat (Strategy | None): If none will run all registered strategies, will
+            also take a list of strategies to run. Will default to largest strategy.
+
+            seed (int | None): Seed for the die rolls, for reproducible results. Each
+            strategy gets its own stream derived from the seed and its name, so its
+            games do not depend on which other strategies are run.
+
+            recorder (TrajectoryRecorder | None): If given, every simulated game is
+            appended to it. Use one recording per strategy, the index does not store
+            which strategy played a game.
+
+            store (ResultStore | None): If given and the run is seeded, results are
+            looked up there first and new results are saved to it. Stored results are
+            not recorded again.
+
+            progress (ProgressCallback | None): Called with the SimulationMetrics after
+            every chunk and at the end, e.g. to print games/s and the ETA.
+
+            metrics_path (str | Path | None): If given, the metrics are dumped there as
+            JSON every few seconds and at the end.
 
     Returns:
     -------
-            mult_iter_game (MultIterGame): Storage for the simulation results
+            mult_iter_game (MultIterGame): Storage for the simulation results, with
+            per-game statistics of every game played in strat_stats and the
+            throughput of the run in metrics. Games found in the store are not
+            counted in the metrics.
 
 
     """
+    if n_runs < 1:
+        raise ValueError(f"n_runs must be at least 1, got {n_runs}.")
     mult_iter_game = MultIterGame()
-    mult_iter_game.fewest_strat_runs.clear()
-    mult_iter_game.most_strat_runs.clear()
-    mult_iter_game.random_strat_runs.clear()
     if strat is None:
-        strat = ["most", "fewest", "random"]
-    for _ in range(n_times):
-        for s in strat:
-            if s == "fewest":
-                least_run = _run_strat_ntimes(game_state, n_runs, "fewest")
-                mult_iter_game.fewest_strat_runs.append(least_run.fruit_end)
-            elif s == "most":
-                most_run = _run_strat_ntimes(game_state, n_runs, "most")
-                mult_iter_game.most_strat_runs.append(most_run.fruit_end)
-            elif s == "random":
-                random_run = _run_strat_ntimes(game_state, n_runs, "random")
-                mult_iter_game.random_strat_runs.append(random_run.fruit_end)
+        strat = list(available_strategies())
+    fruit_count = game_state.fruit_inventory.fruit_values
+    raven_track = game_state.raven_track.spaces
+    reporter = MetricsReporter(n_runs * n_times * len(strat), progress, metrics_path)
+    batches_per_chunk = max(1, CHUNK_GAMES // n_runs)
+    new_records: List[SimulationRecord] = []
+    for s in strat:
+        if store is not None and seed is not None:
+            record = store.get_simulation(
+                fruit_count, raven_track, s, seed, n_runs, n_times
+            )
+            if record is not None:
+                mult_iter_game.runs(s).extend(record.batch_wins)
+                mult_iter_game.stats(s).merge_histograms(record.histograms)
+                reporter.metrics.total_games -= n_runs * n_times
+                continue
+        rng = np.random.default_rng(None if seed is None else [seed, *s.encode()])
+        for first_batch in range(0, n_times, batches_per_chunk):
+            n_batches = min(batches_per_chunk, n_times - first_batch)
+            start = time.perf_counter()
+            games = _simulate_games(
+                fruit_count,
+                raven_track,
+                n_runs * n_batches,
+                get_strategy(s),
+                rng,
+                recorder,
+            )
+            batch_wins = games.wins.reshape(n_batches, n_runs).sum(axis=1)
+            mult_iter_game.runs(s).extend(int(w) for w in batch_wins)
+            mult_iter_game.stats(s).add(games)
+            reporter.update(
+                n_runs * n_batches,
+                int(games.lengths.sum()),
+                time.perf_counter() - start,
+            )
+        if store is not None and seed is not None:
+            new_records.append(
+                SimulationRecord(
+                    fruit_count,
+                    raven_track,
+                    s,
+                    seed,
+                    n_runs,
+                    tuple(mult_iter_game.runs(s)),
+                    mult_iter_game.stats(s).histograms,
+                )
+            )
+    if store is not None and new_records:
+        store.put_simulations(new_records)
+    mult_iter_game.metrics = reporter.finish()
     return mult_iter_game
@@ -1,11 +1,24 @@
-"""Module to handle game solving for the Orchard game."""
+"""
+Module to handle game solving for the Orchard game.
+
+The solver can be instrumented with profile_solver, which counts cache hits and
+misses, expanded nodes and their depths, the time spent generating successors in
+_decrement_logic and in cache lookups, and the peak size of the win_perc table. When
+no profile is active, the only cost is a few checks per newly solved state.
+"""
 
 import copy
-from functools import lru_cache
-from typing import List, Tuple
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
+from itertools import product
+from typing import Dict, Iterator, List, Tuple
 
 from first_orchard_solver.gameplay.gamelogic import GameState
-from first_orchard_solver.gameplay.gamesims import Strategy, _choose_strat
+from first_orchard_solver.gameplay.gamesims import _choose_strat
+from first_orchard_solver.gameplay.resultstore import ResultStore, SolveRecord
+from first_orchard_solver.gameplay.strategies import Strategy, get_strategy
 from first_orchard_solver.tests.test_gamelogic import _set_state
 
 
@@ -35,9 +48,11 @@ def _win_perc_return_logic(game_state: GameState) -> Tuple[int, int] | None:
     return None
 
 
-def _decrement_logic(game_state: GameState, strat: Strategy) -> List[GameState]:
+def _decrement_logic(
+    game_state: GameState, strat: Strategy
+) -> List[Tuple[GameState, float]]:
     """
-    Generate all single-roll outcomes from this state.
+    Generate all single-roll outcomes from this state with their weights.
 
     Args:
     ----
@@ -46,39 +61,216 @@ def _decrement_logic(game_state: GameState, strat: Strategy) -> List[GameState]:
 
             ---raven_track (int): Number of spaces left on the Raven Track.
 
-            strat (Strategy): String representation of the strategy to be used.
+            strat (Strategy): String representation of the strategy to be used. If
+            the registered strategy has an analytic form, the wild side is split into
+            one outcome per fruit it may choose.
 
     Returns:
     -------
-            moves (list): A list of next states as (fruit1, fruit2, fruit3,
-            fruit4, spaces).
+            moves (list): A list of (next state, weight) pairs. Every valid die side
+            has a weight of 1, split across the outcomes of an analytic wild side.
 
     """
-    game_states = []
+    game_states: List[Tuple[GameState, float]] = []
+    fruit_inventory = game_state.fruit_inventory.fruit_inventory
 
     # Sides 1–4: fruit colors
-    for i in game_state.fruit_inventory.fruit_inventory.keys():
-        if game_state.fruit_inventory.fruit_inventory[i] > 0:
+    for i in fruit_inventory.keys():
+        if fruit_inventory[i] > 0:
             new_state = copy.deepcopy(game_state)
             new_state.fruit_inventory.decrement_fruit(i)
-            game_states.append(new_state)
+            game_states.append((new_state, 1.0))
 
     # Side 5: raven
     if game_state.raven_track.spaces > 0:
         new_state = copy.deepcopy(game_state)
         new_state.raven_track.decrement_raven()
-        game_states.append(new_state)
+        game_states.append((new_state, 1.0))
 
     # Side 6: wild/strategy
     if any(game_state.fruit_inventory.fruit_values):
-        new_state = copy.deepcopy(game_state)
-        _, strat_func_copy = _choose_strat(new_state, strat)
-        strat_func_copy()
-        game_states.append(new_state)
+        analytic = get_strategy(strat).analytic
+        if analytic is None:
+            new_state = copy.deepcopy(game_state)
+            _, strat_func_copy = _choose_strat(new_state, strat)
+            strat_func_copy()
+            game_states.append((new_state, 1.0))
+        else:
+            # Fruit colors are interchangeable, so choices that leave the same fruit
+            # counts (in any order) are merged into a single weighted outcome.
+            wild_states: Dict[Tuple[int, ...], Tuple[GameState, float]] = {}
+            choice_probs = analytic(game_state.fruit_inventory.fruit_values)
+            for i, choice_prob in zip(fruit_inventory.keys(), choice_probs):
+                if choice_prob > 0:
+                    new_state = copy.deepcopy(game_state)
+                    new_state.fruit_inventory.decrement_fruit(i)
+                    key = tuple(sorted(new_state.fruit_inventory.fruit_values))
+                    first_state, weight = wild_states.get(key, (new_state, 0.0))
+                    wild_states[key] = (first_state, weight + choice_prob)
+            game_states.extend(wild_states.values())
 
     return game_states
 
 
+@dataclass
+class SolverProfile:
+    """
+    Class to hold the counters collected by profile_solver.
+
+    Attributes
+    ----------
+        cache_hits (int): win_perc calls answered by the cache.
+        cache_misses (int): win_perc calls that solved a new state.
+        expansions (int): States expanded with _decrement_logic (non-final misses).
+        children (int): Successor states generated by those expansions.
+        depth_hist (Dict[int, int]): Expansions by recursion depth, 0 being the
+        first state solved in the profile.
+        peak_table_size (int): Largest number of states in the win_perc cache.
+        successor_time (float): Seconds spent in _decrement_logic.
+        cache_hit_time (float): Seconds spent in win_perc calls answered by the cache
+        during the recursion.
+        total_time (float): Seconds from the start to the end of the profile.
+
+    """
+
+    cache_hits: int = 0
+    cache_misses: int = 0
+    expansions: int = 0
+    children: int = 0
+    depth_hist: Dict[int, int] = field(default_factory=dict)
+    peak_table_size: int = 0
+    successor_time: float = 0.0
+    cache_hit_time: float = 0.0
+    total_time: float = 0.0
+    _depth: int = field(default=0, repr=False)
+    _start: Tuple[int, int, float] = field(default=(0, 0, 0.0), repr=False)
+
+    @property
+    def calls(self) -> int:
+        """Total number of win_perc calls."""
+        return self.cache_hits + self.cache_misses
+
+    @property
+    def max_depth(self) -> int:
+        """Deepest recursion level that expanded a state."""
+        return max(self.depth_hist, default=0)
+
+    @property
+    def other_time(self) -> float:
+        """Seconds not spent generating successors or in cache hits."""
+        return self.total_time - self.successor_time - self.cache_hit_time
+
+
+_active_profile: SolverProfile | None = None
+
+
+def start_profiling() -> SolverProfile:
+    """
+    Start collecting solver counters into a new SolverProfile and return it.
+
+    Raises a RuntimeError if a profile is already active. Prefer profile_solver,
+    which always stops the profile.
+    """
+    global _active_profile
+    if _active_profile is not None:
+        raise RuntimeError("A solver profile is already active.")
+    cache_info = win_perc.cache_info()
+    profile = SolverProfile(peak_table_size=cache_info.currsize)
+    profile._start = (cache_info.hits, cache_info.misses, time.perf_counter())
+    _active_profile = profile
+    return profile
+
+
+def stop_profiling() -> SolverProfile:
+    """Stop the active profile, fill in its totals and return it."""
+    global _active_profile
+    profile = _active_profile
+    if profile is None:
+        raise RuntimeError("No solver profile is active.")
+    _active_profile = None
+    cache_info = win_perc.cache_info()
+    start_hits, start_misses, start_time = profile._start
+    profile.cache_hits = cache_info.hits - start_hits
+    profile.cache_misses = cache_info.misses - start_misses
+    profile.peak_table_size = max(profile.peak_table_size, cache_info.currsize)
+    profile.total_time = time.perf_counter() - start_time
+    return profile
+
+
+@contextmanager
+def profile_solver() -> Iterator[SolverProfile]:
+    """
+    Profile every win_perc call made inside a with block.
+
+    Example:
+    -------
+        with profile_solver() as profile:
+            win_perc((4, 4, 4, 4), 5, "most")
+        print(profile.expansions, profile.max_depth, profile.successor_time)
+
+    """
+    profile = start_profiling()
+    try:
+        yield profile
+    finally:
+        stop_profiling()
+
+
+def _timed_win_perc(
+    profile: SolverProfile,
+    fruit_count: Tuple[int, ...],
+    raven_track: int,
+    strat: Strategy,
+) -> Tuple[float, float]:
+    """Call win_perc, adding its time to profile if the cache answered it."""
+    misses = win_perc.cache_info().misses
+    start = time.perf_counter()
+    result = win_perc(fruit_count, raven_track, strat)
+    if win_perc.cache_info().misses == misses:
+        profile.cache_hit_time += time.perf_counter() - start
+    return result
+
+
+def _expand_win_perc(game_state: GameState, strat: Strategy) -> Tuple[float, float]:
+    """
+    Return the weighted mean of win_perc over every outcome of one roll.
+
+    The expansion is counted and timed into the active profile, if there is one.
+    """
+    profile = _active_profile
+    lookup = win_perc if profile is None else partial(_timed_win_perc, profile)
+    if profile is not None:
+        profile.expansions += 1
+        depth_hist = profile.depth_hist
+        depth_hist[profile._depth] = depth_hist.get(profile._depth, 0) + 1
+        profile.peak_table_size = max(
+            profile.peak_table_size, win_perc.cache_info().currsize
+        )
+        start = time.perf_counter()
+    moves = _decrement_logic(game_state, strat)
+    if profile is not None:
+        profile.successor_time += time.perf_counter() - start
+        profile.children += len(moves)
+        profile._depth += 1
+
+    win = 0.0
+    loss = 0.0
+    total_weight = 0.0
+    try:
+        for move, move_weight in moves:
+            win_instance, loss_instance = lookup(
+                move.fruit_inventory.fruit_values, move.raven_track.spaces, strat
+            )
+            win += move_weight * win_instance
+            loss += move_weight * loss_instance
+            total_weight += move_weight
+    finally:
+        if profile is not None:
+            profile._depth -= 1
+
+    return round(win / total_weight, 3), round(loss / total_weight, 3)
+
+
 @lru_cache(maxsize=None)
 def win_perc(
     fruit_count: Tuple[int, int, int, int], raven_track: int, strat: Strategy
@@ -92,7 +284,8 @@ def win_perc(
     ----
         fruit_count (Tuple[int, int, int, int]): counts of the various fruits
         raven_track (int): Number of spaces left on the raven track
-        strat (str): The strategy to use for fruit selection. Defaults to "largest".
+        strat (str): Name of a registered strategy to use for fruit selection.
+        Strategies with an analytic form, such as "random", are solved exactly.
 
     Returns:
     -------
@@ -106,17 +299,75 @@ def win_perc(
 
     if end_game_check is not None:  # game is over
         return end_game_check
-    moves = _decrement_logic(game_state, strat)
-    win = 0.0
-    loss = 0.0
-    for move in moves:
-        win_instance, loss_instance = win_perc(
-            move.fruit_inventory.fruit_values, move.raven_track.spaces, strat
-        )
-        win += win_instance
-        loss += loss_instance
+    return _expand_win_perc(game_state, strat)
 
-    return round(win / len(moves), 3), round(loss / len(moves), 3)
+
+def wild_choice_odds(
+    fruit_count: Tuple[int, ...], raven_track: int, strat: Strategy = "most"
+) -> Dict[int, float]:
+    """
+    Return the win probability after each fruit that can be taken on a wild roll.
+
+    Args:
+    ----
+        fruit_count (Tuple[int, ...]): counts of the various fruits
+        raven_track (int): Number of spaces left on the raven track
+        strat (str): Strategy assumed for the wild rolls after this one.
+
+    Returns:
+    -------
+        Dict[int, float]: Win probability by the index of the fruit taken, for every
+        fruit with any left.
+
+    """
+    odds = {}
+    for column, count in enumerate(fruit_count):
+        if count > 0:
+            after = list(fruit_count)
+            after[column] -= 1
+            odds[column] = win_perc(tuple(after), raven_track, strat)[0]
+    return odds
+
+
+def win_perc_stored(
+    fruit_count: Tuple[int, int, int, int],
+    raven_track: int,
+    strat: Strategy,
+    store: ResultStore,
+) -> Tuple[float, float]:
+    """
+    Return win_perc of a state from the store, solving and storing it if missing.
+
+    A solve fills the win_perc cache for every state with no more fruit of any color
+    and no more raven spaces, so all of those are stored in one bulk insert and later
+    lookups of them are answered by the store.
+
+    Args:
+    ----
+        fruit_count (Tuple[int, int, int, int]): counts of the various fruits
+        raven_track (int): Number of spaces left on the raven track
+        strat (str): Name of a registered strategy to use for fruit selection.
+        store (ResultStore): Store to look the result up in and save it to.
+
+    Returns:
+    -------
+        tuple[float, float]: A tuple containing win probability and loss probability.
+
+    """
+    stored = store.get_solve(fruit_count, raven_track, strat)
+    if stored is not None:
+        return stored
+    result = win_perc(fruit_count, raven_track, strat)
+    sub_states = product(
+        *(range(count + 1) for count in fruit_count), range(raven_track + 1)
+    )
+    store.put_solves(
+        SolveRecord(
+            state[:-1], state[-1], strat, *win_perc(state[:-1], state[-1], strat)
+        )
+        for state in sub_states
+    )
+    return result
 
 
 def win_perc_comp(
@@ -0,0 +1,130 @@
+"""
+Module for importance sampling simulations of the Orchard game.
+
+Plain Monte Carlo needs a huge number of games to estimate probabilities close to 0
+or 1, e.g. losing with the raven 5 spaces away and a single fruit left. Importance
+sampling plays the games with a die that is biased toward the rare outcome and
+reweights every game by the likelihood ratio of its rolls under the fair die.
+
+Only the raven face is biased. Rolls of colors with no fruit left are skipped, since
+they never change the game, and the wild and remaining colors share the rest of the
+probability evenly. See _roll_tilted_dice in gamesims.py.
+"""
+
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+
+from first_orchard_solver.gameplay.gamelogic import GameState
+from first_orchard_solver.gameplay.gamesims import _simulate_games
+from first_orchard_solver.gameplay.strategies import Strategy, get_strategy
+
+MIN_RAVEN_PROB = 0.01
+MAX_RAVEN_PROB = 0.99
+
+
+@dataclass(frozen=True)
+class ImportanceResults:
+    """
+    Class to hold the results of an importance sampling run.
+
+    Attributes
+    ----------
+        win_prob (float): Estimated probability of collecting all the fruit.
+        loss_prob (float): Estimated probability of the raven reaching the end.
+        win_std_err (float): Standard error of win_prob.
+        loss_std_err (float): Standard error of loss_prob.
+        effective_sample_size (float): Kish effective sample size of the weights, the
+        number of fair-die games the run is roughly worth.
+        n_games (int): Number of games played.
+        raven_prob (float): Chance of rolling the raven on the biased die.
+
+    """
+
+    win_prob: float
+    loss_prob: float
+    win_std_err: float
+    loss_std_err: float
+    effective_sample_size: float
+    n_games: int
+    raven_prob: float
+
+
+def balanced_raven_prob(fruit_count: Tuple[int, ...], raven_track: int) -> float:
+    """
+    Return the raven chance that makes winning and losing about equally likely.
+
+    With raven chance q every other roll collects a fruit, so collecting all F fruit
+    takes about F / (1 - q) rolls, during which the raven moves about q * F / (1 - q)
+    spaces. Setting that equal to the raven spaces R gives q = R / (F + R).
+    """
+    total = sum(fruit_count) + raven_track
+    if total == 0:
+        return MIN_RAVEN_PROB
+    return min(max(raven_track / total, MIN_RAVEN_PROB), MAX_RAVEN_PROB)
+
+
+def run_importance_sampling(
+    game_state: GameState,
+    n_games: int,
+    strat: Strategy = "most",
+    raven_prob: float | None = None,
+    seed: int | None = None,
+) -> ImportanceResults:
+    """
+    Estimate win and loss probabilities from a state with a biased die.
+
+    Args:
+    ----
+            game_state (GameState): Contains the following properties used in this
+            function
+
+            ---raven_track (int): Number of spaces left on the Raven Track
+
+            ---fruit_inventory (dict[int, int]): dict of fruit types and their counts.
+
+            n_games (int): Number of games to play.
+
+            strat (Strategy): Name of a registered strategy. Defaults to "most".
+
+            raven_prob (float | None): Chance of rolling the raven on the biased die.
+            Defaults to balanced_raven_prob, which suits both near-certain wins and
+            near-certain losses.
+
+            seed (int | None): Seed for the die rolls, for reproducible results.
+
+    Returns:
+    -------
+            results (ImportanceResults): Reweighted estimates, their standard errors
+            and the effective sample size.
+
+    """
+    fruit_count = game_state.fruit_inventory.fruit_values
+    raven_track = game_state.raven_track.spaces
+    if raven_prob is None:
+        raven_prob = balanced_raven_prob(fruit_count, raven_track)
+    if not 0 < raven_prob < 1:
+        raise ValueError(f"raven_prob must be between 0 and 1, got {raven_prob}.")
+
+    games = _simulate_games(
+        fruit_count,
+        raven_track,
+        n_games,
+        get_strategy(strat),
+        np.random.default_rng(seed),
+        raven_prob=raven_prob,
+    )
+    weights = np.exp(games.log_weights)
+
+    win_weights = np.where(games.wins, weights, 0.0)
+    loss_weights = weights - win_weights
+    return ImportanceResults(
+        win_prob=float(win_weights.mean()),
+        loss_prob=float(loss_weights.mean()),
+        win_std_err=float(win_weights.std(ddof=1) / np.sqrt(n_games)),
+        loss_std_err=float(loss_weights.std(ddof=1) / np.sqrt(n_games)),
+        effective_sample_size=float(weights.sum() ** 2 / np.sum(weights**2)),
+        n_games=n_games,
+        raven_prob=raven_prob,
+    )
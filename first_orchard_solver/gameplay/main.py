@@ -5,6 +5,7 @@ import pygame
 from first_orchard_solver.gameplay import eventhandler as eh
 from first_orchard_solver.gameplay import rend_static as static
 from first_orchard_solver.gameplay.context import init_game_context, unpack_game_context
+from first_orchard_solver.gameplay.framescheduler import FrameScheduler
 
 
 def play_orchard_screen() -> None:
@@ -12,7 +13,9 @@ def play_orchard_screen() -> None:
     game_context = init_game_context()
     assets, background, screen, game_state = unpack_game_context(game_context)
     static.draw_background(game_context)
-    clock = pygame.time.Clock()
+    screen.blit(background, assets.POSITIONS.SCREEN_POS)
+    pygame.display.flip()
+    scheduler = FrameScheduler()
     running = True
     color = None
     idx = None
@@ -28,27 +31,18 @@ def play_orchard_screen() -> None:
             game_state.fruit_click_enabled = True
             game_state.pending_fruit_click = False
 
-        screen.blit(background, assets.POSITIONS.SCREEN_POS)
-
-        for event in pygame.event.get():
+        for event in scheduler.wait_events():
             if event.type == pygame.QUIT:
                 running = False
 
+            if event.type == pygame.WINDOWEXPOSED:
+                pygame.display.flip()
+
             # --------- DIE ROLL ---------
             if event.type == pygame.MOUSEBUTTONUP and game_state.die_click_enabled:
                 if assets.RECTANGLES.ROLL_BUTTON_RECT.collidepoint(event.pos):
                     game_state.orchard_die.roll()
-                    game_state.stats_flag = False
-
-                    if game_state.orchard_die.die_result == 1:
-                        eh.die_results_raven(game_context)
-
-                    elif game_state.orchard_die.die_result == 2:
-                        eh.die_results_wild(game_context)
-
-                    else:
-                        color = eh.die_results_color(game_context)
-                        game_state.replace_text = None
+                    color = eh.apply_die_result(game_context)
 
             # --------- FRUIT PICK ---------
             if event.type == pygame.MOUSEBUTTONDOWN and game_state.fruit_click_enabled:
@@ -60,11 +54,18 @@ def play_orchard_screen() -> None:
 
             # --------- RESTART GAME ---------
             if event.type == pygame.MOUSEBUTTONDOWN and game_state.is_game_over():
-                yes_surface = assets.RESTART_FONT.render(
-                    assets.TEXT.RESTART_TEXT_YES, True, assets.COLORS.BLACK
+                text_cache = game_context.text_cache
+                yes_surface = text_cache.render(
+                    assets.RESTART_FONT,
+                    assets.TEXT.RESTART_TEXT_YES,
+                    True,
+                    assets.COLORS.BLACK,
                 )
-                no_surface = assets.RESTART_FONT.render(
-                    assets.TEXT.RESTART_TEXT_NO, True, assets.COLORS.BLACK
+                no_surface = text_cache.render(
+                    assets.RESTART_FONT,
+                    assets.TEXT.RESTART_TEXT_NO,
+                    True,
+                    assets.COLORS.BLACK,
                 )
                 assets.RECTANGLES.RESTART_BOX_YES = yes_surface.get_rect(
                     topleft=assets.POSITIONS.RESTART_POS_YES
@@ -73,14 +74,16 @@ def play_orchard_screen() -> None:
                     topleft=assets.POSITIONS.RESTART_POS_NO
                 )
                 if assets.RECTANGLES.RESTART_BOX_YES.collidepoint(event.pos):
-                    play_orchard_screen()  # restart game
+                    eh.restart_game(game_context)
+                    color = None
+                    idx = None
                     continue
                 elif assets.RECTANGLES.RESTART_BOX_NO.collidepoint(event.pos):
                     static.final_message_loop(game_context)
 
         # --------- DRAWING ---------
         eh.draw_all_screen(game_context, color, idx)
-        clock.tick(60)
+        scheduler.end_frame()
 
     pygame.quit()
 
@@ -0,0 +1,226 @@
+"""
+Module to solve large rule sets of the Orchard game on several cores.
+
+evaluate_policies in policyeval.py solves states in layers of equal (total fruit +
+spaces). Every roll removes a fruit or moves the raven, so a state only depends on the
+layer right below it, and all states of a layer can be solved at the same time. Here
+each layer, the wavefront, is split into chunks solved by a pool of processes.
+
+The choice tables, the values and the order the states are solved in live in
+multiprocessing.shared_memory buffers that every worker maps once when it starts, so
+only chunk bounds are sent to the workers and nothing is pickled per layer. Layers
+smaller than PARALLEL_MIN_STATES are solved in the main process, where a round trip
+to the pool would cost more than the work.
+
+The results are the same as evaluate_policies and expected_lengths, to the last bit,
+for any number of workers.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from types import TracebackType
+from typing import Any, Dict, List, Sequence, Tuple, Type
+
+import numpy as np
+import numpy.typing as npt
+
+from first_orchard_solver.gameplay.gamelogic import BASE_RULES, RuleSet
+from first_orchard_solver.gameplay.policyeval import (
+    ChoiceProbs,
+    Policy,
+    _solve_layers,
+    _solve_states,
+    _stack_tables,
+    state_grid,
+)
+
+PARALLEL_MIN_STATES = 4096
+CHUNKS_PER_WORKER = 2
+
+ArraySpec = Tuple[str, Tuple[int, ...], str]
+
+# Shared arrays and solve settings of a worker process, set by _init_worker
+_worker: Dict[str, Any] = {}
+
+
+class SharedArrays:
+    """
+    Holds NumPy arrays in named shared memory blocks for a pool of processes.
+
+    The blocks are created by the owner and unlinked when it is closed. Views handed
+    out by add must not outlive close.
+    """
+
+    def __init__(self) -> None:
+        """Start with no arrays."""
+        self.arrays: Dict[str, npt.NDArray[Any]] = {}
+        self.specs: Dict[str, ArraySpec] = {}
+        self._blocks: List[shared_memory.SharedMemory] = []
+        return None
+
+    def add(self, key: str, array: npt.NDArray[Any]) -> npt.NDArray[Any]:
+        """Copy an array into a new shared block and return the shared view."""
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self._blocks.append(block)
+        view: npt.NDArray[Any] = np.ndarray(array.shape, array.dtype, block.buf)
+        view[...] = array
+        self.arrays[key] = view
+        self.specs[key] = (block.name, array.shape, array.dtype.str)
+        return view
+
+    @staticmethod
+    def attach(
+        specs: Dict[str, ArraySpec],
+    ) -> Tuple[Dict[str, npt.NDArray[Any]], List[shared_memory.SharedMemory]]:
+        """Map the blocks of another process's SharedArrays, without owning them."""
+        arrays: Dict[str, npt.NDArray[Any]] = {}
+        blocks = []
+        for key, (name, shape, dtype) in specs.items():
+            block = shared_memory.SharedMemory(name=name)
+            blocks.append(block)
+            arrays[key] = np.ndarray(shape, np.dtype(dtype), block.buf)
+        return arrays, blocks
+
+    def close(self) -> None:
+        """Drop the views and free every shared block."""
+        self.arrays.clear()
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks.clear()
+
+    def __enter__(self) -> "SharedArrays":
+        """Return the arrays for use in a with block."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Free the shared blocks when leaving a with block."""
+        self.close()
+
+
+def _init_worker(specs: Dict[str, ArraySpec], rules: RuleSet, roll_cost: float) -> None:
+    """Map the shared arrays once per worker process."""
+    arrays, blocks = SharedArrays.attach(specs)
+    _worker.update(arrays, blocks=blocks, rules=rules, roll_cost=roll_cost)
+    _worker["wild_faces"] = np.full(
+        len(arrays["tables"]), rules.wild_faces, dtype=np.int64
+    )
+
+
+def _solve_chunk(start: int, stop: int) -> int:
+    """Solve the states order[start:stop] of one layer in a worker process."""
+    rules: RuleSet = _worker["rules"]
+    states = _worker["order"][start:stop]
+    counts = np.stack(np.unravel_index(states, rules.shape)[:-1], axis=1)
+    _solve_states(
+        _worker["values"],
+        _worker["tables"],
+        states,
+        counts,
+        rules,
+        _worker["roll_cost"],
+        _worker["wild_faces"],
+    )
+    return stop - start
+
+
+def _solve_layers_parallel(
+    policies: Sequence[Policy] | ChoiceProbs,
+    rules: RuleSet,
+    won_value: float,
+    roll_cost: float,
+    workers: int | None,
+) -> npt.NDArray[np.float64]:
+    """Solve a value for every state like _solve_layers, each layer on the pool."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return _solve_layers(policies, rules, won_value, roll_cost)
+    counts, raven = state_grid(rules)
+    fruit_left = counts.sum(axis=1)
+    live = (raven > 0) & (fruit_left > 0)
+    tables = _stack_tables(policies, rules, counts, live)
+    values = np.zeros((len(tables), len(raven)), dtype=np.float64)
+    values[:, (raven > 0) & (fruit_left == 0)] = won_value
+    wild_faces = np.full(len(tables), rules.wild_faces, dtype=np.int64)
+
+    layer = fruit_left + raven
+    order = np.flatnonzero(live)
+    order = order[np.argsort(layer[order], kind="stable")]
+    bounds = np.searchsorted(layer[order], np.arange(1, int(layer.max()) + 2))
+
+    with SharedArrays() as shared:
+        shared.add("tables", tables)
+        shared.add("values", values)
+        shared.add("order", order)
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(shared.specs, rules, roll_cost),
+        ) as executor:
+            for start, stop in zip(bounds[:-1], bounds[1:]):
+                if stop - start < PARALLEL_MIN_STATES:
+                    states = order[start:stop]
+                    _solve_states(
+                        shared.arrays["values"],
+                        shared.arrays["tables"],
+                        states,
+                        counts[states],
+                        rules,
+                        roll_cost,
+                        wild_faces,
+                    )
+                    continue
+                cuts = np.linspace(start, stop, workers * CHUNKS_PER_WORKER + 1)
+                chunks = cuts.astype(np.int64)
+                futures = [
+                    executor.submit(_solve_chunk, int(a), int(b))
+                    for a, b in zip(chunks[:-1], chunks[1:])
+                    if b > a
+                ]
+                # The next layer reads this one, so wait for every chunk
+                for future in futures:
+                    future.result()
+        values[...] = shared.arrays["values"]
+    return values.reshape(len(tables), *rules.shape)
+
+
+def evaluate_policies_parallel(
+    policies: Sequence[Policy] | ChoiceProbs,
+    rules: RuleSet = BASE_RULES,
+    workers: int | None = None,
+) -> npt.NDArray[np.float64]:
+    """
+    Compute the exact win probability of every state like evaluate_policies.
+
+    Args:
+    ----
+            policies (Sequence[Policy] | ChoiceProbs): Policies to evaluate, see
+            evaluate_policies.
+
+            rules (RuleSet): Size of the game. Defaults to the base game.
+
+            workers (int | None): Number of processes. Defaults to the number of
+            CPUs, 1 solves in this process.
+
+    Returns:
+    -------
+            win_probs (npt.NDArray[np.float64]): (B, *rules.shape) win probability of
+            every state under each policy, indexed like GameState.game_status.
+
+    """
+    return _solve_layers_parallel(policies, rules, 1.0, 0.0, workers)
+
+
+def expected_lengths_parallel(
+    policies: Sequence[Policy] | ChoiceProbs,
+    rules: RuleSet = BASE_RULES,
+    workers: int | None = None,
+) -> npt.NDArray[np.float64]:
+    """Compute the expected rolls left in every state like expected_lengths."""
+    return _solve_layers_parallel(policies, rules, 0.0, 1.0, workers)
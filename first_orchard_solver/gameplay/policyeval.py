@@ -0,0 +1,383 @@
+"""
+Module to evaluate any wild-roll policy exactly over every state of the Orchard game.
+
+The recursive solver in gamesolver.py only knows the registered strategies and solves
+one state at a time. Here a policy gives, for every state, the probability of choosing
+each fruit on a wild roll, and the win probability of every state is computed bottom
+up with NumPy. Fruit colors are not assumed to be interchangeable, so policies like
+"always pick the favorite color" are evaluated exactly.
+
+A policy can be given as:
+
+    a table of shape (*rules.shape, fruit_types) with choice probabilities,
+
+    a PolicyFunc mapping (N, fruit_types) fruit counts and (N,) raven spaces to
+    (N, fruit_types) choice probabilities,
+
+    or the name of a registered strategy.
+
+Several policies, e.g. a sweep over a mixing probability, are evaluated together in
+a single batched pass by evaluate_policies.
+"""
+
+from typing import Callable, List, Sequence, Tuple, TypeAlias
+
+import numpy as np
+import numpy.typing as npt
+
+from first_orchard_solver.gameplay.gamelogic import BASE_RULES, RuleSet
+from first_orchard_solver.gameplay.strategies import Strategy, get_strategy
+
+ChoiceProbs: TypeAlias = npt.NDArray[np.float64]
+PolicyFunc: TypeAlias = Callable[
+    [npt.NDArray[np.int64], npt.NDArray[np.int64]], ChoiceProbs
+]
+Policy: TypeAlias = ChoiceProbs | PolicyFunc | Strategy
+
+_PROB_TOLERANCE = 1e-9
+
+
+def state_grid(
+    rules: RuleSet = BASE_RULES,
+) -> Tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+    """
+    Return every state of the rule set in table order.
+
+    Returns
+    -------
+            counts, raven (Tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]):
+            (S, fruit_types) fruit counts and (S,) raven spaces, where state i is
+            entry i of a flattened (*rules.shape) table.
+
+    """
+    grid = np.indices(rules.shape).reshape(len(rules.shape), -1).T
+    return grid[:, :-1].astype(np.int64), grid[:, -1].astype(np.int64)
+
+
+def policy_table(policy: Policy, rules: RuleSet = BASE_RULES) -> ChoiceProbs:
+    """
+    Convert any form of policy into a (*rules.shape, fruit_types) table.
+
+    Registered strategies use their analytic form if they have one, deterministic
+    strategies choose their vectorized pick with probability 1. States with no fruit
+    left have all-zero rows.
+    """
+    if isinstance(policy, np.ndarray):
+        return policy
+    counts, raven = state_grid(rules)
+    table = np.zeros((len(raven), rules.fruit_types), dtype=np.float64)
+    live = np.flatnonzero(counts.sum(axis=1) > 0)
+    if isinstance(policy, str):
+        spec = get_strategy(policy)
+        if spec.analytic is not None:
+            # The choice only depends on the fruit, so the analytic form is called
+            # once per fruit count, not once per state, and repeated over the raven
+            fruit_counts = counts[:: rules.raven_spaces + 1]
+            fruit_table = np.zeros((len(fruit_counts), rules.fruit_types))
+            fruit_live = np.flatnonzero(fruit_counts.sum(axis=1) > 0)
+            fruit_table[fruit_live] = [
+                spec.analytic(tuple(row)) for row in fruit_counts[fruit_live].tolist()
+            ]
+            table = np.repeat(fruit_table, rules.raven_spaces + 1, axis=0)
+        else:
+            choices = spec.vectorized(counts[live], np.random.default_rng(0))
+            table[live, choices] = 1.0
+    else:
+        table[live] = policy(counts[live], raven[live])
+    return table.reshape(*rules.shape, rules.fruit_types)
+
+
+def mix_policies(
+    first: Policy,
+    second: Policy,
+    probs: Sequence[float],
+    rules: RuleSet = BASE_RULES,
+) -> ChoiceProbs:
+    """
+    Stack the mixes "first with probability p, else second" for every p in probs.
+
+    Returns
+    -------
+            tables (ChoiceProbs): (len(probs), *rules.shape, fruit_types) tables,
+            ready for evaluate_policies.
+
+    """
+    first_table = policy_table(first, rules)
+    second_table = policy_table(second, rules)
+    p = np.asarray(probs, dtype=np.float64).reshape(-1, *([1] * first_table.ndim))
+    mixed: ChoiceProbs = p * first_table + (1 - p) * second_table
+    return mixed
+
+
+def favorite_color_policy(color: int) -> PolicyFunc:
+    """
+    Return a policy that always picks one fruit column while it has fruit left.
+
+    Once the favorite is gone it falls back to the fruit with the most remaining.
+    """
+
+    def favorite(
+        counts: npt.NDArray[np.int64], raven: npt.NDArray[np.int64]
+    ) -> ChoiceProbs:
+        choices = np.where(counts[:, color] > 0, color, np.argmax(counts, axis=1))
+        probs = np.zeros(counts.shape, dtype=np.float64)
+        probs[np.arange(len(counts)), choices] = 1.0
+        return probs
+
+    return favorite
+
+
+def _check_tables(
+    tables: ChoiceProbs, counts: npt.NDArray[np.int64], live: npt.NDArray[np.bool_]
+) -> None:
+    """Raise a ValueError unless every live row is a distribution over fruit left."""
+    if np.any(tables < -_PROB_TOLERANCE):
+        raise ValueError("Policy tables contain negative probabilities.")
+    if np.any(tables[:, counts == 0] > _PROB_TOLERANCE):
+        raise ValueError("Policy chooses a fruit with none left.")
+    if not np.allclose(tables[:, live].sum(axis=-1), 1.0):
+        raise ValueError("Policy choice probabilities do not sum to 1.")
+
+
+def _stack_tables(
+    policies: Sequence[Policy] | ChoiceProbs,
+    rules: RuleSet,
+    counts: npt.NDArray[np.int64],
+    live: npt.NDArray[np.bool_],
+) -> ChoiceProbs:
+    """Return the (B, S, fruit_types) choice tables of the policies, checked."""
+    if isinstance(policies, np.ndarray):
+        tables = policies
+    else:
+        tables = np.stack([policy_table(policy, rules) for policy in policies])
+    tables = tables.reshape(len(tables), len(live), rules.fruit_types)
+    _check_tables(tables, counts, live)
+    return tables
+
+
+def _fruit_strides(rules: RuleSet) -> npt.NDArray[np.int64]:
+    """Return the flat index steps for taking one fruit of each color."""
+    # The raven is the last axis, so its step is 1
+    return np.array(
+        [int(np.prod(rules.shape[i + 1 :])) for i in range(rules.fruit_types)],
+        dtype=np.int64,
+    )
+
+
+def _solve_states(
+    values: npt.NDArray[np.float64],
+    tables: ChoiceProbs,
+    states: npt.NDArray[np.int64],
+    counts: npt.NDArray[np.int64],
+    rules: RuleSet,
+    roll_cost: float,
+    wild_faces: npt.NDArray[np.int64],
+) -> None:
+    """
+    Solve live states of one layer in place, from the values of the layer below.
+
+    Args:
+    ----
+            values (npt.NDArray[np.float64]): (B, S) values of every state, with the
+            layers below already solved.
+
+            tables (ChoiceProbs): (B, S, fruit_types) choice tables of the policies.
+
+            states (npt.NDArray[np.int64]): Flat indices of the states to solve.
+
+            counts (npt.NDArray[np.int64]): (len(states), fruit_types) fruit counts of
+            the states.
+
+            rules (RuleSet): Size of the game.
+
+            roll_cost (float): Value added for every roll, see _solve_layers.
+
+            wild_faces (npt.NDArray[np.int64]): (B,) wild faces of the die of each
+            row of values.
+
+    """
+    non_empty = counts > 0
+    children = np.where(
+        non_empty, states[:, None] - _fruit_strides(rules), states[:, None]
+    )
+    # A color's child is reached by rolling that color or by choosing it on a wild
+    weights = non_empty + wild_faces[:, None, None] * tables[:, states]
+    sides = non_empty.sum(axis=1) + 1 + wild_faces[:, None]
+    die_sides = rules.fruit_types + 1 + wild_faces[:, None]
+    values[:, states] = (
+        np.einsum("bsf,bsf->bs", weights, values[:, children])
+        + values[:, states - 1]
+        + roll_cost * die_sides
+    ) / sides
+
+
+def _solve_layers(
+    policies: Sequence[Policy] | ChoiceProbs,
+    rules: RuleSet,
+    won_value: float,
+    roll_cost: float,
+    wild_faces: npt.NDArray[np.int64] | None = None,
+) -> npt.NDArray[np.float64]:
+    """
+    Solve a value for every state, layer by layer, under each policy.
+
+    Rolling a color with no fruit left changes nothing, so the value of a state is the
+    average over the die sides that do change it, plus roll_cost for every roll made
+    on average before one of them comes up. Won states are worth won_value and lost
+    states 0. Every policy is played with rules.wild_faces wild faces unless
+    wild_faces gives the number for each.
+    """
+    counts, raven = state_grid(rules)
+    fruit_left = counts.sum(axis=1)
+    live = (raven > 0) & (fruit_left > 0)
+    tables = _stack_tables(policies, rules, counts, live)
+    if wild_faces is None:
+        wild_faces = np.full(len(tables), rules.wild_faces, dtype=np.int64)
+
+    layer = fruit_left + raven
+    values = np.zeros((len(tables), len(raven)), dtype=np.float64)
+    values[:, (raven > 0) & (fruit_left == 0)] = won_value
+    for total in range(1, int(layer.max()) + 1):
+        states = np.flatnonzero(live & (layer == total))
+        _solve_states(
+            values, tables, states, counts[states], rules, roll_cost, wild_faces
+        )
+    return values.reshape(len(tables), *rules.shape)
+
+
+def evaluate_policies(
+    policies: Sequence[Policy] | ChoiceProbs, rules: RuleSet = BASE_RULES
+) -> npt.NDArray[np.float64]:
+    """
+    Compute the exact win probability of every state under each policy.
+
+    Every roll removes a fruit or moves the raven, so states are solved in layers of
+    equal (total fruit + spaces), each layer in one vectorized step for all policies.
+
+    Args:
+    ----
+            policies (Sequence[Policy] | ChoiceProbs): Policies to evaluate, or a
+            stacked (B, *rules.shape, fruit_types) table such as mix_policies returns.
+
+            rules (RuleSet): Size of the game. Defaults to the base game.
+
+    Returns:
+    -------
+            win_probs (npt.NDArray[np.float64]): (B, *rules.shape) win probability of
+            every state under each policy, indexed like GameState.game_status.
+
+    """
+    return _solve_layers(policies, rules, won_value=1.0, roll_cost=0.0)
+
+
+def expected_lengths(
+    policies: Sequence[Policy] | ChoiceProbs, rules: RuleSet = BASE_RULES
+) -> npt.NDArray[np.float64]:
+    """
+    Compute the expected number of die rolls left in every state under each policy.
+
+    Rolls of a color with no fruit left count, since the player still rolls them.
+    Finished games have 0 rolls left.
+
+    Returns
+    -------
+            lengths (npt.NDArray[np.float64]): (B, *rules.shape) expected rolls until
+            the game ends, indexed like evaluate_policies.
+
+    """
+    return _solve_layers(policies, rules, won_value=0.0, roll_cost=1.0)
+
+
+def padded_rules(rule_sets: Sequence[RuleSet]) -> RuleSet:
+    """
+    Return the smallest rule set whose states include those of every rule set.
+
+    Raises a ValueError unless all rule sets have the same number of fruit types.
+    """
+    fruit_types = {rules.fruit_types for rules in rule_sets}
+    if len(fruit_types) != 1:
+        raise ValueError(
+            f"Rule sets must have the same number of fruit types, got {fruit_types}."
+        )
+    return RuleSet(
+        fruit_types=fruit_types.pop(),
+        fruit_per_type=max(rules.fruit_per_type for rules in rule_sets),
+        raven_spaces=max(rules.raven_spaces for rules in rule_sets),
+    )
+
+
+def _solve_rule_sets(
+    rule_sets: Sequence[RuleSet],
+    policies: Sequence[Policy] | ChoiceProbs,
+    won_value: float,
+    roll_cost: float,
+) -> List[npt.NDArray[np.float64]]:
+    """
+    Solve many rule sets in one pass over the table of padded_rules(rule_sets).
+
+    The value of a state only depends on the states below it, never on how many fruit
+    or spaces the game started with, so every rule set's table is a corner of the
+    padded table solved with its number of wild faces. Rule sets sharing a number of
+    wild faces share one solve, the others are stacked along the policy axis.
+    """
+    padded = padded_rules(rule_sets)
+    counts, raven = state_grid(padded)
+    live = (raven > 0) & (counts.sum(axis=1) > 0)
+    tables = _stack_tables(policies, padded, counts, live)
+    wilds = sorted({rules.wild_faces for rules in rule_sets})
+    values = _solve_layers(
+        np.tile(tables, (len(wilds), 1, 1)),
+        padded,
+        won_value,
+        roll_cost,
+        np.repeat(np.array(wilds, dtype=np.int64), len(tables)),
+    ).reshape(len(wilds), len(tables), *padded.shape)
+    return [
+        np.ascontiguousarray(
+            values[wilds.index(rules.wild_faces)][
+                (slice(None), *(slice(0, size) for size in rules.shape))
+            ]
+        )
+        for rules in rule_sets
+    ]
+
+
+def evaluate_rule_sets(
+    rule_sets: Sequence[RuleSet], policies: Sequence[Policy] | ChoiceProbs = ("most",)
+) -> List[npt.NDArray[np.float64]]:
+    """
+    Compute the win probability of every state of many rule sets in one pass.
+
+    Rule sets can differ in fruit per type, raven spaces and wild faces, but must have
+    the same number of fruit types. Policies given as tables must be shaped for
+    padded_rules(rule_sets).
+
+    Args:
+    ----
+            rule_sets (Sequence[RuleSet]): Rule sets to solve.
+
+            policies (Sequence[Policy] | ChoiceProbs): Policies to evaluate in every
+            rule set, see evaluate_policies.
+
+    Returns:
+    -------
+            win_probs (List[npt.NDArray[np.float64]]): For each rule set, the
+            (B, *rules.shape) table evaluate_policies(policies, rules) returns.
+
+    """
+    return _solve_rule_sets(rule_sets, policies, won_value=1.0, roll_cost=0.0)
+
+
+def expected_lengths_rule_sets(
+    rule_sets: Sequence[RuleSet], policies: Sequence[Policy] | ChoiceProbs = ("most",)
+) -> List[npt.NDArray[np.float64]]:
+    """Compute expected_lengths of many rule sets at once, see evaluate_rule_sets."""
+    return _solve_rule_sets(rule_sets, policies, won_value=0.0, roll_cost=1.0)
+
+
+def evaluate_policy(
+    policy: Policy, rules: RuleSet = BASE_RULES
+) -> npt.NDArray[np.float64]:
+    """Compute the exact win probability of every state under a single policy."""
+    win_probs: npt.NDArray[np.float64] = evaluate_policies([policy], rules)[0]
+    return win_probs
@@ -0,0 +1,303 @@
+"""
+Module to record and replay simulated games of the Orchard game.
+
+Games are stored in two append-only binary files:
+
+    <path>: One byte per die roll. Bits 0-2 hold the die face (1 raven, 2 wild,
+    3-6 fruit) and bits 3-4 hold the fruit column chosen on a wild roll.
+
+    <path>.idx: One fixed-width INDEX_DTYPE record per game with the offset and length
+    of its events, its starting state and whether it was won.
+
+Both files can be memory-mapped with TrajectoryReader, so games can be filtered by
+outcome and replayed without loading the whole recording. GameRecorder records the
+games played on a GameState, like the pygame version, from its change events.
+"""
+
+from pathlib import Path
+from types import TracebackType
+from typing import BinaryIO, List, Tuple, Type
+
+import numpy as np
+import numpy.typing as npt
+
+from first_orchard_solver.gameplay.gamelogic import (
+    DieRolled,
+    FruitChanged,
+    GameEvent,
+    GameReset,
+    GameState,
+    RavenMoved,
+)
+
+FRUIT_SLOTS = 4
+FACE_MASK = 0b111
+CHOICE_SHIFT = 3
+FIRST_FRUIT_ID = 3  # fruit ID of fruit column 0
+
+INDEX_DTYPE = np.dtype(
+    [
+        ("offset", "<u8"),
+        ("length", "<u4"),
+        ("fruit", "u1", (FRUIT_SLOTS,)),
+        ("raven", "u1"),
+        ("won", "u1"),
+    ]
+)
+
+
+def _index_path(path: Path) -> Path:
+    """Return the path of the index file belonging to an events file."""
+    return path.with_name(path.name + ".idx")
+
+
+def encode_event(die_result: int, choice: int = 0) -> int:
+    """Pack a die face and the fruit column chosen on a wild roll into one byte."""
+    return die_result | (choice << CHOICE_SHIFT)
+
+
+def decode_event(event: int) -> Tuple[int, int]:
+    """Unpack an event byte into the die face and the chosen fruit column."""
+    return event & FACE_MASK, event >> CHOICE_SHIFT
+
+
+def pack_steps(
+    lengths: npt.NDArray[np.int64],
+    step_games: List[npt.NDArray[np.intp]],
+    step_events: List[npt.NDArray[np.uint8]],
+) -> npt.NDArray[np.uint8]:
+    """
+    Regroup events collected step by step into one contiguous run per game.
+
+    Args:
+    ----
+            lengths (npt.NDArray[np.int64]): Number of events in each game.
+
+            step_games (List[npt.NDArray[np.intp]]): For each step, the games still
+            playing. A game plays every step from the first until it ends.
+
+            step_events (List[npt.NDArray[np.uint8]]): For each step, the event byte
+            of every game in step_games.
+
+    Returns:
+    -------
+            events (npt.NDArray[np.uint8]): Event bytes one game after the other.
+
+    """
+    offsets = np.cumsum(lengths) - lengths
+    events = np.empty(int(lengths.sum()), dtype=np.uint8)
+    for step, (games, step_event) in enumerate(zip(step_games, step_events)):
+        events[offsets[games] + step] = step_event
+    return events
+
+
+class TrajectoryRecorder:
+    """
+    Appends simulated games to a binary recording.
+
+    Args:
+    ----
+            path (str | Path): Events file to append to. The index is written next to
+            it with an added ".idx" suffix.
+
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """Open the events and index files for appending."""
+        self.path = Path(path)
+        self._events: BinaryIO = open(self.path, "ab")
+        self._index: BinaryIO = open(_index_path(self.path), "ab")
+        self._offset: int = self._events.tell()
+        return None
+
+    def record_game(
+        self,
+        fruit_count: Tuple[int, ...],
+        raven_track: int,
+        events: bytes,
+        won: bool,
+    ) -> None:
+        """Append a single game given its starting state and encoded events."""
+        record = np.zeros(1, dtype=INDEX_DTYPE)
+        record["offset"] = self._offset
+        record["length"] = len(events)
+        record["fruit"] = fruit_count
+        record["raven"] = raven_track
+        record["won"] = won
+        self._events.write(events)
+        self._index.write(record.tobytes())
+        self._offset += len(events)
+
+    def record_batch(
+        self,
+        fruit_count: Tuple[int, ...],
+        raven_track: int,
+        events: npt.NDArray[np.uint8],
+        lengths: npt.NDArray[np.int64],
+        wins: npt.NDArray[np.bool_],
+    ) -> None:
+        """
+        Append a batch of games that all started from the same state.
+
+        Args:
+        ----
+                fruit_count (Tuple[int, ...]): Fruit counts of the starting state.
+
+                raven_track (int): Raven spaces of the starting state.
+
+                events (npt.NDArray[np.uint8]): Event bytes of every game, one game
+                after the other.
+
+                lengths (npt.NDArray[np.int64]): Number of events in each game.
+
+                wins (npt.NDArray[np.bool_]): Whether each game was won.
+
+        """
+        records = np.zeros(len(lengths), dtype=INDEX_DTYPE)
+        records["offset"] = self._offset + np.cumsum(lengths) - lengths
+        records["length"] = lengths
+        records["fruit"] = fruit_count
+        records["raven"] = raven_track
+        records["won"] = wins
+        self._events.write(events.data)
+        self._index.write(records.data)
+        self._offset += int(lengths.sum())
+
+    def close(self) -> None:
+        """Flush and close the recording files."""
+        self._events.close()
+        self._index.close()
+
+    def __enter__(self) -> "TrajectoryRecorder":
+        """Return the recorder for use in a with block."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the recording files when leaving a with block."""
+        self.close()
+
+
+class GameRecorder:
+    """
+    Records every game played on a GameState, listening to its GameEvents.
+
+    A game starts at the state it has when its first roll is made, and is recorded
+    once it is over. Games that end without a roll are not recorded.
+
+    Args:
+    ----
+            recorder (TrajectoryRecorder): Recording to append the games to.
+
+            game_state (GameState): Game to listen to, until close is called.
+
+    """
+
+    def __init__(self, recorder: TrajectoryRecorder, game_state: GameState) -> None:
+        """Start listening to the game state."""
+        self.recorder = recorder
+        self.game_state = game_state
+        self._start = game_state.game_status
+        self._events = bytearray()
+        self._wild = False
+        self.close = game_state.subscribe(self)
+        return None
+
+    def __call__(self, event: GameEvent) -> None:
+        """Add rolls and wild choices to the game, and record it once it is over."""
+        if isinstance(event, GameReset):
+            self._start = event.status
+            self._events.clear()
+            self._wild = False
+        elif isinstance(event, DieRolled):
+            if event.die_result == 2:
+                self._wild = True
+            else:
+                self._events.append(encode_event(event.die_result))
+        elif isinstance(event, FruitChanged) and self._wild:
+            self._events.append(encode_event(2, event.fruit_id - FIRST_FRUIT_ID))
+            self._wild = False
+        elif not self._events:
+            # The game is still being set up
+            self._start = self.game_state.game_status
+            return
+        if isinstance(event, (FruitChanged, RavenMoved)) and (
+            self._events and self.game_state.is_game_over()
+        ):
+            *fruit, raven = self._start
+            self.recorder.record_game(
+                tuple(fruit),
+                raven,
+                bytes(self._events),
+                self.game_state.raven_track.spaces > 0,
+            )
+            self._events.clear()
+
+
+class TrajectoryReader:
+    """
+    Memory-maps a recording made by TrajectoryRecorder for filtering and replay.
+
+    Args:
+    ----
+            path (str | Path): Events file of the recording.
+
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """Memory-map the events and index files."""
+        self.path = Path(path)
+        self.index: npt.NDArray[np.void] = self._memmap(
+            _index_path(self.path), INDEX_DTYPE
+        )
+        self.events: npt.NDArray[np.uint8] = self._memmap(self.path, np.dtype(np.uint8))
+        return None
+
+    @staticmethod
+    def _memmap(path: Path, dtype: np.dtype) -> npt.NDArray:  # type: ignore[type-arg]
+        """Memory-map a file read-only, empty files become empty arrays."""
+        if path.stat().st_size == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r")
+
+    def __len__(self) -> int:
+        """Return the number of recorded games."""
+        return len(self.index)
+
+    def filter(self, won: bool) -> npt.NDArray[np.intp]:
+        """Return the indices of every game that was won (or lost if won=False)."""
+        return np.flatnonzero(self.index["won"] == won)
+
+    def game_events(self, game: int) -> npt.NDArray[np.uint8]:
+        """Return the encoded events of a single game."""
+        offset = int(self.index["offset"][game])
+        return self.events[offset : offset + int(self.index["length"][game])]
+
+    def replay(self, game: int) -> List[Tuple[int, ...]]:
+        """
+        Replay a recorded game and return every state it passed through.
+
+        Returns
+        -------
+                states (List[Tuple[int, ...]]): The starting state followed by the
+                state after each roll, as (fruit1, ..., fruit4, spaces) like
+                GameState.game_status.
+
+        """
+        fruit = [int(f) for f in self.index["fruit"][game]]
+        raven = int(self.index["raven"][game])
+        states = [(*fruit, raven)]
+        for event in self.game_events(game):
+            die_result, choice = decode_event(int(event))
+            if die_result == 1:
+                raven -= 1
+            elif die_result == 2:
+                fruit[choice] -= 1
+            elif fruit[die_result - 3] > 0:
+                fruit[die_result - 3] -= 1
+            states.append((*fruit, raven))
+        return states
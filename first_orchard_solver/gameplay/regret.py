@@ -0,0 +1,317 @@
+"""
+Module to measure the win probability lost on every wild choice of recorded games.
+
+A recording made by TrajectoryRecorder holds the rolls and wild choices of every game.
+Here the state before each wild choice is rebuilt for many games at once with
+cumulative sums instead of replaying them one by one, and every choice is graded with
+lookups into the win probability table of evaluate_policy:
+
+    chosen: Win probability after taking the fruit column chosen.
+
+    best: Highest win probability after taking any fruit column with fruit left.
+
+    regret: best - chosen, zero when the choice was one of the best.
+
+Like coach_choice in gameplay_text.py, the rest of the game is assumed to be played
+with a strategy, "most" by default. Games are analyzed in chunks, so recordings with
+millions of decisions are graded with bounded memory, and analyze_regret sums the
+regret of every decision by state and by state type, where states with the same fruit
+counts in any order share a type.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from first_orchard_solver.gameplay.gamelogic import BASE_RULES, RuleSet
+from first_orchard_solver.gameplay.policyeval import (
+    _fruit_strides,
+    evaluate_policy,
+    state_grid,
+)
+from first_orchard_solver.gameplay.recorder import (
+    CHOICE_SHIFT,
+    FACE_MASK,
+    TrajectoryReader,
+)
+from first_orchard_solver.gameplay.stateindex import canonical_index
+from first_orchard_solver.gameplay.strategies import Strategy
+from first_orchard_solver.gameplay.validation import Scenario
+
+DEFAULT_CHUNK_GAMES = 32_768
+MISTAKE_TOLERANCE = 1e-9  # regrets below this are float noise between tied choices
+
+
+@dataclass(frozen=True)
+class DecisionBatch:
+    """
+    Class to hold the grading of the wild choices of a chunk of recorded games.
+
+    Attributes
+    ----------
+        game (npt.NDArray[np.int64]): Recorded game of each decision.
+        roll (npt.NDArray[np.int64]): Index of the wild roll in its game.
+        fruit (npt.NDArray[np.int64]): (N, fruit_types) fruit counts before the choice.
+        raven (npt.NDArray[np.int64]): Raven spaces before the choice.
+        choice (npt.NDArray[np.int64]): Fruit column chosen.
+        chosen (npt.NDArray[np.float64]): Win probability after the choice made.
+        best (npt.NDArray[np.float64]): Win probability after the best choice.
+        state (npt.NDArray[np.int64]): Entry of the state in a flattened
+            (*rules.shape) table.
+
+    """
+
+    game: npt.NDArray[np.int64]
+    roll: npt.NDArray[np.int64]
+    fruit: npt.NDArray[np.int64]
+    raven: npt.NDArray[np.int64]
+    choice: npt.NDArray[np.int64]
+    chosen: npt.NDArray[np.float64]
+    best: npt.NDArray[np.float64]
+    state: npt.NDArray[np.int64]
+
+    def __len__(self) -> int:
+        """Return the number of decisions in the batch."""
+        return len(self.game)
+
+    @property
+    def regret(self) -> npt.NDArray[np.float64]:
+        """Win probability lost by each choice, zero for ties with the best."""
+        regret = self.best - self.chosen
+        return np.where(regret > MISTAKE_TOLERANCE, regret, 0.0)
+
+
+@dataclass
+class RegretSummary:
+    """
+    Class to hold the regret of every decision of a recording, summed by state.
+
+    Attributes
+    ----------
+        rules (RuleSet): Rule set the states belong to.
+        games (int): Number of games analyzed.
+        state_decisions (npt.NDArray[np.int64]): Decisions made in each state, shaped
+            like rules.shape.
+        state_mistakes (npt.NDArray[np.int64]): Decisions with regret in each state.
+        state_regret (npt.NDArray[np.float64]): Regret summed over each state.
+
+    """
+
+    rules: RuleSet = BASE_RULES
+    games: int = 0
+    state_decisions: npt.NDArray[np.int64] = field(
+        default_factory=lambda: np.zeros(0, dtype=np.int64)
+    )
+    state_mistakes: npt.NDArray[np.int64] = field(
+        default_factory=lambda: np.zeros(0, dtype=np.int64)
+    )
+    state_regret: npt.NDArray[np.float64] = field(
+        default_factory=lambda: np.zeros(0, dtype=np.float64)
+    )
+
+    def __post_init__(self) -> None:
+        """Start with empty tables for the rule set if none were given."""
+        if self.state_decisions.size == 0:
+            self.state_decisions = np.zeros(self.rules.shape, dtype=np.int64)
+            self.state_mistakes = np.zeros(self.rules.shape, dtype=np.int64)
+            self.state_regret = np.zeros(self.rules.shape, dtype=np.float64)
+
+    @property
+    def decisions(self) -> int:
+        """Number of wild choices graded."""
+        return int(self.state_decisions.sum())
+
+    @property
+    def mistakes(self) -> int:
+        """Number of wild choices worse than the best one."""
+        return int(self.state_mistakes.sum())
+
+    @property
+    def total_regret(self) -> float:
+        """Win probability lost over all decisions."""
+        return float(self.state_regret.sum())
+
+    @property
+    def mean_regret(self) -> float:
+        """Win probability lost per decision."""
+        return self.total_regret / self.decisions if self.decisions else 0.0
+
+    def add(self, batch: DecisionBatch, games: int = 0) -> None:
+        """Sum the decisions of a batch into the state tables."""
+        size = self.state_decisions.size
+        regret = batch.regret
+        self.state_decisions += np.bincount(batch.state, minlength=size).reshape(
+            self.rules.shape
+        )
+        self.state_mistakes += (
+            np.bincount(batch.state, weights=regret > 0, minlength=size)
+            .astype(np.int64)
+            .reshape(self.rules.shape)
+        )
+        self.state_regret += np.bincount(
+            batch.state, weights=regret, minlength=size
+        ).reshape(self.rules.shape)
+        self.games += games
+
+    def by_state_type(self) -> Dict[Scenario, Tuple[int, int, float]]:
+        """
+        Sum the decisions of states that only differ in the order of their fruit.
+
+        Returns
+        -------
+                types (Dict[Scenario, Tuple[int, int, float]]): (decisions, mistakes,
+                regret) of every state type with decisions, keyed by its fruit counts
+                in ascending order and raven spaces like canonical_states.
+
+        """
+        index = canonical_index(self.rules)
+        counts, raven = state_grid(self.rules)
+        ranks = index.rank(counts, raven)
+        decisions, mistakes, regret = (
+            np.bincount(ranks, weights=table.ravel(), minlength=index.size)
+            for table in (self.state_decisions, self.state_mistakes, self.state_regret)
+        )
+        played = np.flatnonzero(decisions)
+        fruit, spaces = index.unrank(played)
+        types: Dict[Scenario, Tuple[int, int, float]] = {}
+        for rank, type_fruit, type_raven in zip(played, fruit, spaces):
+            types[(tuple(int(k) for k in type_fruit), int(type_raven))] = (
+                int(decisions[rank]),
+                int(mistakes[rank]),
+                float(regret[rank]),
+            )
+        return types
+
+    def worst_state_types(self, n: int = 10) -> List[Tuple[Scenario, float]]:
+        """Return the n state types that lost the most win probability in total."""
+        types = self.by_state_type()
+        ranked = sorted(types, key=lambda key: types[key][2], reverse=True)
+        return [(key, types[key][2]) for key in ranked[:n]]
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the totals, ready for json.dumps."""
+        return {
+            "games": self.games,
+            "decisions": self.decisions,
+            "mistakes": self.mistakes,
+            "total_regret": self.total_regret,
+            "mean_regret": self.mean_regret,
+        }
+
+
+def _grade_chunk(
+    reader: TrajectoryReader,
+    games: npt.NDArray[np.int64],
+    values: npt.NDArray[np.float64],
+    rules: RuleSet,
+) -> DecisionBatch:
+    """Rebuild the state before every wild choice of some games and grade it."""
+    lengths = reader.index["length"][games].astype(np.int64)
+    starts = np.cumsum(lengths) - lengths
+    owner = np.repeat(np.arange(len(games)), lengths)
+    roll = np.arange(int(lengths.sum())) - starts[owner]
+    offsets = reader.index["offset"][games].astype(np.int64)
+    events = np.asarray(reader.events[offsets[owner] + roll])
+    face = (events & FACE_MASK).astype(np.int64)
+    column = np.where(face == 2, events >> CHOICE_SHIFT, face - 3)
+
+    # Count the rolls taking (or trying to take) each fruit column, and the ravens,
+    # before every event of its own game. A fruit roll on an empty column takes
+    # nothing, but a column never refills, so clipping at zero gives the counts.
+    takes = np.zeros((len(face), rules.fruit_types + 1), dtype=np.int32)
+    fruit_rolls = np.flatnonzero(face >= 2)
+    takes[fruit_rolls, column[fruit_rolls]] = 1
+    takes[:, -1] = face == 1
+    before = np.cumsum(takes, axis=0, dtype=np.int32) - takes
+    before -= before[starts[owner]]
+
+    wild = np.flatnonzero(face == 2)
+    game = owner[wild]
+    start_fruit = reader.index["fruit"][games, : rules.fruit_types].astype(np.int64)
+    fruit = np.maximum(start_fruit[game] - before[wild, :-1], 0)
+    raven = reader.index["raven"][games].astype(np.int64)[game] - before[wild, -1]
+    strides = _fruit_strides(rules)
+    state = fruit @ strides + raven
+
+    after = np.where(fruit > 0, state[:, None] - strides, state[:, None])
+    odds = np.where(fruit > 0, values[after], -np.inf)
+    choice = column[wild]
+    chosen = odds[np.arange(len(wild)), choice]
+    if np.isneginf(chosen).any():
+        bad = int(np.flatnonzero(np.isneginf(chosen))[0])
+        raise ValueError(
+            f"Game {int(games[game[bad]])} takes fruit column {int(choice[bad])} "
+            f"with no fruit left at roll {int(roll[wild[bad]])}."
+        )
+    return DecisionBatch(
+        game=games[game],
+        roll=roll[wild],
+        fruit=fruit,
+        raven=raven,
+        choice=choice,
+        chosen=chosen,
+        best=odds.max(axis=1),
+        state=state,
+    )
+
+
+def _selected_games(
+    reader: TrajectoryReader, games: Iterable[int] | None
+) -> npt.NDArray[np.int64]:
+    """Return the games to analyze as an array, all of them if None."""
+    if games is None:
+        return np.arange(len(reader), dtype=np.int64)
+    return np.fromiter(games, np.int64)
+
+
+def grade_decisions(
+    reader: TrajectoryReader,
+    games: Iterable[int] | None = None,
+    strat: Strategy = "most",
+    rules: RuleSet = BASE_RULES,
+    chunk_games: int = DEFAULT_CHUNK_GAMES,
+) -> Iterator[DecisionBatch]:
+    """
+    Grade every wild choice of recorded games, one chunk of games at a time.
+
+    Raises a ValueError if a game takes a fruit column with no fruit left.
+
+    Args:
+    ----
+            reader (TrajectoryReader): Recording to analyze.
+
+            games (Iterable[int] | None): Games to analyze, all of them if None.
+
+            strat (Strategy): Strategy assumed for the rest of the game.
+
+            rules (RuleSet): Rule set the games were played with.
+
+            chunk_games (int): Number of games graded together.
+
+    Returns:
+    -------
+            batches (Iterator[DecisionBatch]): Decisions of each chunk, in the order
+            of their games.
+
+    """
+    values = evaluate_policy(strat, rules).ravel()
+    selected = _selected_games(reader, games)
+    for start in range(0, len(selected), chunk_games):
+        yield _grade_chunk(reader, selected[start : start + chunk_games], values, rules)
+
+
+def analyze_regret(
+    reader: TrajectoryReader,
+    games: Iterable[int] | None = None,
+    strat: Strategy = "most",
+    rules: RuleSet = BASE_RULES,
+    chunk_games: int = DEFAULT_CHUNK_GAMES,
+) -> RegretSummary:
+    """Sum the regret of every batch of grade_decisions by state."""
+    selected = _selected_games(reader, games)
+    summary = RegretSummary(rules, games=len(selected))
+    for batch in grade_decisions(reader, selected, strat, rules, chunk_games):
+        summary.add(batch)
+    return summary
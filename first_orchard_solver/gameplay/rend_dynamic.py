@@ -1,16 +1,14 @@
 """Render dynamic updates to screen."""
 
-import copy
-from typing import Tuple
+from typing import Dict, Iterable, List, Tuple
 
 import pygame
 
 from first_orchard_solver.gameplay.context import GameContext, unpack_game_context
-from first_orchard_solver.gameplay.gamelogic import GameState
-from first_orchard_solver.gameplay.gamesolver import win_perc, win_perc_comp
+from first_orchard_solver.gameplay.gamesolver import wild_choice_odds, win_perc
 
 
-def draw_fruit_circle_texts(game_context: GameContext) -> None:
+def draw_fruit_circle_texts(game_context: GameContext) -> List[pygame.Rect]:
     """Draws the text inside the fruit circles."""
     assets, _, screen, game_state = unpack_game_context(game_context)
     fruit_ids = [3, 4, 5, 6]  # Exception to hard coding, fruit IDs are fixed
@@ -20,16 +18,19 @@ def draw_fruit_circle_texts(game_context: GameContext) -> None:
         assets.POSITIONS.GREEN_CIRCLE_TEXT_POS,
         assets.POSITIONS.YELLOW_CIRCLE_TEXT_POS,
     ]
+    rects = []
     for fruit_id, position in zip(fruit_ids, circle_positions):
-        text_surface = assets.FRUIT_CIRCLE_FONT.render(
+        text_surface = game_context.text_cache.render(
+            assets.FRUIT_CIRCLE_FONT,
             str(game_state.fruit_inventory.fruit_inventory[fruit_id]),
             assets.ANTIALIASING.CIRCLE_SURF_ANTIALIAS,
             assets.COLORS.BLACK,
         )
-        screen.blit(text_surface, position)
+        rects.append(screen.blit(text_surface, position))
+    return rects
 
 
-def draw_odds_text(game_context: GameContext) -> None:
+def draw_odds_text(game_context: GameContext) -> List[pygame.Rect]:
     """Draws the initial odds text on the background."""
     assets, _, screen, game_state = unpack_game_context(game_context)
     game_odds = win_perc(
@@ -39,22 +40,55 @@ def draw_odds_text(game_context: GameContext) -> None:
     )  # 0 is chance of winning (assuming future perfect play)
 
     odds_text = assets.TEXT.ODDS_TEXT + f"{game_odds[0] * 100:.2f}%"
-    odds_surface = assets.ODDS_FONT.render(
-        odds_text, assets.ANTIALIASING.ODDS_TEXT_ANTIALIAS, assets.COLORS.BLACK
+    odds_surface = game_context.text_cache.render(
+        assets.ODDS_FONT,
+        odds_text,
+        assets.ANTIALIASING.ODDS_TEXT_ANTIALIAS,
+        assets.COLORS.BLACK,
+        volatile=True,
     )
-    screen.blit(odds_surface, assets.POSITIONS.ODDS_TEXT_POS)
+    return [screen.blit(odds_surface, assets.POSITIONS.ODDS_TEXT_POS)]
+
+
+def draw_wild_odds_text(game_context: GameContext) -> List[pygame.Rect]:
+    """Draws the odds of winning after each choice above the circles on a wild."""
+    assets, _, screen, game_state = unpack_game_context(game_context)
+    circle_positions = {
+        3: assets.POSITIONS.BLUE_CIRCLE_POS,
+        4: assets.POSITIONS.RED_CIRCLE_POS,
+        5: assets.POSITIONS.GREEN_CIRCLE_POS,
+        6: assets.POSITIONS.YELLOW_CIRCLE_POS,
+    }
+    offset_x, offset_y = assets.POSITIONS.WILD_ODDS_OFFSET
+    rects = []
+    for fruit_id, win in game_state.wild_odds.items():
+        circle_x, circle_y = circle_positions[fruit_id]
+        odds_surface = game_context.text_cache.render(
+            assets.COACHING_FONT,
+            f"{win * 100:.1f}%",
+            assets.ANTIALIASING.COACHING_ANTIALIAS,
+            assets.COLORS.BLACK,
+            volatile=True,
+        )
+        position = (circle_x + offset_x, circle_y + offset_y)
+        rects.append(screen.blit(odds_surface, position))
+    return rects
 
 
-def draw_die(game_context: GameContext) -> None:
+def draw_die(game_context: GameContext) -> List[pygame.Rect]:
     """Draws starting background image of the die (not the die face) on background."""
     assets, _, screen, _ = unpack_game_context(game_context)
-    pygame.draw.rect(screen, assets.COLORS.WHITE, assets.RECTANGLES.ROLL_BUTTON_RECT)
+    return [
+        pygame.draw.rect(
+            screen, assets.COLORS.WHITE, assets.RECTANGLES.ROLL_BUTTON_RECT
+        )
+    ]
 
 
 def draw_new_die_face(
     game_context: GameContext,
     color: Tuple[int, int, int] | None,
-) -> None:
+) -> List[pygame.Rect]:
     """
     Draws the die face.
 
@@ -66,17 +100,21 @@ def draw_new_die_face(
     assets, _, screen, _ = unpack_game_context(game_context)
 
     if color is not None:
-        pygame.draw.circle(
-            screen,
-            color,
-            assets.RECTANGLES.ROLL_BUTTON_RECT.center,
-            assets.RECTANGLES.DIE_FACE_RADIUS,
-        )
+        return [
+            pygame.draw.circle(
+                screen,
+                color,
+                assets.RECTANGLES.ROLL_BUTTON_RECT.center,
+                assets.RECTANGLES.DIE_FACE_RADIUS,
+            )
+        ]
     else:
-        pass
+        return []
 
 
-def draw_die_replace_text(game_context: GameContext, die_surface_text: str) -> None:
+def draw_die_replace_text(
+    game_context: GameContext, die_surface_text: str
+) -> List[pygame.Rect]:
     """
     Will replace the die with text when the raven or wild is rolled.
 
@@ -85,19 +123,21 @@ def draw_die_replace_text(game_context: GameContext, die_surface_text: str) -> N
     This will be used when the Raven or Wild is rolled.
     """
     assets, _, screen, _ = unpack_game_context(game_context)
-    pygame.draw.rect(screen, assets.COLORS.PURPLE, assets.RECTANGLES.ROLL_BUTTON_RECT)
-    die_surface = assets.DIE_REPLACEMENT_FONT.render(
+    die_rect = pygame.draw.rect(
+        screen, assets.COLORS.PURPLE, assets.RECTANGLES.ROLL_BUTTON_RECT
+    )
+    die_surface = game_context.text_cache.render(
+        assets.DIE_REPLACEMENT_FONT,
         die_surface_text,
         assets.ANTIALIASING.DIE_REPLACEMENT_ANTIALIAS,
         assets.COLORS.BLACK,
     )
     text_rect = die_surface.get_rect(topleft=assets.POSITIONS.DIE_REPLACEMENT_TEXT_POS)
-    screen.blit(die_surface, text_rect)
+    return [die_rect, screen.blit(die_surface, text_rect)]
 
 
-def _check_if_all_same(game_state: GameState) -> bool:
+def _check_if_all_same(fruit_count: Iterable[int]) -> bool:
     """Check to see whether all the values of fruit inventory are the same integer."""
-    fruit_count = list(game_state.fruit_inventory.fruit_values)
     non_zero_count = [i for i in fruit_count if i > 0]
     if len(set(non_zero_count)) == 1:
         return True
@@ -105,6 +145,30 @@ def _check_if_all_same(game_state: GameState) -> bool:
         return False
 
 
+def solve_wild_odds(
+    game_context: GameContext, fruit_inventory: Dict[int, int]
+) -> Dict[int, float]:
+    """
+    Solve the win probability after taking each fruit left on a wild roll.
+
+    All choices are looked up in one batch, before the player clicks a fruit.
+
+    Returns
+    -------
+            Dict[int, float]: Win probability by fruit ID, for every fruit with any
+            left in fruit_inventory.
+
+    """
+    assets, _, _, game_state = unpack_game_context(game_context)
+    fruit_ids = list(fruit_inventory)
+    odds = wild_choice_odds(
+        tuple(fruit_inventory.values()),
+        game_state.raven_track.spaces,
+        assets.OPTIONS.WIN_PERC_OPTION[0],
+    )
+    return {fruit_ids[column]: win for column, win in odds.items()}
+
+
 def get_compare_odds(
     game_context: GameContext, choice: int | None
 ) -> Tuple[float, float, float, bool] | None:
@@ -125,28 +189,31 @@ def get_compare_odds(
     strategy is always equal to or better than other strategies. And is assumed in
     this function.
 
-    Another Note: deepcopy is slow here, but this is acceptable speed for this game.
+    Another Note: the odds of every choice are solved by die_results_wild when the
+    wild is rolled, so this only looks them up. They are solved here only if the
+    state was not reached through die_results_wild.
 
     """
     if choice is None:
         return None
     _, _, _, game_state = unpack_game_context(game_context)
-    game_state_optimal = copy.deepcopy(game_state)
-    game_state_optimal.fruit_inventory.increment_fruit(choice)
-    same_bool = _check_if_all_same(game_state_optimal)
-    game_state_player = copy.deepcopy(game_state_optimal)
-    game_state_player.fruit_inventory.decrement_fruit(choice)
-    game_state_optimal.fruit_inventory.most_strat()
-
-    diff, player_odds, optimal_odds = win_perc_comp(
-        game_state_player, game_state_optimal
-    )
-    return diff, player_odds, optimal_odds, same_bool
+    fruit_before = dict(game_state.fruit_inventory.fruit_inventory)
+    fruit_before[choice] += 1
+    same_bool = _check_if_all_same(fruit_before.values())
+    odds = game_state.wild_odds
+    if choice not in odds:
+        odds = solve_wild_odds(game_context, fruit_before)
+    optimal_choice = max(fruit_before, key=lambda k: fruit_before[k])
+
+    player_odds, optimal_odds = odds[choice], odds[optimal_choice]
+    worse_odds = min(player_odds, optimal_odds) * 100
+    best_odds = max(player_odds, optimal_odds) * 100
+    return best_odds - worse_odds, worse_odds, best_odds, same_bool
 
 
 def _draw_stats_text(
     game_context: GameContext, odds_results: Tuple[float, float, float, bool]
-) -> None:
+) -> List[pygame.Rect]:
     """
     Draws compared odds between player choice and optimal choice when relevant.
 
@@ -162,22 +229,28 @@ def _draw_stats_text(
         f"{assets.TEXT.BETTER_ODDS_TEXT} {optimal_odds}",
         f"{assets.TEXT.DIFFERENCE_ODDS_TEXT} {diff}",
     ]
+    rects = []
     for offset, message in enumerate(stats_text):
         new_y = (
             int(assets.POSITIONS.COACHING_POS[1])
             + (offset + 1) * assets.POSITIONS.STATS_TEXT_ALTER
         )
         new_pos: Tuple[int, int] = (assets.POSITIONS.COACHING_POS[0], new_y)
-        stats_surface = assets.COACHING_FONT.render(
-            message, assets.ANTIALIASING.COACHING_ANTIALIAS, assets.COLORS.BLACK
+        stats_surface = game_context.text_cache.render(
+            assets.COACHING_FONT,
+            message,
+            assets.ANTIALIASING.COACHING_ANTIALIAS,
+            assets.COLORS.BLACK,
+            volatile=offset > 0,
         )
         stats_text_rect = stats_surface.get_rect(topleft=new_pos)
-        screen.blit(stats_surface, stats_text_rect)
+        rects.append(screen.blit(stats_surface, stats_text_rect))
+    return rects
 
 
 def draw_coaching_text(
     game_context: GameContext, odds_results: Tuple[float, float, float, bool] | None
-) -> None:
+) -> List[pygame.Rect]:
     """
 
     Draws text to explain how player choice compares to optimal choice.
@@ -193,8 +266,9 @@ def draw_coaching_text(
 
     """
     if odds_results is None:
-        return None
+        return []
     assets, _, screen, _ = unpack_game_context(game_context)
+    rects = []
     diff, _, _, same_bool = odds_results
     if diff == 0 and same_bool:
         coaching_text = assets.TEXT.ALL_GOOD_OPTIONS_TEXT
@@ -202,19 +276,24 @@ def draw_coaching_text(
         coaching_text = assets.TEXT.BEST_CHOICE_TEXT
     else:
         coaching_text = assets.TEXT.BAD_CHOICE_TEXT
-        _draw_stats_text(game_context, odds_results)
-    coaching_surface = assets.COACHING_FONT.render(
-        coaching_text, assets.ANTIALIASING.COACHING_ANTIALIAS, assets.COLORS.BLACK
+        rects = _draw_stats_text(game_context, odds_results)
+    coaching_surface = game_context.text_cache.render(
+        assets.COACHING_FONT,
+        coaching_text,
+        assets.ANTIALIASING.COACHING_ANTIALIAS,
+        assets.COLORS.BLACK,
     )
     coaching_rect = coaching_surface.get_rect(topleft=assets.POSITIONS.COACHING_POS)
-    screen.blit(coaching_surface, coaching_rect)
+    rects.append(screen.blit(coaching_surface, coaching_rect))
+    return rects
 
 
 def draw_wild_instruction(game_context: GameContext) -> None:
     """Draws instructions to user when the wild is rolled."""
     assets, _, screen, _ = unpack_game_context(game_context)
     click_fruit_text = assets.TEXT.CHOOSE_FRUIT_TEXT
-    choose_fruit_surface = assets.CHOOSE_FRUIT_FONT.render(
+    choose_fruit_surface = game_context.text_cache.render(
+        assets.CHOOSE_FRUIT_FONT,
         click_fruit_text,
         assets.ANTIALIASING.CHOOSE_FRUIT_ANTIALIAS,
         assets.COLORS.BLACK,
@@ -232,13 +311,16 @@ def erase_coaching_text(game_context: GameContext) -> None:  # X
     screen.blit(background, fill_rect, fill_rect)
 
 
-def _draw_raven_rects(game_context: GameContext, rectangle: pygame.Rect) -> None:
-    """Draws the raven rectangles on the background."""
-    assets, background, _, _ = unpack_game_context(game_context)
-    pygame.draw.rect(background, assets.COLORS.BLACK, rectangle)
+def _draw_raven_rects(
+    game_context: GameContext, rectangle: pygame.Rect
+) -> List[pygame.Rect]:
+    """Draws the raven rectangles on the background and copies them to the screen."""
+    assets, background, screen, _ = unpack_game_context(game_context)
+    raven_rect = pygame.draw.rect(background, assets.COLORS.BLACK, rectangle)
+    return [screen.blit(background, raven_rect, raven_rect)]
 
 
-def draw_raven_track(game_context: GameContext) -> None:
+def draw_raven_track(game_context: GameContext) -> List[pygame.Rect]:
     """Draws the raven track rectangles based on the current game state."""
     assets, _, _, game_state = unpack_game_context(game_context)
     raven_map = {
@@ -250,4 +332,13 @@ def draw_raven_track(game_context: GameContext) -> None:
     }
     raven = raven_map.get(game_state.raven_track.spaces)
     if raven:
-        _draw_raven_rects(game_context, raven)
+        return _draw_raven_rects(game_context, raven)
+    return []
+
+
+def restore_background(
+    game_context: GameContext, rects: List[pygame.Rect]
+) -> List[pygame.Rect]:
+    """Erases what was drawn in rects by copying the background over them."""
+    _, background, screen, _ = unpack_game_context(game_context)
+    return [screen.blit(background, rect, rect) for rect in rects]
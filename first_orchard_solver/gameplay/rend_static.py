@@ -25,11 +25,15 @@ multiple arguments making them slightly unwieldy when trying to call them.
 """
 
 import sys
+from typing import Dict, List, Tuple
 
 import pygame
 
 from first_orchard_solver.gameplay.context import GameContext, unpack_game_context
 
+# Background with the static elements drawn, by size, rendered once per process
+_static_backgrounds: Dict[Tuple[int, int], pygame.Surface] = {}
+
 
 def draw_instruction_text(game_context: GameContext) -> None:
     """Draws roll instruction text on the background."""
@@ -72,19 +76,51 @@ def draw_fruit_circles(game_context: GameContext) -> None:
 
 
 def draw_background(game_context: GameContext) -> None:
-    """Draw all the necessary game elements on the screen."""
+    """
+    Draw all the necessary game elements on the screen.
+
+    The first call renders them and keeps a copy of the background, later calls with
+    a background of the same size copy it instead.
+    """
+    _, background, _, _ = unpack_game_context(game_context)
+    static_background = _static_backgrounds.get(background.get_size())
+    if static_background is not None:
+        background.blit(static_background, (0, 0))
+        return
     draw_instruction_text(game_context)
     draw_fruit_circles(game_context)
+    _static_backgrounds[background.get_size()] = background.copy()
+
+
+def redraw_for_new_game(game_context: GameContext) -> None:
+    """
+    Restore the screen for a new game after the end screen.
+
+    The raven track is the only thing drawn on the background during a game, so only
+    its rectangles are painted over before the background is copied to the screen.
+    """
+    assets, background, screen, _ = unpack_game_context(game_context)
+    for rectangle in (
+        assets.RECTANGLES.RECTANGLE_1,
+        assets.RECTANGLES.RECTANGLE_2,
+        assets.RECTANGLES.RECTANGLE_3,
+        assets.RECTANGLES.RECTANGLE_4,
+        assets.RECTANGLES.RECTANGLE_5,
+    ):
+        background.fill(assets.COLORS.PURPLE, rectangle)
+    screen.blit(background, assets.POSITIONS.SCREEN_POS)
+    pygame.display.flip()
 
 
-def draw_restart_text(game_context: GameContext) -> None:
+def draw_restart_text(game_context: GameContext) -> List[pygame.Rect]:
     """Draws text where user will indicate whether they want to start a new game."""
     assets, _, screen, _ = unpack_game_context(game_context)
-    yes_surface = assets.RESTART_FONT.render(
-        assets.TEXT.RESTART_TEXT_YES, True, assets.COLORS.BLACK
+    text_cache = game_context.text_cache
+    yes_surface = text_cache.render(
+        assets.RESTART_FONT, assets.TEXT.RESTART_TEXT_YES, True, assets.COLORS.BLACK
     )
-    no_surface = assets.RESTART_FONT.render(
-        assets.TEXT.RESTART_TEXT_NO, True, assets.COLORS.BLACK
+    no_surface = text_cache.render(
+        assets.RESTART_FONT, assets.TEXT.RESTART_TEXT_NO, True, assets.COLORS.BLACK
     )
 
     assets.RECTANGLES.RESTART_BOX_YES = yes_surface.get_rect(
@@ -93,32 +129,41 @@ def draw_restart_text(game_context: GameContext) -> None:
     assets.RECTANGLES.RESTART_BOX_NO = no_surface.get_rect(
         topleft=assets.POSITIONS.RESTART_POS_NO
     )
-    screen.blit(yes_surface, assets.RECTANGLES.RESTART_BOX_YES)
-    screen.blit(no_surface, assets.RECTANGLES.RESTART_BOX_NO)
+    return [
+        screen.blit(yes_surface, assets.RECTANGLES.RESTART_BOX_YES),
+        screen.blit(no_surface, assets.RECTANGLES.RESTART_BOX_NO),
+    ]
 
 
-def draw_end_result_text(game_context: GameContext, win: bool) -> None:
+def draw_end_result_text(game_context: GameContext, win: bool) -> List[pygame.Rect]:
     """Render the end result on screen."""
     assets, _, screen, _ = unpack_game_context(game_context)
-    screen.fill(assets.COLORS.PURPLE)
+    screen_rect = screen.fill(assets.COLORS.PURPLE)
     if win:
         game_result_text = assets.TEXT.WIN_GAME_TEXT
     else:
         game_result_text = assets.TEXT.LOSE_GAME_TEXT
 
-    game_result_surface = assets.GAME_RESULT_FONT.render(
-        game_result_text, assets.ANTIALIASING.GAME_RESULT_ANTIALIAS, assets.COLORS.BLACK
+    game_result_surface = game_context.text_cache.render(
+        assets.GAME_RESULT_FONT,
+        game_result_text,
+        assets.ANTIALIASING.GAME_RESULT_ANTIALIAS,
+        assets.COLORS.BLACK,
     )
     end_game_rect = game_result_surface.get_rect(
         center=assets.POSITIONS.GAME_RESULT_POS
     )
     screen.blit(game_result_surface, end_game_rect)
+    return [screen_rect]
 
 
-def draw_end_screen(game_context: GameContext, game_result: bool) -> None:  # X
+def draw_end_screen(
+    game_context: GameContext, game_result: bool
+) -> List[pygame.Rect]:  # X
     """Draws the end of game screen."""
-    draw_end_result_text(game_context, game_result)
-    draw_restart_text(game_context)
+    return draw_end_result_text(game_context, game_result) + draw_restart_text(
+        game_context
+    )
 
 
 def draw_final_message(game_context: GameContext) -> None:  # X
@@ -138,12 +183,14 @@ def final_message_loop(game_context: GameContext) -> None:
     draw_final_message(game_context)
     pygame.display.flip()
 
-    # Freeze here until quit
+    # Freeze here until quit, sleeping until each event arrives
     waiting = True
     while waiting:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                waiting = False
-                pygame.quit()
-                sys.exit()
-                return
+        event = pygame.event.wait()
+        if event.type == pygame.WINDOWEXPOSED:
+            pygame.display.flip()
+        if event.type == pygame.QUIT:
+            waiting = False
+            pygame.quit()
+            sys.exit()
+            return
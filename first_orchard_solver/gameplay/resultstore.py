@@ -0,0 +1,375 @@
+"""
+Module to store simulation and solver results of the Orchard game in SQLite.
+
+Results are keyed by rule set, state, strategy, seed (simulations only) and the code
+version, a hash of the modules that decide the results. Editing the game logic, the
+simulator, the solver or the built-in strategies therefore starts a fresh set of
+results, while old rows stay queryable under their own version.
+
+    simulations: One row per seeded run_batches call and strategy, with the wins of
+    every batch and the GameStats histograms as JSON.
+
+    solves: One row per state and strategy with the win_perc result.
+
+Only seeded simulations are stored, unseeded runs are never repeatable. Strategies
+registered at runtime are not part of the code version, so give them a new name when
+their behavior changes.
+"""
+
+import hashlib
+import json
+import sqlite3
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Dict, Iterable, List, Tuple, Type
+
+import numpy as np
+import numpy.typing as npt
+
+from first_orchard_solver.gameplay.gamelogic import BASE_RULES, RuleSet
+
+VERSIONED_MODULES = ("gamelogic.py", "gamesims.py", "gamesolver.py", "strategies.py")
+# Query default meaning code_version(), which is only hashed when a query needs it
+CURRENT_VERSION = "current"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS solves (
+    fruit_types INTEGER NOT NULL,
+    fruit_per_type INTEGER NOT NULL,
+    raven_spaces INTEGER NOT NULL,
+    wild_faces INTEGER NOT NULL,
+    fruit TEXT NOT NULL,
+    raven INTEGER NOT NULL,
+    strat TEXT NOT NULL,
+    code_version TEXT NOT NULL,
+    win REAL NOT NULL,
+    loss REAL NOT NULL,
+    PRIMARY KEY (fruit_types, fruit_per_type, raven_spaces, wild_faces, fruit, raven,
+        strat, code_version)
+);
+CREATE TABLE IF NOT EXISTS simulations (
+    fruit_types INTEGER NOT NULL,
+    fruit_per_type INTEGER NOT NULL,
+    raven_spaces INTEGER NOT NULL,
+    wild_faces INTEGER NOT NULL,
+    fruit TEXT NOT NULL,
+    raven INTEGER NOT NULL,
+    strat TEXT NOT NULL,
+    seed INTEGER NOT NULL,
+    n_runs INTEGER NOT NULL,
+    n_times INTEGER NOT NULL,
+    code_version TEXT NOT NULL,
+    batch_wins TEXT NOT NULL,
+    histograms TEXT NOT NULL,
+    PRIMARY KEY (fruit_types, fruit_per_type, raven_spaces, wild_faces, fruit, raven,
+        strat, seed, n_runs, n_times, code_version)
+);
+"""
+
+_RULES_COLUMNS = "fruit_types, fruit_per_type, raven_spaces, wild_faces"
+_SOLVE_COLUMNS = f"{_RULES_COLUMNS}, fruit, raven, strat, code_version, win, loss"
+_SIMULATION_COLUMNS = (
+    f"{_RULES_COLUMNS}, fruit, raven, strat, seed, n_runs, n_times, code_version, "
+    "batch_wins, histograms"
+)
+
+
+@lru_cache(maxsize=None)
+def code_version() -> str:
+    """Return a short hash of the source of every module in VERSIONED_MODULES."""
+    digest = hashlib.sha256()
+    for module in VERSIONED_MODULES:
+        digest.update(Path(__file__).with_name(module).read_bytes())
+    return digest.hexdigest()[:12]
+
+
+@dataclass(frozen=True)
+class SolveRecord:
+    """
+    Class to hold the solved win and loss probability of one state.
+
+    Attributes
+    ----------
+        fruit_count (Tuple[int, ...]): Fruit counts of the state.
+        raven_track (int): Raven spaces of the state.
+        strat (str): Strategy used for the wild rolls.
+        win (float): Win probability from win_perc.
+        loss (float): Loss probability from win_perc.
+        rules (RuleSet): Size of the game.
+        code_version (str): Version of the code that solved it.
+
+    """
+
+    fruit_count: Tuple[int, ...]
+    raven_track: int
+    strat: str
+    win: float
+    loss: float
+    rules: RuleSet = BASE_RULES
+    code_version: str = field(default_factory=code_version)
+
+
+@dataclass(frozen=True)
+class SimulationRecord:
+    """
+    Class to hold the results of one strategy of a seeded run_batches call.
+
+    Attributes
+    ----------
+        fruit_count (Tuple[int, ...]): Fruit counts of the starting state.
+        raven_track (int): Raven spaces of the starting state.
+        strat (str): Strategy used for the wild rolls.
+        seed (int): Seed passed to run_batches.
+        n_runs (int): Games per batch.
+        batch_wins (Tuple[int, ...]): Games won in each of the n_times batches.
+        histograms (Dict[str, npt.NDArray[np.int64]]): GameStats histograms of every
+        game played, by attribute name.
+        rules (RuleSet): Size of the game.
+        code_version (str): Version of the code that simulated it.
+
+    """
+
+    fruit_count: Tuple[int, ...]
+    raven_track: int
+    strat: str
+    seed: int
+    n_runs: int
+    batch_wins: Tuple[int, ...]
+    histograms: Dict[str, npt.NDArray[np.int64]] = field(compare=False)
+    rules: RuleSet = BASE_RULES
+    code_version: str = field(default_factory=code_version)
+
+    @property
+    def n_times(self) -> int:
+        """Number of batches."""
+        return len(self.batch_wins)
+
+
+def _fruit_key(fruit_count: Tuple[int, ...]) -> str:
+    """Encode fruit counts as the text stored in the fruit column."""
+    return ",".join(str(count) for count in fruit_count)
+
+
+def _rules_key(rules: RuleSet) -> Tuple[int, int, int, int]:
+    """Return the rule set columns of a row."""
+    return rules.fruit_types, rules.fruit_per_type, rules.raven_spaces, rules.wild_faces
+
+
+def _rules_from_row(row: sqlite3.Row) -> RuleSet:
+    """Return the rule set of a row."""
+    return RuleSet(
+        row["fruit_types"],
+        row["fruit_per_type"],
+        row["raven_spaces"],
+        row["wild_faces"],
+    )
+
+
+def _solve_from_row(row: sqlite3.Row) -> SolveRecord:
+    """Convert a solves row into a SolveRecord."""
+    return SolveRecord(
+        fruit_count=tuple(int(count) for count in row["fruit"].split(",")),
+        raven_track=row["raven"],
+        strat=row["strat"],
+        win=row["win"],
+        loss=row["loss"],
+        rules=_rules_from_row(row),
+        code_version=row["code_version"],
+    )
+
+
+def _simulation_from_row(row: sqlite3.Row) -> SimulationRecord:
+    """Convert a simulations row into a SimulationRecord."""
+    histograms = {
+        name: np.array(counts, dtype=np.int64)
+        for name, counts in json.loads(row["histograms"]).items()
+    }
+    return SimulationRecord(
+        fruit_count=tuple(int(count) for count in row["fruit"].split(",")),
+        raven_track=row["raven"],
+        strat=row["strat"],
+        seed=row["seed"],
+        n_runs=row["n_runs"],
+        batch_wins=tuple(json.loads(row["batch_wins"])),
+        histograms=histograms,
+        rules=_rules_from_row(row),
+        code_version=row["code_version"],
+    )
+
+
+class ResultStore:
+    """
+    SQLite store of simulation and solver results.
+
+    Args:
+    ----
+            path (str | Path): Database file, created if missing. Defaults to an
+            in-memory database.
+
+    """
+
+    def __init__(self, path: str | Path = ":memory:") -> None:
+        """Open the database and create the tables if needed."""
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.executescript(_SCHEMA)
+        return None
+
+    def put_solves(self, records: Iterable[SolveRecord]) -> None:
+        """Insert or replace many solves in one transaction."""
+        rows = [
+            (
+                *_rules_key(r.rules),
+                _fruit_key(r.fruit_count),
+                r.raven_track,
+                r.strat,
+                r.code_version,
+                r.win,
+                r.loss,
+            )
+            for r in records
+        ]
+        with self._connection:
+            self._connection.executemany(
+                f"INSERT OR REPLACE INTO solves ({_SOLVE_COLUMNS}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def put_simulations(self, records: Iterable[SimulationRecord]) -> None:
+        """Insert or replace many simulations in one transaction."""
+        rows = [
+            (
+                *_rules_key(r.rules),
+                _fruit_key(r.fruit_count),
+                r.raven_track,
+                r.strat,
+                r.seed,
+                r.n_runs,
+                r.n_times,
+                r.code_version,
+                json.dumps(list(r.batch_wins)),
+                json.dumps({k: v.tolist() for k, v in r.histograms.items()}),
+            )
+            for r in records
+        ]
+        with self._connection:
+            self._connection.executemany(
+                f"INSERT OR REPLACE INTO simulations ({_SIMULATION_COLUMNS}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def _select(self, table: str, filters: Dict[str, Any]) -> List[sqlite3.Row]:
+        """Return the rows of a table matching every filter that is not None."""
+        used = {column: value for column, value in filters.items() if value is not None}
+        where = " AND ".join(f"{column} = ?" for column in used) or "1"
+        query = f"SELECT * FROM {table} WHERE {where}"
+        return self._connection.execute(query, tuple(used.values())).fetchall()
+
+    @staticmethod
+    def _filters(
+        fruit_count: Tuple[int, ...] | None,
+        raven_track: int | None,
+        strat: str | None,
+        rules: RuleSet | None,
+        version: str | None,
+    ) -> Dict[str, Any]:
+        """Map the shared query arguments to column filters."""
+        fruit_types, fruit_per_type, raven_spaces, wild_faces = (
+            _rules_key(rules) if rules is not None else (None, None, None, None)
+        )
+        return {
+            "fruit_types": fruit_types,
+            "fruit_per_type": fruit_per_type,
+            "raven_spaces": raven_spaces,
+            "wild_faces": wild_faces,
+            "fruit": _fruit_key(fruit_count) if fruit_count is not None else None,
+            "raven": raven_track,
+            "strat": strat,
+            "code_version": version,
+        }
+
+    def query_solves(
+        self,
+        fruit_count: Tuple[int, ...] | None = None,
+        raven_track: int | None = None,
+        strat: str | None = None,
+        rules: RuleSet | None = BASE_RULES,
+        version: str | None = CURRENT_VERSION,
+    ) -> List[SolveRecord]:
+        """
+        Return every stored solve matching the given filters.
+
+        Filters left as None match anything. By default only solves of the base game
+        made by the current code version are returned.
+        """
+        if version == CURRENT_VERSION:
+            version = code_version()
+        filters = self._filters(fruit_count, raven_track, strat, rules, version)
+        return [_solve_from_row(row) for row in self._select("solves", filters)]
+
+    def query_simulations(
+        self,
+        fruit_count: Tuple[int, ...] | None = None,
+        raven_track: int | None = None,
+        strat: str | None = None,
+        seed: int | None = None,
+        rules: RuleSet | None = BASE_RULES,
+        version: str | None = CURRENT_VERSION,
+    ) -> List[SimulationRecord]:
+        """Return every stored simulation matching the filters, like query_solves."""
+        if version == CURRENT_VERSION:
+            version = code_version()
+        filters = self._filters(fruit_count, raven_track, strat, rules, version)
+        filters["seed"] = seed
+        return [
+            _simulation_from_row(row) for row in self._select("simulations", filters)
+        ]
+
+    def get_solve(
+        self,
+        fruit_count: Tuple[int, ...],
+        raven_track: int,
+        strat: str,
+        rules: RuleSet = BASE_RULES,
+    ) -> Tuple[float, float] | None:
+        """Return the stored (win, loss) of a state for the current code, or None."""
+        records = self.query_solves(fruit_count, raven_track, strat, rules)
+        return (records[0].win, records[0].loss) if records else None
+
+    def get_simulation(
+        self,
+        fruit_count: Tuple[int, ...],
+        raven_track: int,
+        strat: str,
+        seed: int,
+        n_runs: int,
+        n_times: int,
+        rules: RuleSet = BASE_RULES,
+    ) -> SimulationRecord | None:
+        """Return the stored simulation for the current code, or None."""
+        filters = self._filters(fruit_count, raven_track, strat, rules, code_version())
+        filters.update(seed=seed, n_runs=n_runs, n_times=n_times)
+        rows = self._select("simulations", filters)
+        return _simulation_from_row(rows[0]) if rows else None
+
+    def close(self) -> None:
+        """Close the database."""
+        self._connection.close()
+
+    def __enter__(self) -> "ResultStore":
+        """Return the store for use in a with block."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the database when leaving a with block."""
+        self.close()
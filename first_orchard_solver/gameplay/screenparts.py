@@ -0,0 +1,81 @@
+"""
+Module to track which parts of the pygame screen need drawing again.
+
+The dynamic part of the screen is split into parts drawn by draw_all_screen, each
+depending on a few things about the game:
+
+    fruit: the fruit counts in the circles.
+    die: the die, its face or the text replacing it on a raven or wild roll.
+    raven: the raven track.
+    odds: the chance of winning from the current state.
+    wild_odds: the chance of winning after each choice on a wild roll.
+    coaching: how the last wild choice compares to the best one.
+    end: the end screen.
+
+ScreenChanges listens to the GameEvents of a GameState and marks the parts each event
+touches, so a frame only erases and draws those, and a frame after no change draws
+nothing.
+"""
+
+from typing import Dict, FrozenSet, Set
+
+from first_orchard_solver.gameplay.gamelogic import (
+    DieRolled,
+    FruitChanged,
+    GameEvent,
+    RavenMoved,
+    UiStateChanged,
+)
+
+SCREEN_PARTS = ("fruit", "die", "raven", "odds", "wild_odds", "coaching", "end")
+
+_FRUIT_PARTS = frozenset({"fruit", "odds", "coaching", "end"})
+_RAVEN_PARTS = frozenset({"raven", "odds", "coaching", "end"})
+_UI_PARTS: Dict[str, FrozenSet[str]] = {
+    "replace_text": frozenset({"die"}),
+    "die_click_enabled": frozenset({"wild_odds"}),
+    "wild_odds": frozenset({"wild_odds", "coaching"}),
+    "stats_flag": frozenset({"coaching"}),
+}
+
+
+class ScreenChanges:
+    """
+    Parts of the screen changed since they were last drawn, updated by GameEvents.
+
+    Attributes
+    ----------
+        dirty (Set[str]): Names from SCREEN_PARTS to draw again, all of them at first.
+
+    """
+
+    def __init__(self) -> None:
+        """Start with every part to draw."""
+        self.dirty: Set[str] = set(SCREEN_PARTS)
+        return None
+
+    def __call__(self, event: GameEvent) -> None:
+        """Mark the parts a GameEvent changes."""
+        if isinstance(event, FruitChanged):
+            self.dirty |= _FRUIT_PARTS
+        elif isinstance(event, RavenMoved):
+            self.dirty |= _RAVEN_PARTS
+        elif isinstance(event, DieRolled):
+            self.dirty.add("die")
+        elif isinstance(event, UiStateChanged):
+            self.dirty |= _UI_PARTS.get(event.name, frozenset())
+        else:
+            self.mark_all()
+
+    def mark(self, part: str) -> None:
+        """Mark one part to draw again."""
+        self.dirty.add(part)
+
+    def mark_all(self) -> None:
+        """Mark every part, for changes that are not GameEvents like the options."""
+        self.dirty.update(SCREEN_PARTS)
+
+    def take(self) -> Set[str]:
+        """Return the marked parts and clear them."""
+        dirty, self.dirty = self.dirty, set()
+        return dirty
@@ -0,0 +1,151 @@
+"""
+Module to measure simulation throughput and report progress for the Orchard game.
+
+A MetricsReporter is updated after every chunk of simulated games with the number of
+games and die rolls played and the time the worker spent playing them. From that it
+keeps a SimulationMetrics with games/s, rolls/s, per-worker utilization and the
+estimated time left, passes it to an optional progress callback, and writes it to an
+optional JSON file at most every dump_interval seconds and once more at the end.
+"""
+
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+DEFAULT_DUMP_INTERVAL = 5.0
+
+
+@dataclass
+class SimulationMetrics:
+    """
+    Class to hold the throughput of a simulation run.
+
+    Attributes
+    ----------
+        total_games (int): Games the run will play in total.
+        games_done (int): Games played so far.
+        rolls_done (int): Die rolls played so far.
+        elapsed (float): Seconds since the run started.
+        worker_busy (Dict[str, float]): Seconds each worker spent simulating.
+        finished (bool): Whether the run is over.
+
+    """
+
+    total_games: int
+    games_done: int = 0
+    rolls_done: int = 0
+    elapsed: float = 0.0
+    worker_busy: Dict[str, float] = field(default_factory=dict)
+    finished: bool = False
+
+    @property
+    def games_per_sec(self) -> float:
+        """Games played per second of wall time."""
+        return self.games_done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def rolls_per_sec(self) -> float:
+        """Die rolls played per second of wall time."""
+        return self.rolls_done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def fraction_done(self) -> float:
+        """Share of the games played so far."""
+        return self.games_done / self.total_games if self.total_games else 1.0
+
+    @property
+    def eta(self) -> float | None:
+        """Estimated seconds left at the current rate, None before the first games."""
+        if self.games_done == 0:
+            return None
+        return (self.total_games - self.games_done) / self.games_per_sec
+
+    @property
+    def worker_utilization(self) -> Dict[str, float]:
+        """Share of the wall time each worker spent simulating."""
+        if self.elapsed <= 0:
+            return {worker: 0.0 for worker in self.worker_busy}
+        return {
+            worker: busy / self.elapsed for worker, busy in self.worker_busy.items()
+        }
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return every counter and derived rate, ready for json.dumps."""
+        return {
+            "total_games": self.total_games,
+            "games_done": self.games_done,
+            "rolls_done": self.rolls_done,
+            "elapsed": self.elapsed,
+            "games_per_sec": self.games_per_sec,
+            "rolls_per_sec": self.rolls_per_sec,
+            "fraction_done": self.fraction_done,
+            "eta": self.eta,
+            "worker_utilization": self.worker_utilization,
+            "finished": self.finished,
+        }
+
+
+ProgressCallback = Callable[[SimulationMetrics], None]
+
+
+class MetricsReporter:
+    """
+    Keeps SimulationMetrics up to date and reports them.
+
+    Args:
+    ----
+            total_games (int): Games the run will play in total, for the ETA.
+
+            progress (ProgressCallback | None): Called with the metrics after every
+            update and at the end.
+
+            dump_path (str | Path | None): JSON file the metrics are written to.
+
+            dump_interval (float): Least number of seconds between two dumps.
+
+    """
+
+    def __init__(
+        self,
+        total_games: int,
+        progress: ProgressCallback | None = None,
+        dump_path: str | Path | None = None,
+        dump_interval: float = DEFAULT_DUMP_INTERVAL,
+    ) -> None:
+        """Start the clock."""
+        self.metrics = SimulationMetrics(total_games)
+        self.progress = progress
+        self.dump_path = None if dump_path is None else Path(dump_path)
+        self.dump_interval = dump_interval
+        self._start = time.perf_counter()
+        self._last_dump = self._start
+        return None
+
+    def update(self, games: int, rolls: int, busy: float, worker: str = "main") -> None:
+        """Add a chunk of games played by worker in busy seconds and report."""
+        metrics = self.metrics
+        metrics.games_done += games
+        metrics.rolls_done += rolls
+        metrics.worker_busy[worker] = metrics.worker_busy.get(worker, 0.0) + busy
+        metrics.elapsed = time.perf_counter() - self._start
+        self._report(force_dump=False)
+
+    def finish(self) -> SimulationMetrics:
+        """Mark the run as over, report one last time and return the metrics."""
+        self.metrics.elapsed = time.perf_counter() - self._start
+        self.metrics.finished = True
+        self._report(force_dump=True)
+        return self.metrics
+
+    def _report(self, force_dump: bool) -> None:
+        """Call the progress callback and dump the metrics if it is time to."""
+        if self.progress is not None:
+            self.progress(self.metrics)
+        now = time.perf_counter()
+        if self.dump_path is not None and (
+            force_dump or now - self._last_dump >= self.dump_interval
+        ):
+            self.dump_path.write_text(json.dumps(self.metrics.as_dict(), indent=2))
+            self._last_dump = now
@@ -0,0 +1,140 @@
+"""
+Module to number the canonical states of the Orchard game with dense integer ranks.
+
+Fruit colors are interchangeable, so a state only matters up to the order of its fruit
+counts, and the canonical state keeps them in ascending order. CanonicalIndex maps
+canonical states to ranks 0, ..., size - 1 and back without enumerating any other
+state, so per-state-type results fit in flat arrays for any rule set.
+
+Fruit counts c_0 <= ... <= c_{k-1} are ranked with the combinatorial number system:
+d_i = c_i + i is strictly increasing, and
+
+    fruit_rank = C(d_0, 1) + C(d_1, 2) + ... + C(d_{k-1}, k)
+
+is a bijection onto 0, ..., C(fruit_per_type + k, k) - 1. The raven spaces are the
+fastest-moving part of the rank:
+
+    rank = fruit_rank * (raven_spaces + 1) + raven
+
+so ranks enumerate the states in colexicographic order of their fruit counts.
+"""
+
+from functools import lru_cache
+from math import comb
+from typing import Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from first_orchard_solver.gameplay.gamelogic import BASE_RULES, RuleSet
+
+CanonicalStates = Tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]
+
+
+class CanonicalIndex:
+    """
+    Ranks the canonical states of a rule set, vectorized over many states.
+
+    Args:
+    ----
+            rules (RuleSet): Rule set whose states are ranked.
+
+    """
+
+    def __init__(self, rules: RuleSet = BASE_RULES) -> None:
+        """Tabulate the binomial coefficients the ranks are made of."""
+        self.rules = rules
+        k = rules.fruit_types
+        top = rules.fruit_per_type + k
+        # _binom[m, j] = C(m, j), nondecreasing in m for every j
+        self._binom = np.array(
+            [[comb(m, j) for j in range(k + 1)] for m in range(top + 1)],
+            dtype=np.int64,
+        )
+        self._offsets = np.arange(k, dtype=np.int64)
+        self.fruit_sets: int = comb(top, k)
+        self.size: int = self.fruit_sets * (rules.raven_spaces + 1)
+        return None
+
+    def rank(
+        self,
+        fruit: npt.ArrayLike,
+        raven: npt.ArrayLike,
+    ) -> npt.NDArray[np.int64]:
+        """
+        Return the rank of the canonical state of every (fruit, raven) state.
+
+        The fruit counts may be in any order. Raises a ValueError if a count or raven
+        position is outside the rule set.
+
+        Args:
+        ----
+                fruit (npt.ArrayLike): (..., fruit_types) fruit counts.
+
+                raven (npt.ArrayLike): (...) raven spaces.
+
+        Returns:
+        -------
+                ranks (npt.NDArray[np.int64]): (...) rank of every state.
+
+        """
+        counts = np.sort(np.asarray(fruit, dtype=np.int64), axis=-1)
+        spaces = np.asarray(raven, dtype=np.int64)
+        if counts.shape[-1] != self.rules.fruit_types:
+            raise ValueError(
+                f"Expected {self.rules.fruit_types} fruit counts, got "
+                f"{counts.shape[-1]}."
+            )
+        top = self.rules.fruit_per_type
+        if counts.size and (counts[..., 0].min() < 0 or counts.max() > top):
+            raise ValueError(f"Fruit counts outside 0-{top}.")
+        if spaces.size and (spaces.min() < 0 or spaces.max() > self.rules.raven_spaces):
+            raise ValueError(f"Raven spaces outside 0-{self.rules.raven_spaces}.")
+        fruit_rank = self._binom[counts + self._offsets, self._offsets + 1].sum(axis=-1)
+        ranks: npt.NDArray[np.int64] = (
+            fruit_rank * (self.rules.raven_spaces + 1) + spaces
+        )
+        return ranks
+
+    def unrank(self, ranks: npt.ArrayLike) -> CanonicalStates:
+        """
+        Return the canonical state of every rank.
+
+        Raises a ValueError if a rank is not below size.
+
+        Returns
+        -------
+                fruit, raven (CanonicalStates): (..., fruit_types) fruit counts in
+                ascending order and (...) raven spaces.
+
+        """
+        ranks = np.asarray(ranks, dtype=np.int64)
+        if ranks.size and (ranks.min() < 0 or ranks.max() >= self.size):
+            raise ValueError(f"Ranks outside 0-{self.size - 1}.")
+        fruit_rank, raven = np.divmod(ranks, self.rules.raven_spaces + 1)
+        fruit = np.empty((*ranks.shape, self.rules.fruit_types), dtype=np.int64)
+        for i in reversed(range(self.rules.fruit_types)):
+            # The largest d with C(d, i + 1) <= fruit_rank
+            column = self._binom[:, i + 1]
+            d = np.searchsorted(column, fruit_rank, side="right") - 1
+            fruit_rank = fruit_rank - column[d]
+            fruit[..., i] = d - i
+        return fruit, raven
+
+    def states(self) -> CanonicalStates:
+        """Return every canonical state, in rank order."""
+        return self.unrank(np.arange(self.size))
+
+    def table_index(self, ranks: npt.ArrayLike) -> npt.NDArray[np.intp]:
+        """Return the entry of each canonical state in a flattened rules.shape table."""
+        fruit, raven = self.unrank(ranks)
+        index: npt.NDArray[np.intp] = np.ravel_multi_index(
+            (*np.moveaxis(fruit, -1, 0), raven), self.rules.shape
+        )
+        return index
+
+
+@lru_cache(maxsize=None)
+def canonical_index(rules: RuleSet = BASE_RULES) -> CanonicalIndex:
+    """Return the shared CanonicalIndex of a rule set."""
+    return CanonicalIndex(rules)
@@ -0,0 +1,149 @@
+"""
+Module holds the registry of wild-roll strategies for the Orchard game.
+
+A strategy is registered once and carries every implementation the rest of the
+package needs:
+
+    scalar: mutates a FruitInventory in place, used by the UI and scalar games.
+
+    vectorized: maps an (N, fruit_types) array of fruit counts to an (N,) array of
+    chosen fruit columns, used by the NumPy simulator and batch tools.
+
+    analytic (optional): maps a fruit count tuple to the probability of choosing each
+    fruit column, used by the solver so stochastic strategies are solved exactly.
+
+Registering a new strategy makes it available to run_batches, win_perc and anything
+else that looks strategies up by name.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Tuple, TypeAlias
+
+import numpy as np
+import numpy.typing as npt
+
+from first_orchard_solver.gameplay.gamelogic import FruitInventory
+
+Strategy: TypeAlias = str
+FruitCounts: TypeAlias = npt.NDArray[np.int64]
+Choices: TypeAlias = npt.NDArray[np.intp]
+ScalarStrat: TypeAlias = Callable[[FruitInventory], None]
+VectorizedStrat: TypeAlias = Callable[[FruitCounts, np.random.Generator], Choices]
+AnalyticStrat: TypeAlias = Callable[[Tuple[int, ...]], Tuple[float, ...]]
+
+
+@dataclass(frozen=True)
+class StrategySpec:
+    """
+    Class to hold every implementation of a single wild-roll strategy.
+
+    Attributes
+    ----------
+        name (Strategy): Name the strategy is registered and looked up under.
+        scalar (ScalarStrat): Decrements one fruit of a FruitInventory in place.
+        vectorized (VectorizedStrat): Returns the chosen fruit column for each row of
+        an (N, fruit_types) count array. Rows always have at least one fruit left.
+        analytic (AnalyticStrat | None): Returns the probability of choosing each
+        fruit column for a count tuple. None means the strategy is deterministic and
+        the solver uses the scalar implementation.
+
+    """
+
+    name: Strategy
+    scalar: ScalarStrat
+    vectorized: VectorizedStrat
+    analytic: AnalyticStrat | None = None
+
+
+_REGISTRY: Dict[Strategy, StrategySpec] = {}
+
+
+def register_strategy(
+    name: Strategy,
+    scalar: ScalarStrat,
+    vectorized: VectorizedStrat,
+    analytic: AnalyticStrat | None = None,
+    replace: bool = False,
+) -> StrategySpec:
+    """
+    Register a strategy so simulations and the solver can look it up by name.
+
+    Args:
+    ----
+            name (Strategy): Name of the strategy, e.g. "most".
+
+            scalar (ScalarStrat): Implementation used on a single FruitInventory.
+
+            vectorized (VectorizedStrat): Implementation used on count arrays.
+
+            analytic (AnalyticStrat | None): Optional choice distribution for the
+            solver. Defaults to None.
+
+            replace (bool): Allow overwriting an existing registration. Defaults to
+            False.
+
+    Returns:
+    -------
+            spec (StrategySpec): The registered strategy.
+
+    """
+    if name in _REGISTRY and not replace:
+        raise ValueError(f"Strategy {name!r} is already registered.")
+    spec = StrategySpec(
+        name=name, scalar=scalar, vectorized=vectorized, analytic=analytic
+    )
+    _REGISTRY[name] = spec
+    return spec
+
+
+def get_strategy(name: Strategy) -> StrategySpec:
+    """Return the registered strategy with the given name."""
+    try:
+        return _REGISTRY[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown strategy {name!r}. Options are {available_strategies()}."
+        ) from None
+
+
+def available_strategies() -> Tuple[Strategy, ...]:
+    """Return the names of all registered strategies in registration order."""
+    return tuple(_REGISTRY)
+
+
+# ------------------------
+# Built-in strategies
+# ------------------------
+def _most_vectorized(counts: FruitCounts, rng: np.random.Generator) -> Choices:
+    """Choose the first fruit column with the most remaining."""
+    choices: Choices = np.argmax(counts, axis=1)
+    return choices
+
+
+def _fewest_vectorized(counts: FruitCounts, rng: np.random.Generator) -> Choices:
+    """Choose the first non-empty fruit column with the fewest remaining."""
+    masked = np.where(counts > 0, counts, np.iinfo(np.int64).max)
+    choices: Choices = np.argmin(masked, axis=1)
+    return choices
+
+
+def _random_vectorized(counts: FruitCounts, rng: np.random.Generator) -> Choices:
+    """Choose a uniformly random non-empty fruit column."""
+    non_zero = counts > 0
+    # Pick the k-th non-empty column by comparing a uniform draw to the running count
+    pick = (rng.random(counts.shape[0]) * non_zero.sum(axis=1)).astype(np.int64)
+    choices: Choices = np.argmax(np.cumsum(non_zero, axis=1) > pick[:, None], axis=1)
+    return choices
+
+
+def _random_analytic(fruit_count: Tuple[int, ...]) -> Tuple[float, ...]:
+    """Give every non-empty fruit column the same chance of being chosen."""
+    non_zero = sum(1 for fruit in fruit_count if fruit > 0)
+    return tuple(1 / non_zero if fruit > 0 else 0.0 for fruit in fruit_count)
+
+
+register_strategy("fewest", FruitInventory.fewest_strat, _fewest_vectorized)
+register_strategy("most", FruitInventory.most_strat, _most_vectorized)
+register_strategy(
+    "random", FruitInventory.random_strat, _random_vectorized, _random_analytic
+)
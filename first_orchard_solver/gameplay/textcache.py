@@ -0,0 +1,105 @@
+"""
+Module to cache rendered text surfaces for the pygame version of the Orchard game.
+
+Rendering text is the most expensive part of drawing a frame, yet most of the text on
+screen only changes after a roll. A TextCache keeps the surfaces it rendered, keyed by
+(font, text, antialias, color), and hands the same surface back until it is evicted.
+
+Entries are evicted least recently used first once the cache holds maxsize surfaces.
+Text that depends on the game state, like the odds, is rendered as volatile: it is
+dropped as soon as the game state changes, since it is unlikely to be shown again.
+"""
+
+from collections import OrderedDict
+from typing import Any, Hashable, Set, Tuple
+
+import pygame
+
+DEFAULT_TEXT_CACHE_SIZE = 128
+
+TextKey = Tuple[pygame.font.Font, str, bool, Tuple[int, ...]]
+
+
+class TextCache:
+    """
+    LRU cache of rendered text surfaces.
+
+    Args:
+    ----
+            maxsize (int): Most surfaces kept at once.
+
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_TEXT_CACHE_SIZE) -> None:
+        """Start with an empty cache."""
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be at least 1, got {maxsize}.")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._surfaces: OrderedDict[TextKey, pygame.Surface] = OrderedDict()
+        self._volatile: Set[TextKey] = set()
+        self._state_key: Hashable = None
+        return None
+
+    def __len__(self) -> int:
+        """Return the number of cached surfaces."""
+        return len(self._surfaces)
+
+    def render(
+        self,
+        font: pygame.font.Font,
+        text: str,
+        antialias: bool,
+        color: Any,
+        volatile: bool = False,
+    ) -> pygame.Surface:
+        """
+        Return text rendered in font, rendering it only if it is not cached.
+
+        The returned surface is shared, so blit it but do not draw on it.
+
+        Args:
+        ----
+                font (pygame.font.Font): Font to render the text in.
+
+                text (str): Text to render.
+
+                antialias (bool): Whether to antialias the text.
+
+                color (Any): Color of the text.
+
+                volatile (bool): Whether the text depends on the game state, dropping
+                it at the next state change.
+
+        """
+        key: TextKey = (font, text, antialias, tuple(color))
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+        else:
+            self.misses += 1
+            surface = font.render(text, antialias, color)
+            self._surfaces[key] = surface
+            if len(self._surfaces) > self.maxsize:
+                oldest, _ = self._surfaces.popitem(last=False)
+                self._volatile.discard(oldest)
+        if volatile:
+            self._volatile.add(key)
+        return surface
+
+    def sync(self, state_key: Hashable) -> None:
+        """Drop the volatile surfaces if the game state changed since the last call."""
+        if state_key == self._state_key:
+            return
+        self._state_key = state_key
+        for key in self._volatile:
+            del self._surfaces[key]
+        self._volatile.clear()
+
+    def clear(self) -> None:
+        """Drop every cached surface."""
+        self._surfaces.clear()
+        self._volatile.clear()
+        self._state_key = None
@@ -0,0 +1,178 @@
+"""
+Module to replay scripted games through the pygame version of the Orchard game.
+
+A script is a list of (die_result, choice) events as stored by TrajectoryRecorder: the
+die face rolled and, on a wild roll, the fruit column the player clicked. Every event
+is fed through the same eventhandler functions the game loop calls, with the wild
+choice sent as a synthesized click on the fruit circle, and each frame is drawn with
+draw_all_screen. The time each frame takes, from handling its input to updating the
+display, is collected in FrameStats.
+
+Use init_game_context(headless=True) to replay on SDL's dummy video driver, for
+load testing and benchmarking the UI on machines without a display.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+import pygame
+
+from first_orchard_solver.gameplay import eventhandler as eh
+from first_orchard_solver.gameplay.context import GameContext, unpack_game_context
+from first_orchard_solver.gameplay.recorder import TrajectoryReader, decode_event
+
+ScriptEvent = Tuple[int, int]
+
+
+@dataclass
+class FrameStats:
+    """
+    Class to hold the time spent on every replayed frame.
+
+    Attributes
+    ----------
+        frame_times (List[float]): Seconds each frame took, in replay order.
+        games (int): Number of games replayed.
+
+    """
+
+    frame_times: List[float] = field(default_factory=list)
+    games: int = 0
+
+    @property
+    def frames(self) -> int:
+        """Number of frames replayed."""
+        return len(self.frame_times)
+
+    @property
+    def total_time(self) -> float:
+        """Seconds spent on all frames."""
+        return float(sum(self.frame_times))
+
+    @property
+    def mean_ms(self) -> float:
+        """Mean frame time in milliseconds."""
+        return self.total_time / self.frames * 1e3 if self.frames else 0.0
+
+    def percentile_ms(self, q: float) -> float:
+        """Return the q-th percentile of the frame times in milliseconds."""
+        if not self.frames:
+            return 0.0
+        return float(np.percentile(self.frame_times, q)) * 1e3
+
+    @property
+    def max_ms(self) -> float:
+        """Slowest frame time in milliseconds."""
+        return max(self.frame_times, default=0.0) * 1e3
+
+    def merge(self, other: "FrameStats") -> None:
+        """Add the frames and games of another replay to these stats."""
+        self.frame_times.extend(other.frame_times)
+        self.games += other.games
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the summary statistics, ready for json.dumps."""
+        return {
+            "games": self.games,
+            "frames": self.frames,
+            "total_time": self.total_time,
+            "mean_ms": self.mean_ms,
+            "p50_ms": self.percentile_ms(50),
+            "p95_ms": self.percentile_ms(95),
+            "p99_ms": self.percentile_ms(99),
+            "max_ms": self.max_ms,
+        }
+
+
+def start_game(
+    game_context: GameContext, fruit: Sequence[int] | None = None, raven: int = 5
+) -> None:
+    """Restart the game from a starting state, like clicking yes on the end screen."""
+    eh.restart_game(game_context)
+    game_state = game_context.game_state
+    if fruit is None:
+        fruit = game_state.fruit_inventory.fruit_values
+    game_state.set_state(tuple(fruit), raven)
+
+
+def _fruit_click(game_context: GameContext, choice: int) -> pygame.event.Event:
+    """Return a click on the center of the circle of a fruit column."""
+    assets, _, _, _ = unpack_game_context(game_context)
+    center = assets.RECTANGLES.CIRCLE_RECT_TUPLE[choice].center
+    return pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=center, button=1)
+
+
+def play_script(
+    game_context: GameContext,
+    script: Iterable[ScriptEvent],
+    fruit: Sequence[int] | None = None,
+    raven: int = 5,
+) -> FrameStats:
+    """
+    Replay one game and time every frame.
+
+    A frame is drawn after every roll and after every wild choice, like the game loop
+    does, and once more at the start.
+
+    Args:
+    ----
+            game_context (GameContext): Context to play in, usually headless.
+
+            script (Iterable[ScriptEvent]): (die_result, choice) of every roll, choice
+            being the fruit column clicked on a wild roll.
+
+            fruit (Sequence[int] | None): Starting fruit counts, the full game if None.
+
+            raven (int): Starting raven spaces.
+
+    Returns:
+    -------
+            FrameStats: Time of every frame drawn.
+
+    """
+    game_state = game_context.game_state
+    stats = FrameStats(games=1)
+    start_game(game_context, fruit, raven)
+    start = time.perf_counter()
+    eh.draw_all_screen(game_context, None, None)
+    stats.frame_times.append(time.perf_counter() - start)
+    for die_result, choice in script:
+        if game_state.is_game_over():
+            break
+        start = time.perf_counter()
+        game_state.orchard_die.die_result = die_result
+        color = eh.apply_die_result(game_context)
+        eh.draw_all_screen(game_context, color, None)
+        stats.frame_times.append(time.perf_counter() - start)
+        if die_result != 2:
+            continue
+        start = time.perf_counter()
+        game_state.pending_fruit_click = False
+        game_state.fruit_click_enabled = True
+        idx = eh.choose_fruit(game_context, _fruit_click(game_context, choice))
+        game_state.stats_flag = True
+        eh.draw_all_screen(game_context, None, idx)
+        stats.frame_times.append(time.perf_counter() - start)
+    return stats
+
+
+def play_recording(
+    game_context: GameContext,
+    reader: TrajectoryReader,
+    games: Iterable[int] | None = None,
+) -> FrameStats:
+    """Replay recorded games, all of them if games is None, and merge their stats."""
+    stats = FrameStats()
+    for game in range(len(reader)) if games is None else games:
+        script = [decode_event(int(event)) for event in reader.game_events(game)]
+        stats.merge(
+            play_script(
+                game_context,
+                script,
+                [int(count) for count in reader.index["fruit"][game]],
+                int(reader.index["raven"][game]),
+            )
+        )
+    return stats
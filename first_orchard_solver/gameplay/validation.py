@@ -0,0 +1,407 @@
+"""
+Module to validate the solver against Monte Carlo simulation of the Orchard game.
+
+Every scenario is simulated with the vectorized simulator, using enough games that the
+binomial confidence interval of the win rate has a target half-width. The number of
+wins is then checked against the exact binomial acceptance interval of the solved win
+probability, instead of a fixed tolerance on the win rate. Tests are corrected for
+multiple comparisons (Bonferroni), so a full run fails by chance with probability at
+most family_alpha.
+
+The solver rounds to 3 decimals at every level of its recursion, which puts it up to
+about 0.0015 from the exact probability. SOLVER_TOLERANCE widens every interval by
+that much.
+
+Scenarios are sharded across processes. Each scenario gets its own seed spawned from
+one SeedSequence, so results are reproducible regardless of the number of workers.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from functools import lru_cache
+from math import ceil, sqrt
+from pathlib import Path
+from statistics import NormalDist
+from typing import Any, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from first_orchard_solver.gameplay.gamelogic import BASE_RULES, RuleSet
+from first_orchard_solver.gameplay.gamesims import _simulate_games
+from first_orchard_solver.gameplay.gamesolver import win_perc
+from first_orchard_solver.gameplay.simmetrics import MetricsReporter, ProgressCallback
+from first_orchard_solver.gameplay.stateindex import canonical_index
+from first_orchard_solver.gameplay.strategies import Strategy, get_strategy
+
+SOLVER_TOLERANCE = 0.002
+DEFAULT_HALF_WIDTH = 0.01
+DEFAULT_FAMILY_ALPHA = 0.01
+DEFAULT_STRATS: Tuple[Strategy, ...] = ("fewest", "most", "random")
+SHARDS_PER_WORKER = 8
+
+Scenario = Tuple[Tuple[int, ...], int]
+
+
+@dataclass(frozen=True)
+class ScenarioCheck:
+    """
+    Class to hold the simulated and solved win probability of one scenario.
+
+    Attributes
+    ----------
+        fruit_count (Tuple[int, ...]): Fruit counts of the scenario.
+        raven_track (int): Raven spaces of the scenario.
+        strat (Strategy): Strategy used for the wild rolls.
+        solved (float): Win probability from win_perc.
+        wins (int): Number of simulated games won.
+        n_games (int): Number of simulated games.
+        low (int): Fewest wins consistent with the solver.
+        high (int): Most wins consistent with the solver.
+
+    """
+
+    fruit_count: Tuple[int, ...]
+    raven_track: int
+    strat: Strategy
+    solved: float
+    wins: int
+    n_games: int
+    low: int
+    high: int
+
+    @property
+    def carlo(self) -> float:
+        """Returns the simulated win rate."""
+        return self.wins / self.n_games
+
+    @property
+    def passed(self) -> bool:
+        """Returns whether the simulated wins fall inside the acceptance interval."""
+        return self.low <= self.wins <= self.high
+
+
+@dataclass(frozen=True)
+class ComparisonCheck:
+    """
+    Class to hold the simulated and solved difference between two scenarios.
+
+    Attributes
+    ----------
+        first (ScenarioCheck): The first scenario.
+        second (ScenarioCheck): The second scenario, same strategy and game length.
+        solved_diff (float): Solved win probability of first minus second.
+        carlo_diff (float): Simulated win rate of first minus second.
+        margin (float): Largest allowed distance between the two differences.
+
+    """
+
+    first: ScenarioCheck
+    second: ScenarioCheck
+    solved_diff: float
+    carlo_diff: float
+    margin: float
+
+    @property
+    def passed(self) -> bool:
+        """Returns whether the simulated difference is within margin of the solver."""
+        return abs(self.carlo_diff - self.solved_diff) <= self.margin
+
+
+def canonical_states(rules: RuleSet = BASE_RULES) -> List[Scenario]:
+    """
+    Return one state per fruit multiset and raven space, ignoring fruit color.
+
+    Fruit colors are interchangeable, so (0, 1, 4, 2) plays exactly like (0, 1, 2, 4).
+    These are the canonical states of canonical_index with the raven still on the
+    track, in rank order. For the base game these are the 350 states of the solver
+    tests.
+    """
+    fruit, raven = canonical_index(rules).states()
+    in_play = raven > 0
+    return [
+        (tuple(counts), spaces)
+        for counts, spaces in zip(fruit[in_play].tolist(), raven[in_play].tolist())
+    ]
+
+
+def _two_sided_z(alpha: float) -> float:
+    """Return the standard normal quantile for a two-sided test at level alpha."""
+    return NormalDist().inv_cdf(1 - alpha / 2)
+
+
+def games_for_half_width(half_width: float, alpha: float) -> int:
+    """
+    Return the number of games needed for a confidence interval of half_width.
+
+    Uses the normal approximation at the worst case p = 0.5, so the interval is no
+    wider than half_width for any win probability.
+    """
+    return ceil((_two_sided_z(alpha) / (2 * half_width)) ** 2)
+
+
+@lru_cache(maxsize=8)
+def _log_binomial_coefs(n_games: int) -> npt.NDArray[np.float64]:
+    """Return log(n choose k) for every k from 0 to n_games."""
+    log_factorials = np.concatenate(
+        ([0.0], np.cumsum(np.log(np.arange(1, n_games + 1))))
+    )
+    coefs: npt.NDArray[np.float64] = (
+        log_factorials[-1] - log_factorials - log_factorials[::-1]
+    )
+    return coefs
+
+
+def _binomial_cdf(n_games: int, prob: float) -> npt.NDArray[np.float64]:
+    """Return P(X <= k) for every k from 0 to n_games for X ~ Binomial(n, prob)."""
+    wins = np.arange(n_games + 1)
+    log_pmf = (
+        _log_binomial_coefs(n_games)
+        + wins * np.log(prob)
+        + (n_games - wins) * np.log1p(-prob)
+    )
+    cdf: npt.NDArray[np.float64] = np.cumsum(np.exp(log_pmf))
+    return cdf
+
+
+def binomial_acceptance(
+    n_games: int, prob_low: float, prob_high: float, alpha: float
+) -> Tuple[int, int]:
+    """
+    Return the exact acceptance interval for the wins out of n_games.
+
+    Args:
+    ----
+            n_games (int): Number of games played.
+
+            prob_low (float): Lowest win probability considered correct.
+
+            prob_high (float): Highest win probability considered correct.
+
+            alpha (float): Chance of rejecting a correct win probability. Split
+            evenly between too few and too many wins.
+
+    Returns:
+    -------
+            low, high (Tuple[int, int]): Fewest and most wins accepted. At win
+            probability prob_low fewer than low wins happen with chance at most
+            alpha / 2, at prob_high more than high wins do.
+
+    """
+    low, high = 0, n_games
+    if prob_low > 0:
+        low = int(np.searchsorted(_binomial_cdf(n_games, prob_low), alpha / 2))
+    if prob_high < 1:
+        cdf = _binomial_cdf(n_games, prob_high)
+        high = int(np.searchsorted(cdf, 1 - alpha / 2))
+    return low, min(high, n_games)
+
+
+class _ShardResult(NamedTuple):
+    """Wins of one shard with the work it took and the process that did it."""
+
+    wins: npt.NDArray[np.int64]
+    rolls: int
+    busy: float
+    worker: str
+
+
+def _simulate_shard(
+    scenarios: Sequence[Scenario],
+    strats: Sequence[Strategy],
+    n_games: int,
+    seeds: Sequence[np.random.SeedSequence],
+) -> _ShardResult:
+    """Return the (len(scenarios), len(strats)) wins of one shard of scenarios."""
+    start = time.perf_counter()
+    wins = np.zeros((len(scenarios), len(strats)), dtype=np.int64)
+    rolls = 0
+    for row, ((fruit_count, raven_track), seed) in enumerate(zip(scenarios, seeds)):
+        rng = np.random.default_rng(seed)
+        for col, strat in enumerate(strats):
+            games = _simulate_games(
+                fruit_count, raven_track, n_games, get_strategy(strat), rng
+            )
+            wins[row, col] = np.count_nonzero(games.wins)
+            rolls += int(games.lengths.sum())
+    busy = time.perf_counter() - start
+    return _ShardResult(wins, rolls, busy, f"pid-{os.getpid()}")
+
+
+def simulate_win_counts(
+    scenarios: Sequence[Scenario],
+    strats: Sequence[Strategy],
+    n_games: int,
+    workers: int | None = None,
+    seed: int | None = None,
+    progress: ProgressCallback | None = None,
+    metrics_path: str | Path | None = None,
+) -> npt.NDArray[np.int64]:
+    """
+    Simulate n_games per scenario and strategy, sharded across processes.
+
+    Args:
+    ----
+            scenarios (Sequence[Scenario]): (fruit counts, raven spaces) to simulate.
+
+            strats (Sequence[Strategy]): Names of registered strategies.
+
+            n_games (int): Games per scenario and strategy.
+
+            workers (int | None): Number of processes. Defaults to the number of
+            CPUs, 1 simulates in this process.
+
+            seed (int | None): Seed for reproducible results.
+
+            progress (ProgressCallback | None): Called with the SimulationMetrics,
+            including the utilization of every worker process, after every shard.
+
+            metrics_path (str | Path | None): If given, the metrics are dumped there as
+            JSON every few seconds and at the end.
+
+    Returns:
+    -------
+            wins (npt.NDArray[np.int64]): (len(scenarios), len(strats)) games won.
+
+    """
+    seeds = np.random.SeedSequence(seed).spawn(len(scenarios))
+    workers = workers or os.cpu_count() or 1
+    # Several interleaved shards per worker even out the work, as states with more
+    # fruit take longer, and give regular progress updates.
+    n_shards = min(len(scenarios), workers * SHARDS_PER_WORKER)
+    shards = [range(start, len(scenarios), n_shards) for start in range(n_shards)]
+    wins = np.zeros((len(scenarios), len(strats)), dtype=np.int64)
+    reporter = MetricsReporter(
+        len(scenarios) * len(strats) * n_games, progress, metrics_path
+    )
+
+    def collect(shard: range, result: _ShardResult) -> None:
+        wins[list(shard)] = result.wins
+        games = len(shard) * len(strats) * n_games
+        reporter.update(games, result.rolls, result.busy, result.worker)
+
+    def shard_args(shard: range) -> Tuple[Any, ...]:
+        return (
+            [scenarios[i] for i in shard],
+            strats,
+            n_games,
+            [seeds[i] for i in shard],
+        )
+
+    if workers == 1:
+        for shard in shards:
+            collect(shard, _simulate_shard(*shard_args(shard)))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_simulate_shard, *shard_args(shard)): shard
+                for shard in shards
+            }
+            for future in as_completed(futures):
+                collect(futures[future], future.result())
+    reporter.finish()
+    return wins
+
+
+def validate_solver(
+    scenarios: Sequence[Scenario] | None = None,
+    strats: Sequence[Strategy] = DEFAULT_STRATS,
+    half_width: float = DEFAULT_HALF_WIDTH,
+    family_alpha: float = DEFAULT_FAMILY_ALPHA,
+    workers: int | None = None,
+    seed: int | None = None,
+    progress: ProgressCallback | None = None,
+) -> List[ScenarioCheck]:
+    """
+    Check win_perc against simulation for every scenario and strategy.
+
+    Args:
+    ----
+            scenarios (Sequence[Scenario] | None): States to check. Defaults to
+            canonical_states.
+
+            strats (Sequence[Strategy]): Strategies to check every state with.
+
+            half_width (float): Target half-width of each simulated win rate's
+            confidence interval, which sets the number of games.
+
+            family_alpha (float): Chance that a correct solver fails any check.
+
+            workers (int | None): Number of processes, see simulate_win_counts.
+
+            seed (int | None): Seed for reproducible results.
+
+            progress (ProgressCallback | None): Called with the simulation metrics,
+            see simulate_win_counts.
+
+    Returns:
+    -------
+            checks (List[ScenarioCheck]): One check per scenario and strategy.
+
+    """
+    if scenarios is None:
+        scenarios = canonical_states()
+    alpha = family_alpha / (len(scenarios) * len(strats))
+    n_games = games_for_half_width(half_width, alpha)
+    wins = simulate_win_counts(scenarios, strats, n_games, workers, seed, progress)
+
+    checks = []
+    for row, (fruit_count, raven_track) in enumerate(scenarios):
+        for col, strat in enumerate(strats):
+            solved = win_perc(fruit_count, raven_track, strat)[0]
+            low, high = binomial_acceptance(
+                n_games, solved - SOLVER_TOLERANCE, solved + SOLVER_TOLERANCE, alpha
+            )
+            checks.append(
+                ScenarioCheck(
+                    fruit_count,
+                    raven_track,
+                    strat,
+                    solved,
+                    int(wins[row, col]),
+                    n_games,
+                    low,
+                    high,
+                )
+            )
+    return checks
+
+
+def validate_comparisons(
+    checks: Sequence[ScenarioCheck], family_alpha: float = DEFAULT_FAMILY_ALPHA
+) -> List[ComparisonCheck]:
+    """
+    Check solved differences between scenarios against the simulated differences.
+
+    Pairs every two checks with the same strategy, raven spaces and total fruit, the
+    comparisons win_perc_comp is meant for, reusing their simulated games. The margin
+    is a normal confidence interval for a difference of two binomial rates, widened by
+    SOLVER_TOLERANCE for each solved probability.
+    """
+    pairs = [
+        (first, second)
+        for i, first in enumerate(checks)
+        for second in checks[i + 1 :]
+        if first.strat == second.strat
+        and first.raven_track == second.raven_track
+        and sum(first.fruit_count) == sum(second.fruit_count)
+    ]
+    z = _two_sided_z(family_alpha / max(len(pairs), 1))
+    comparisons = []
+    for first, second in pairs:
+        variance = sum(
+            check.solved * (1 - check.solved) / check.n_games
+            for check in (first, second)
+        )
+        comparisons.append(
+            ComparisonCheck(
+                first,
+                second,
+                solved_diff=first.solved - second.solved,
+                carlo_diff=first.carlo - second.carlo,
+                margin=z * sqrt(variance) + 2 * SOLVER_TOLERANCE,
+            )
+        )
+    return comparisons
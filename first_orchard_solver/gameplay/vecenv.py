@@ -0,0 +1,198 @@
+"""
+Module to step many games of the Orchard game at once, for learning wild-roll policies.
+
+OrchardVecEnv holds N games as NumPy arrays and steps all of them with one die roll
+each, following the same rules as _play_with_strat: a raven moves the raven, a wild
+takes the fruit type chosen by the policy, and a fruit roll collects that fruit if
+some is left. Die faces use the numbering of OrchardDie: 1 raven, 2 wild, 3 and up one
+face per fruit type, with rules.wild_faces faces showing the wild.
+
+Every observation includes the die face that the next step will play, so a policy
+knows when its action matters:
+
+    env = OrchardVecEnv(seed=0)
+    observation = env.reset(1024)
+    for _ in range(100):
+        actions = my_policy(observation.fruit, observation.raven)
+        result = env.step(actions)
+        observation = result.observation
+
+Actions are fruit columns (0 for fruit type 3) and are only read for games showing a
+wild. Games that end are reset to the starting state right away, with the state they
+ended in, the reward and the episode length reported in StepResult.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+
+from first_orchard_solver.gameplay.gamelogic import BASE_RULES, RuleSet
+
+
+class Observation(NamedTuple):
+    """
+    State of every game before its next roll is played.
+
+    Attributes
+    ----------
+        fruit (npt.NDArray[np.int64]): (N, fruit_types) fruit left.
+        raven (npt.NDArray[np.int64]): (N,) raven spaces left.
+        die (npt.NDArray[np.int64]): (N,) die face the next step plays.
+
+    """
+
+    fruit: npt.NDArray[np.int64]
+    raven: npt.NDArray[np.int64]
+    die: npt.NDArray[np.int64]
+
+    @property
+    def wild(self) -> npt.NDArray[np.bool_]:
+        """True for every game whose next roll is a wild, so its action is used."""
+        wild: npt.NDArray[np.bool_] = self.die == 2
+        return wild
+
+
+class StepResult(NamedTuple):
+    """
+    Outcome of one step of every game.
+
+    Attributes
+    ----------
+        observation (Observation): State of every game after the step, already reset
+            to the starting state for games that ended.
+        reward (npt.NDArray[np.float64]): (N,) 1 for games won by this step, else 0.
+        done (npt.NDArray[np.bool_]): (N,) True for games that ended with this step.
+        episode_length (npt.NDArray[np.int64]): (N,) rolls played by the games that
+            ended, 0 for the others.
+        final_fruit (npt.NDArray[np.int64]): (N, fruit_types) fruit left after the
+            step, before any reset.
+        final_raven (npt.NDArray[np.int64]): (N,) raven spaces left after the step,
+            before any reset.
+
+    """
+
+    observation: Observation
+    reward: npt.NDArray[np.float64]
+    done: npt.NDArray[np.bool_]
+    episode_length: npt.NDArray[np.int64]
+    final_fruit: npt.NDArray[np.int64]
+    final_raven: npt.NDArray[np.int64]
+
+
+class OrchardVecEnv:
+    """
+    Steps N games of the Orchard game at once with NumPy.
+
+    Args:
+    ----
+            rules (RuleSet): Size of the games and number of wild faces on the die.
+
+            seed (int | None): Seed of the die rolls, for reproducible runs.
+
+    """
+
+    def __init__(self, rules: RuleSet = BASE_RULES, seed: int | None = None) -> None:
+        """Set up the die, the games are created by reset."""
+        self.rules = rules
+        self.rng = np.random.default_rng(seed)
+        start = rules.start
+        self._start_fruit = np.array(start[:-1], dtype=np.int64)
+        self._start_raven = start[-1]
+        self._fruit = np.zeros((0, rules.fruit_types), dtype=np.int64)
+        self._raven = np.zeros(0, dtype=np.int64)
+        self._die = np.zeros(0, dtype=np.int64)
+        self._length = np.zeros(0, dtype=np.int64)
+        return None
+
+    @property
+    def n_envs(self) -> int:
+        """Number of games stepped together."""
+        return len(self._raven)
+
+    def _roll(self, n: int) -> npt.NDArray[np.int64]:
+        """Roll n dice with one raven, wild_faces wilds and one face per fruit type."""
+        wild_faces = self.rules.wild_faces
+        faces = self.rng.integers(0, self.rules.fruit_types + 1 + wild_faces, size=n)
+        die: npt.NDArray[np.int64] = np.where(
+            faces == 0, 1, np.where(faces <= wild_faces, 2, faces - wild_faces + 2)
+        )
+        return die
+
+    def _observation(self) -> Observation:
+        """Return a copy of the current state of every game."""
+        return Observation(self._fruit.copy(), self._raven.copy(), self._die.copy())
+
+    def reset(self, n: int | None = None, seed: int | None = None) -> Observation:
+        """
+        Start n games (as many as before if None) and roll their first die.
+
+        A seed reseeds the die rolls.
+        """
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        n = self.n_envs if n is None else n
+        self._fruit = np.tile(self._start_fruit, (n, 1))
+        self._raven = np.full(n, self._start_raven, dtype=np.int64)
+        self._length = np.zeros(n, dtype=np.int64)
+        self._die = self._roll(n)
+        return self._observation()
+
+    def step(self, actions: npt.ArrayLike) -> StepResult:
+        """
+        Play the die face showing in every game and roll the next one.
+
+        Raises a ValueError if actions is not one fruit column per game, or a game
+        showing a wild chooses a fruit type with no fruit left.
+
+        Args:
+        ----
+                actions (npt.ArrayLike): (N,) fruit column to take in each game if its
+                die shows a wild, ignored otherwise.
+
+        Returns:
+        -------
+                result (StepResult): States after the step with games that ended
+                reset, and the rewards, ends and final states of the step.
+
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        if actions.shape != (self.n_envs,):
+            raise ValueError(
+                f"Expected {self.n_envs} actions, got an array of {actions.shape}."
+            )
+        fruit, raven, die = self._fruit, self._raven, self._die
+        wild_rows = np.flatnonzero(die == 2)
+        choices = actions[wild_rows]
+        if wild_rows.size and (
+            choices.min() < 0
+            or choices.max() >= self.rules.fruit_types
+            or not fruit[wild_rows, choices].all()
+        ):
+            raise ValueError("Wild rolls must take a fruit type with fruit left.")
+
+        raven -= die == 1
+        fruit[wild_rows, choices] -= 1
+        fruit_rows = np.flatnonzero(die > 2)
+        columns = die[fruit_rows] - 3
+        fruit[fruit_rows, columns] -= fruit[fruit_rows, columns] > 0
+        self._length += 1
+
+        won = fruit.sum(axis=1) == 0
+        done = won | (raven == 0)
+        final_fruit, final_raven = fruit.copy(), raven.copy()
+        episode_length = np.where(done, self._length, 0)
+        ended = np.flatnonzero(done)
+        if ended.size:
+            fruit[ended] = self._start_fruit
+            raven[ended] = self._start_raven
+            self._length[ended] = 0
+        self._die = self._roll(self.n_envs)
+        return StepResult(
+            observation=self._observation(),
+            reward=won.astype(np.float64),
+            done=done,
+            episode_length=episode_length,
+            final_fruit=final_fruit,
+            final_raven=final_raven,
+        )
@@ -0,0 +1,61 @@
+"""Unit tests for loading the assets of the pygame version of the game."""
+
+from pathlib import Path
+from typing import List
+
+import pygame
+import pytest
+
+from first_orchard_solver.gameplay import assets as game_assets
+from first_orchard_solver.gameplay import rend_static as static
+from first_orchard_solver.gameplay.context import init_game_context
+
+
+def test_fonts_loaded_on_first_use() -> None:
+    """No font is loaded with the assets, and a loaded font is kept."""
+    init_game_context(headless=True)
+    assets = game_assets.load_assets()
+    assert "ODDS_FONT" not in vars(assets)
+    font = assets.ODDS_FONT
+    assert "ODDS_FONT" in vars(assets)
+    assert assets.ODDS_FONT is font
+
+
+def test_system_font_path_cached(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Fonts are only looked up when not cached or when the cached file is gone."""
+    font_file = tmp_path / "consolas.ttf"
+    font_file.touch()
+    lookups: List[str] = []
+
+    def match_font(name: str) -> str | None:
+        lookups.append(name)
+        return str(font_file) if name == "Consolas" else None
+
+    monkeypatch.setattr(pygame.font, "match_font", match_font)
+    cache_path = tmp_path / "cache" / "fonts.json"
+    for _ in range(2):
+        assert game_assets.system_font_path("Consolas", cache_path) == str(font_file)
+        assert game_assets.system_font_path("Missing", cache_path) is None
+    assert lookups == ["Consolas", "Missing"]
+    font_file.unlink()
+    game_assets.system_font_path("Consolas", cache_path)
+    assert lookups == ["Consolas", "Missing", "Consolas"]
+
+
+def test_static_background_rendered_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A new context copies the static background instead of drawing it again."""
+    first = init_game_context(headless=True)
+    static.draw_background(first)
+
+    def no_drawing(*args: object) -> None:
+        raise AssertionError("static background drawn again")
+
+    monkeypatch.setattr(static, "draw_instruction_text", no_drawing)
+    monkeypatch.setattr(static, "draw_fruit_circles", no_drawing)
+    second = init_game_context(headless=True)
+    static.draw_background(second)
+    position = first.assets.POSITIONS.BLUE_CIRCLE_POS
+    assert second.background.get_at(position) == first.background.get_at(position)
+    assert second.background.get_at(position) == pygame.Color(first.assets.COLORS.BLUE)
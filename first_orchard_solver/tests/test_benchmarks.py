@@ -0,0 +1,60 @@
+"""Unit tests for the benchmark suite."""
+
+from pathlib import Path
+
+import pytest
+
+from first_orchard_solver.benchmarks.suite import (
+    BenchmarkResult,
+    compare_to_baseline,
+    load_results,
+    over_budget,
+    run_benchmarks,
+    save_results,
+)
+
+
+def test_compare_to_baseline() -> None:
+    """Only results worse than the threshold are flagged, in either direction."""
+    baseline = [
+        BenchmarkResult("solve", 1.0, "s", False),
+        BenchmarkResult("games", 1000.0, "games/s", True),
+        BenchmarkResult("frame", 2.0, "ms", False),
+    ]
+    results = [
+        BenchmarkResult("solve", 1.5, "s", False),
+        BenchmarkResult("games", 900.0, "games/s", True),
+        BenchmarkResult("frame", 1.0, "ms", False),
+        BenchmarkResult("new", 1.0, "ms", False),
+    ]
+    regressions = compare_to_baseline(results, baseline, threshold=0.2)
+    assert [r.name for r in regressions] == ["solve"]
+    assert regressions[0].change == pytest.approx(0.5)
+    assert not compare_to_baseline(results, baseline, threshold=0.6)
+    slower = [BenchmarkResult("games", 500.0, "games/s", True)]
+    assert compare_to_baseline(slower, baseline)[0].change == pytest.approx(1.0)
+
+
+def test_save_load_round_trip(tmp_path: Path) -> None:
+    """Results written to JSON load back unchanged."""
+    results = run_benchmarks(["play_with_strat"], quick=True)
+    path = tmp_path / "results.json"
+    save_results(results, path)
+    assert load_results(path) == results
+    assert results[0].value > 0
+
+
+def test_unknown_benchmark() -> None:
+    """Asking for a benchmark that does not exist raises a ValueError."""
+    with pytest.raises(ValueError):
+        run_benchmarks(["nope"])
+
+
+def test_over_budget() -> None:
+    """Only results with a budget are checked against it."""
+    results = [
+        BenchmarkResult("cold_start_first_frame", 3.0, "s", False),
+        BenchmarkResult("frame", 3.0, "s", False),
+    ]
+    assert over_budget(results) == results[:1]
+    assert not over_budget(results, {"cold_start_first_frame": 4.0})
@@ -0,0 +1,105 @@
+"""Unit tests for exporting the solved states to columnar files."""
+
+import csv
+from pathlib import Path
+from typing import Any, List
+
+import numpy as np
+import pytest
+
+from first_orchard_solver.gameplay import export
+from first_orchard_solver.gameplay.export import export_solved, main, solved_chunks
+from first_orchard_solver.gameplay.gamelogic import BASE_RULES, RuleSet
+from first_orchard_solver.gameplay.gamesolver import wild_choice_odds
+from first_orchard_solver.gameplay.policyeval import evaluate_policy
+
+SMALL_RULES = RuleSet(fruit_types=3, fruit_per_type=2, raven_spaces=3)
+
+
+def test_npz_columns_match_the_solver(tmp_path: Path) -> None:
+    """Every state × strategy × rule set is one row of typed, solved columns."""
+    path = tmp_path / "solved.npz"
+    rows = export_solved(path, [BASE_RULES, SMALL_RULES], ["most", "fewest"], 500)
+    assert rows == 2 * (5**4 * 6 + 3**3 * 4)
+    data = np.load(path)
+    assert len(data["win"]) == rows and data["best_move"].dtype == np.int8
+    assert np.allclose(data["win"] + data["loss"], 1.0)
+
+    base_most = (data["strat"] == "most") & (data["fruit_types"] == 4)
+    most = evaluate_policy("most")
+    states = np.stack([data[f"fruit_{i}"] for i in range(4)] + [data["raven"]])
+    assert np.allclose(data["win"][base_most], most[tuple(states[:, base_most])])
+    assert (data["gap"] >= 0).all()
+    assert np.allclose(data["gap"][base_most], 0.0, atol=1e-12)
+
+    small = data["fruit_types"] == 3
+    assert (data["fruit_3"][small] == 0).all() and data["raven"][small].max() == 3
+
+    row = np.flatnonzero(base_most & (states.T == (2, 0, 1, 3, 2)).all(axis=1))[0]
+    odds = wild_choice_odds((2, 0, 1, 3), 2)
+    assert data["best_move"][row] == max(odds, key=lambda column: odds[column])
+
+
+def test_chunks_and_formats_agree(tmp_path: Path) -> None:
+    """CSV and npz hold the same rows, whatever the chunk size."""
+    export_solved(tmp_path / "a.npz", [SMALL_RULES], chunk_rows=7, canonical=True)
+    rows = export_solved(tmp_path / "a.csv", [SMALL_RULES], canonical=True)
+    data = np.load(tmp_path / "a.npz")
+    with open(tmp_path / "a.csv") as file:
+        table = list(csv.DictReader(file))
+    assert len(table) == rows == len(data["win"])
+    assert [row["strat"] for row in table] == list(data["strat"])
+    assert np.array_equal([float(row["win"]) for row in table], data["win"])
+    assert np.array_equal([int(row["best_move"]) for row in table], data["best_move"])
+    fruit = np.stack([data[f"fruit_{i}"] for i in range(3)], axis=1)
+    assert (np.diff(fruit, axis=1) >= 0).all()
+    assert [
+        len(chunk["win"]) for chunk in solved_chunks([SMALL_RULES], ["most"], 50)
+    ] == [
+        50,
+        50,
+        8,
+    ]
+
+
+def test_groups_solved_one_at_a_time(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A group of rule sets is only solved once the chunks before it are written."""
+    solved = []
+    solve_group = export._solve_group
+
+    def counting_solve_group(group: List[RuleSet], strats: List[str]) -> Any:
+        solved.append(group)
+        return solve_group(group, strats)
+
+    monkeypatch.setattr(export, "_solve_group", counting_solve_group)
+    rule_sets = [SMALL_RULES, RuleSet(4, 1, 2), RuleSet(3, 1, 2)]
+    chunks = solved_chunks(rule_sets, ["random"], 1_000)
+    assert next(chunks)["fruit_types"][0] == 3 and len(solved) == 1
+    assert [chunk["fruit_types"][0] for chunk in chunks] == [3, 4]
+    assert solved == [[SMALL_RULES, RuleSet(3, 1, 2)], [RuleSet(4, 1, 2)]]
+
+
+def test_main_rejects_unknown_formats(tmp_path: Path) -> None:
+    """The command line exports the rule sets given, unknown suffixes are errors."""
+    assert main([str(tmp_path / "a.npz"), "--rules", "3,2,3", "--strat", "most"]) == 0
+    assert len(np.load(tmp_path / "a.npz")["win"]) == 3**3 * 4
+    assert main([str(tmp_path / "a.csv"), "--rules", "3,2,3,0", "3,2,3,2"]) == 0
+    with open(tmp_path / "a.csv") as file:
+        assert {row["wild_faces"] for row in csv.DictReader(file)} == {"0", "2"}
+    assert main([str(tmp_path / "a.parquet")]) == 1
+    with pytest.raises(SystemExit):
+        main([str(tmp_path / "a.csv"), "--rules", "4,4"])
+
+
+def test_arrow_export(tmp_path: Path) -> None:
+    """Arrow IPC files hold the same rows, and need pyarrow installed."""
+    path = tmp_path / "solved.arrow"
+    try:
+        import pyarrow as pa
+    except ImportError:
+        with pytest.raises(ImportError, match="pyarrow"):
+            export_solved(path, [SMALL_RULES])
+        return
+    rows = export_solved(path, [SMALL_RULES], chunk_rows=10)
+    table = pa.ipc.open_file(str(path)).read_all()
+    assert table.num_rows == rows and table.schema.field("raven").type == pa.uint8()
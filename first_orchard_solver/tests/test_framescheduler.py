@@ -0,0 +1,47 @@
+"""Unit tests for the frame scheduler, run on the SDL dummy video driver."""
+
+import time
+
+import pygame
+import pytest
+
+from first_orchard_solver.gameplay.context import init_game_context
+from first_orchard_solver.gameplay.framescheduler import FrameScheduler
+
+
+@pytest.fixture
+def scheduler() -> FrameScheduler:
+    """Set up a headless display with an empty event queue."""
+    init_game_context(headless=True)
+    pygame.event.clear()
+    return FrameScheduler(animation_fps=50, idle_timeout_ms=20)
+
+
+def test_wait_returns_every_queued_event(scheduler: FrameScheduler) -> None:
+    """The event ending the wait comes first, followed by the rest of the queue."""
+    for button in (1, 3):
+        pygame.event.post(
+            pygame.event.Event(pygame.MOUSEBUTTONUP, pos=(0, 0), button=button)
+        )
+    events = scheduler.wait_events()
+    assert [event.button for event in events] == [1, 3]
+
+
+def test_idle_wait_times_out_without_events(scheduler: FrameScheduler) -> None:
+    """An idle wait sleeps for the idle timeout and returns no events."""
+    start = time.perf_counter()
+    assert scheduler.wait_events() == []
+    assert time.perf_counter() - start >= 0.015
+
+
+def test_animation_raises_frame_rate(scheduler: FrameScheduler) -> None:
+    """Frames are due at the animation rate until the animation is over."""
+    assert not scheduler.animating and scheduler.timeout_ms == 20
+    scheduler.request_animation(100)
+    assert scheduler.animating and scheduler.timeout_ms == 20
+    scheduler.animation_fps = 200
+    assert scheduler.timeout_ms == 5
+    time.sleep(0.12)
+    assert not scheduler.animating
+    with pytest.raises(ValueError):
+        FrameScheduler(animation_fps=0)
@@ -7,17 +7,27 @@ the First Orchard game.
 """
 
 import logging
-from collections import Counter
-from itertools import product
 from typing import Dict, List, Tuple
 
-import numpy as np
 import pytest
 import pytest_check as check
 
 from first_orchard_solver.gameplay.gamelogic import GameState
-from first_orchard_solver.gameplay.gamesims import Strategy, run_batches
-from first_orchard_solver.gameplay.gamesolver import win_perc, win_perc_comp
+from first_orchard_solver.gameplay.gamesims import Strategy
+from first_orchard_solver.gameplay.gamesolver import (
+    profile_solver,
+    wild_choice_odds,
+    win_perc,
+    win_perc_comp,
+)
+from first_orchard_solver.gameplay.importance import run_importance_sampling
+from first_orchard_solver.gameplay.stateindex import canonical_index
+from first_orchard_solver.gameplay.validation import (
+    ScenarioCheck,
+    binomial_acceptance,
+    validate_comparisons,
+    validate_solver,
+)
 from first_orchard_solver.tests.test_gamelogic import _set_state
 
 
@@ -71,25 +81,12 @@ def game_state_fixture_2():
 @pytest.fixture
 def test_data() -> List[Tuple[Dict[int, int], int]]:
     """Generates all possible Orchard game states as (fruit dict, raven_track)."""
-    unique_states = set()
-    for fruit_inventory_list in product(range(5), repeat=4):
-        multiple_states = tuple(sorted(Counter(fruit_inventory_list).items()))
-        unique_states.add(multiple_states)
-
-    final_result: List[Tuple[Dict[int, int], int]] = []
-    for state in unique_states:
-        # always have keys 3,4,5,6 initialized to 0
-        sub_dict: Dict[int, int] = {3: 0, 4: 0, 5: 0, 6: 0}
-        next_key = 3
-
-        # expand values into slots: e.g. (2,2),(3,2) → {3:2,4:2,5:3,6:3}
-        for value, count in state:
-            for _ in range(count):
-                sub_dict[next_key] = value
-                next_key += 1
-
-        for raven_track in range(1, 6):
-            final_result.append((sub_dict.copy(), raven_track))
+    fruit, raven = canonical_index().states()
+    final_result: List[Tuple[Dict[int, int], int]] = [
+        (dict(zip(range(3, 7), (int(count) for count in counts))), int(spaces))
+        for counts, spaces in zip(fruit, raven)
+        if spaces > 0
+    ]
 
     # Sanity checks
     for fruit_dict, raven_track in final_result:
@@ -140,66 +137,46 @@ def test_win_perc(
 logger = logging.getLogger(__name__)
 
 
+def _fruit_dict(fruit_count: Tuple[int, ...]) -> Dict[int, int]:
+    """Convert fruit counts to the fruit dict used by _set_state."""
+    return {i + 3: count for i, count in enumerate(fruit_count)}
+
+
+@pytest.fixture(scope="module")
+def solver_checks() -> List[ScenarioCheck]:
+    """Simulate every canonical state once for the Monte Carlo comparison tests."""
+    return validate_solver(seed=0)
+
+
 def test_win_perc_against_carlo(
-    game_state_fixture: GameState, test_data: List[Tuple[Dict[int, int], int]]
+    test_data: List[Tuple[Dict[int, int], int]], solver_checks: List[ScenarioCheck]
 ) -> None:
     """
     Ensure win_perc function is consistent with the Monte Carlo method.
 
-    Use a known state and compare the outputs of the Monte Carlo simulation
-    and the results from the solver.
+    Every state is simulated with enough games for a 0.01 wide confidence interval and
+    the simulated wins are checked against the exact binomial interval of the solved
+    win probability. See gameplay/validation.py.
     """
-    for game_component in test_data:
-        _set_state(game_state_fixture, game_component[0], game_component[1])
-        batches = run_batches(
-            game_state_fixture, 100, 1000, ["fewest", "most", "random"]
-        )
-        solved_least = win_perc(
-            game_state_fixture.fruit_inventory.fruit_values,
-            game_state_fixture.raven_track.spaces,
-            "fewest",
-        )
-        solved_most = win_perc(
-            game_state_fixture.fruit_inventory.fruit_values,
-            game_state_fixture.raven_track.spaces,
-            "most",
-        )
-        solved_random = win_perc(
-            game_state_fixture.fruit_inventory.fruit_values,
-            game_state_fixture.raven_track.spaces,
-            "random",
-        )
-        carlo_small = np.mean(batches.fewest_strat_runs) / 100
-        carlo_large = np.mean(batches.most_strat_runs) / 100
-        carlo_random = np.mean(batches.random_strat_runs) / 100
+    scenarios = {(tuple(fruit.values()), raven) for fruit, raven in test_data}
+    assert {(c.fruit_count, c.raven_track) for c in solver_checks} == scenarios
+    for scenario_check in solver_checks:
         logger1.info(
-            f"SCENARIO: {game_component} "
-            f"SOLVED SMALL STRAT: {solved_least[0]} "
-            f"CARLO: {carlo_small} "
-            f"ABS_DIFFERENCE: {abs(solved_least[0] - carlo_small)}"
+            f"SCENARIO: {scenario_check.fruit_count} {scenario_check.raven_track} "
+            f"STRAT: {scenario_check.strat} "
+            f"SOLVED: {scenario_check.solved} "
+            f"CARLO: {scenario_check.carlo} "
+            f"ACCEPTED WINS: {scenario_check.low}-{scenario_check.high} "
+            f"OF {scenario_check.n_games} "
+            f"ABS_DIFFERENCE: {abs(scenario_check.solved - scenario_check.carlo)}"
         )
-        check.equal(carlo_small, pytest.approx(solved_least[0], abs=0.05))
-        logger1.info(
-            f"SCENARIO: {game_component} "
-            f"SOLVED LARGE STRAT: {solved_most[0]} "
-            f"CARLO: {carlo_large} "
-            f"ABS_DIFFERENCE: {abs(solved_most[0] - carlo_large)}"
-        )
-        check.equal(carlo_large, pytest.approx(solved_most[0], abs=0.05))
-        logger1.info(
-            "WIN PERC"
-            f"SCENARIO: {game_component} "
-            f"SOLVED RANDOM STRAT: {solved_random[0]} "
-            f"CARLO: {carlo_random} "
-            f"ABS_DIFFERENCE: {abs(solved_random[0] - carlo_random)}"
-        )
-        check.equal(carlo_random, pytest.approx(solved_random[0], abs=0.05))
+        check.is_true(scenario_check.passed, f"{scenario_check}")
 
 
 def test_win_perc_comp(
     game_state_fixture: GameState,
     game_state_fixture_2: GameState,
-    test_data: List[Tuple[Dict[int, int], int]],
+    solver_checks: List[ScenarioCheck],
 ) -> None:
     """
     Test the win percentage comparison function with intended use scenarios.
@@ -207,42 +184,34 @@ def test_win_perc_comp(
     The intended use scenario is to compare two game states with the same amount of
     total fruit and raven spaces.
     """
-    for i in range(len(test_data)):
-        game_1 = test_data[i]
-        game_1_sum = sum(game_1[0].values())
-        game_1_raven = game_1[-1]
-
-        for j in range(i + 1, len(test_data)):
-            game_2 = test_data[j]
-            if sum(game_2[0].values()) == game_1_sum and game_2[-1] == game_1_raven:
-                _set_state(game_state_fixture, test_data[i][0], game_1_raven)
-                _set_state(game_state_fixture_2, test_data[j][0], game_1_raven)
-                solved_comp = win_perc_comp(game_state_fixture, game_state_fixture_2)
-                assert solved_comp[0] >= 0
-                assert solved_comp[0] <= 100
-                assert solved_comp[1] >= 0
-                assert solved_comp[1] <= 100
-
-                game_1_batches = run_batches(game_state_fixture, 100, 1000)
-                game_2_batches = run_batches(game_state_fixture_2, 100, 1000)
-                game_1_batch_mean = np.mean(game_1_batches.most_strat_runs) / 100
-                game_2_batch_mean = np.mean(game_2_batches.most_strat_runs) / 100
-                carlo_comp = abs(game_1_batch_mean - game_2_batch_mean)
-                logger2.info(
-                    f"WIN_PERC_COMP: "
-                    f"SCENARIO_1:"
-                    f"{game_state_fixture.fruit_inventory.fruit_values}"
-                    f"{game_state_fixture.raven_track.spaces} "
-                    f"SCENARIO_2:"
-                    f"{game_state_fixture_2.fruit_inventory.fruit_values} "
-                    f"{game_state_fixture_2.raven_track.spaces} "
-                    f"CARLO_1: {game_1_batch_mean} "
-                    f"CARLO_2: {game_2_batch_mean} "
-                    f"CARLO_DIFF: {carlo_comp} "
-                    f"SOLVED_DIFF: {solved_comp[0]/100} "
-                    f"CARLO_SOLVED_ABS_DIFF: {abs(carlo_comp - solved_comp[0]/100)}"
-                )
-                check.equal(carlo_comp, pytest.approx(solved_comp[0] / 100, abs=0.05))
+    most_checks = [c for c in solver_checks if c.strat == "most"]
+    for comparison in validate_comparisons(most_checks):
+        first, second = comparison.first, comparison.second
+        _set_state(
+            game_state_fixture, _fruit_dict(first.fruit_count), first.raven_track
+        )
+        _set_state(
+            game_state_fixture_2, _fruit_dict(second.fruit_count), second.raven_track
+        )
+        solved_comp = win_perc_comp(game_state_fixture, game_state_fixture_2)
+        assert solved_comp[0] >= 0
+        assert solved_comp[0] <= 100
+        assert solved_comp[1] >= 0
+        assert solved_comp[1] <= 100
+        assert solved_comp[0] / 100 == pytest.approx(
+            abs(comparison.solved_diff), abs=1e-9
+        )
+        logger2.info(
+            f"WIN_PERC_COMP: "
+            f"SCENARIO_1:{first.fruit_count} {first.raven_track} "
+            f"SCENARIO_2:{second.fruit_count} {second.raven_track} "
+            f"CARLO_1: {first.carlo} "
+            f"CARLO_2: {second.carlo} "
+            f"CARLO_DIFF: {comparison.carlo_diff} "
+            f"SOLVED_DIFF: {comparison.solved_diff} "
+            f"MARGIN: {comparison.margin}"
+        )
+        check.is_true(comparison.passed, f"{comparison}")
 
 
 def test_strategies(
@@ -279,3 +248,94 @@ def test_strategies(
         # a hacker rank like problem
         if len(set(fruit_values)) != 1 and all(fruit_values) > 0:
             assert results["most"][0] > results["fewest"][0]
+
+
+@pytest.mark.parametrize(
+    ("fruit_inventory", "raven_track", "strat", "expected_loss"),
+    [
+        # Losing needs five ravens before the fruit or the wild: (1/3)^5
+        ({3: 0, 4: 0, 5: 1, 6: 0}, 5, "most", 1 / 243),
+        ({3: 0, 4: 0, 5: 1, 6: 0}, 5, "random", 1 / 243),
+        ({3: 4, 4: 4, 5: 4, 6: 4}, 1, "most", 0.971),
+        ({3: 4, 4: 4, 5: 4, 6: 4}, 1, "fewest", None),
+    ],
+)
+def test_importance_sampling_extreme_states(
+    game_state_fixture: GameState,
+    fruit_inventory: Dict[int, int],
+    raven_track: int,
+    strat: Strategy,
+    expected_loss: float | None,
+) -> None:
+    """Importance sampling matches the solver on near-certain wins and losses."""
+    _set_state(game_state_fixture, fruit_inventory, raven_track)
+    solved = win_perc(
+        game_state_fixture.fruit_inventory.fruit_values, raven_track, strat
+    )
+    results = run_importance_sampling(game_state_fixture, 20000, strat, seed=0)
+    rare_prob, rare_std_err, solved_rare = (
+        (results.loss_prob, results.loss_std_err, solved[1])
+        if solved[1] < solved[0]
+        else (results.win_prob, results.win_std_err, solved[0])
+    )
+    if expected_loss is not None:
+        assert results.loss_prob == pytest.approx(expected_loss, rel=0.05)
+    # The solver rounds to 3 decimals, the rare estimate should be far tighter
+    assert rare_prob == pytest.approx(solved_rare, abs=0.0006 + 4 * rare_std_err)
+    assert rare_std_err < 0.05 * rare_prob
+    assert results.effective_sample_size > 1000
+
+
+def test_validation_catches_wrong_solver() -> None:
+    """The acceptance interval rejects a win probability that is off by 0.025."""
+    checks = validate_solver([((0, 1, 2, 3), 3)], ["most"], seed=1)
+    assert checks[0].passed
+    n_games, wins, solved = checks[0].n_games, checks[0].wins, checks[0].solved
+    for offset in (-0.025, 0.025):
+        low, high = binomial_acceptance(
+            n_games, solved + offset - 0.002, solved + offset + 0.002, 1e-5
+        )
+        assert not low <= wins <= high
+
+
+def test_profile_solver_counters() -> None:
+    """Profile counters add up for a cold solve and show only hits when warm."""
+    win_perc.cache_clear()
+    with profile_solver() as profile:
+        win_perc((0, 1, 2, 2), 3, "most")
+    # Every call other than the first is a child generated by an expansion
+    assert profile.calls == profile.children + 1
+    assert profile.cache_misses == profile.peak_table_size
+    assert sum(profile.depth_hist.values()) == profile.expansions
+    assert profile.depth_hist[0] == 1
+    # The deepest expanded state has one fruit and one raven space left
+    assert profile.max_depth == (0 + 1 + 2 + 2 - 1) + (3 - 1)
+    assert 0 < profile.successor_time < profile.total_time
+
+    with profile_solver() as warm:
+        win_perc((0, 1, 2, 2), 3, "most")
+    assert (warm.cache_hits, warm.cache_misses, warm.expansions) == (1, 0, 0)
+
+
+def test_profile_solver_not_nested() -> None:
+    """Only one solver profile can be active, and it is stopped on errors."""
+    with pytest.raises(ValueError):
+        with profile_solver():
+            with pytest.raises(RuntimeError):
+                with profile_solver():
+                    pass
+            raise ValueError("stop")
+    with profile_solver() as profile:
+        win_perc((1, 0, 0, 0), 1, "most")
+    assert profile.calls == profile.children + 1
+
+
+def test_wild_choice_odds() -> None:
+    """Every fruit left is a choice, with the odds of the state it leads to."""
+    odds = wild_choice_odds((2, 0, 1, 3), 2, "most")
+    assert odds == {
+        0: win_perc((1, 0, 1, 3), 2, "most")[0],
+        2: win_perc((2, 0, 0, 3), 2, "most")[0],
+        3: win_perc((2, 0, 1, 2), 2, "most")[0],
+    }
+    assert max(odds.values()) == odds[3]
@@ -1,10 +1,19 @@
 """Unit tests for the game logic of the Orchard game."""
 
-from typing import Dict
+import copy
+from typing import Dict, List
 
 import pytest
 
-from first_orchard_solver.gameplay.gamelogic import GameState
+from first_orchard_solver.gameplay.gamelogic import (
+    DieRolled,
+    FruitChanged,
+    GameEvent,
+    GameReset,
+    GameState,
+    RavenMoved,
+    UiStateChanged,
+)
 from first_orchard_solver.gameplay.gamesims import Strategy, _play_with_strat
 
 
@@ -138,3 +147,36 @@ def test_play_with_strat(game_state_fixture: GameState, strat: Strategy) -> None
         game_state_fixture.raven_track.spaces == 0
         or not game_state_fixture.fruit_inventory.check_not_zero()
     )
+
+
+def test_changes_are_announced(game_state_fixture: GameState) -> None:
+    """Mutators and UI attributes announce typed events, only when values change."""
+    events: List[GameEvent] = []
+    unsubscribe = game_state_fixture.subscribe(events.append)
+    game_state_fixture.orchard_die.die_result = 3
+    game_state_fixture.fruit_inventory.decrement_fruit(3)
+    game_state_fixture.raven_track.decrement_raven()
+    game_state_fixture.stats_flag = True
+    game_state_fixture.stats_flag = True
+    game_state_fixture.fruit_inventory.most_strat()
+    assert events == [
+        DieRolled(3),
+        FruitChanged(3, 3),
+        RavenMoved(4),
+        UiStateChanged("stats_flag", True),
+        FruitChanged(4, 3),
+    ]
+
+    events.clear()
+    _set_state(game_state_fixture, {3: 0, 4: 0, 5: 0, 6: 0}, 2)
+    game_state_fixture.fruit_inventory.decrement_fruit(3)
+    assert events == [RavenMoved(2)]
+    game_state_fixture.reset()
+    assert events[-1] == GameReset((4, 4, 4, 4, 5))
+
+    copied = copy.deepcopy(game_state_fixture)
+    copied.raven_track.decrement_raven()
+    unsubscribe()
+    game_state_fixture.raven_track.decrement_raven()
+    assert events[-1] == GameReset((4, 4, 4, 4, 5))
+    assert not copied.listeners
@@ -0,0 +1,67 @@
+"""Unit tests for the scripted mode of the text game."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from first_orchard_solver.gameplay.gameplay_text import (
+    coach_choice,
+    coach_script,
+    main,
+    parse_session,
+)
+from first_orchard_solver.gameplay.gamesolver import win_perc
+
+
+def test_parse_session() -> None:
+    """Rolls are die faces, with the fruit type taken written after a wild."""
+    assert parse_session(" 3 2:5\t1 6 ") == [(3, None), (2, 5), (1, None), (6, None)]
+    for line in ("7", "2", "3:4", "2:x", "raven"):
+        with pytest.raises(ValueError):
+            parse_session(line)
+
+
+def test_coach_choice_grades_against_every_choice() -> None:
+    """Each fruit type left is graded with the odds of the state it leads to."""
+    decision = coach_choice((2, 0, 1, 3), 2, 3)
+    assert set(decision.odds) == {3, 5, 6}
+    assert decision.player_win == win_perc((1, 0, 1, 3), 2, "most")[0]
+    assert decision.best_choice == 6
+    assert decision.regret == round(decision.best_win - decision.player_win, 3) > 0
+    assert coach_choice((2, 0, 1, 3), 2, 6).regret == 0
+    with pytest.raises(ValueError):
+        coach_choice((2, 0, 1, 3), 2, 4)
+
+
+def test_script_plays_every_session() -> None:
+    """Decisions follow the state of their own session, comments are skipped."""
+    script = ["# two sessions", "3 3 2:3 1 2:4", "", "2:6 1 1 1 1 1"]
+    decisions = list(coach_script(script))
+    assert [(d.session, d.roll, d.choice) for d in decisions] == [
+        (0, 2, 3),
+        (0, 4, 4),
+        (1, 0, 6),
+    ]
+    assert decisions[0].fruit == (2, 4, 4, 4) and decisions[0].raven == 5
+    assert decisions[1].fruit == (1, 4, 4, 4) and decisions[1].raven == 4
+    with pytest.raises(ValueError, match="Line 2"):
+        list(coach_script(["3", "1 1 1 1 1 3"]))
+
+
+def test_main_writes_jsonl(tmp_path: Path) -> None:
+    """The command line coaches a script file into one JSON line per decision."""
+    script = tmp_path / "games.txt"
+    script.write_text("2:3 2:3 2:3\n2:4\n")
+    output = tmp_path / "coaching.jsonl"
+    assert main(["--script", str(script), "--output", str(output)]) == 0
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [line["fruit"] for line in lines] == [
+        [4, 4, 4, 4],
+        [3, 4, 4, 4],
+        [2, 4, 4, 4],
+        [4, 4, 4, 4],
+    ]
+    assert lines[1]["regret"] > 0 and lines[1]["best_choice"] != 3
+    script.write_text("2:9\n")
+    assert main(["--script", str(script), "--output", str(output)]) == 1
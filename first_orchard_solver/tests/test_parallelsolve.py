@@ -0,0 +1,59 @@
+"""Unit tests for the wavefront-parallel solver."""
+
+import numpy as np
+import pytest
+
+from first_orchard_solver.gameplay import parallelsolve
+from first_orchard_solver.gameplay.gamelogic import RuleSet
+from first_orchard_solver.gameplay.parallelsolve import (
+    SharedArrays,
+    evaluate_policies_parallel,
+    expected_lengths_parallel,
+)
+from first_orchard_solver.gameplay.policyeval import (
+    evaluate_policies,
+    expected_lengths,
+    mix_policies,
+)
+
+RULES = RuleSet(fruit_types=3, fruit_per_type=5, raven_spaces=6)
+
+
+def test_pool_matches_serial_solver(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Every layer solved on the pool gives exactly the serial values."""
+    monkeypatch.setattr(parallelsolve, "PARALLEL_MIN_STATES", 0)
+    policies = mix_policies("most", "fewest", [0.0, 0.5, 1.0], RULES)
+    assert np.array_equal(
+        evaluate_policies_parallel(policies, RULES, workers=2),
+        evaluate_policies(policies, RULES),
+    )
+    assert np.array_equal(
+        expected_lengths_parallel(["random"], RULES, workers=3),
+        expected_lengths(["random"], RULES),
+    )
+
+
+def test_single_worker_solves_in_process() -> None:
+    """One worker, or only small layers, solve without any shared memory."""
+    assert np.array_equal(
+        evaluate_policies_parallel(["most"], workers=1), evaluate_policies(["most"])
+    )
+    assert np.array_equal(
+        evaluate_policies_parallel(["most"], workers=2), evaluate_policies(["most"])
+    )
+
+
+def test_shared_blocks_are_freed() -> None:
+    """Attached arrays see the owner's data, and closing unlinks every block."""
+    with SharedArrays() as shared:
+        shared.add("values", np.arange(6.0).reshape(2, 3))
+        arrays, blocks = SharedArrays.attach(shared.specs)
+        assert np.array_equal(arrays["values"], shared.arrays["values"])
+        arrays["values"][1, 2] = -1.0
+        assert shared.arrays["values"][1, 2] == -1.0
+        specs = dict(shared.specs)
+        del arrays
+        for block in blocks:
+            block.close()
+    with pytest.raises(FileNotFoundError):
+        SharedArrays.attach(specs)
@@ -0,0 +1,103 @@
+"""Unit tests for exact policy evaluation over every game state."""
+
+from itertools import product
+
+import numpy as np
+import pytest
+
+from first_orchard_solver.gameplay.gamelogic import RuleSet
+from first_orchard_solver.gameplay.gamesolver import win_perc
+from first_orchard_solver.gameplay.policyeval import (
+    evaluate_policies,
+    evaluate_policy,
+    evaluate_rule_sets,
+    expected_lengths,
+    expected_lengths_rule_sets,
+    favorite_color_policy,
+    mix_policies,
+    policy_table,
+)
+
+
+@pytest.mark.parametrize("strat", ["most", "fewest", "random"])
+def test_matches_recursive_solver(strat: str) -> None:
+    """Registered strategies evaluate to the recursive solver's (rounded) values."""
+    win_probs = evaluate_policy(strat)
+    for fruit_count in product(range(5), repeat=4):
+        for raven_track in range(6):
+            solved = win_perc(fruit_count, raven_track, strat)[0]
+            assert win_probs[(*fruit_count, raven_track)] == pytest.approx(
+                solved, abs=0.002
+            )
+
+
+def test_terminal_states() -> None:
+    """Empty orchards are wins and a raven at the end is a loss."""
+    win_probs = evaluate_policy("most")
+    assert win_probs[0, 0, 0, 0, 3] == 1.0
+    assert win_probs[4, 4, 4, 4, 0] == 0.0
+
+
+def test_mix_sweep_matches_single_evaluations() -> None:
+    """A batched sweep gives the same values as evaluating each mix on its own."""
+    favorite = favorite_color_policy(2)
+    probs = [0.0, 0.25, 1.0]
+    sweep = evaluate_policies(mix_policies(favorite, "most", probs))
+    assert np.allclose(sweep[0], evaluate_policy("most"))
+    assert np.allclose(sweep[2], evaluate_policy(favorite))
+    mixed = 0.25 * policy_table(favorite) + 0.75 * policy_table("most")
+    assert np.allclose(sweep[1], evaluate_policy(mixed))
+    start = sweep[:, 4, 4, 4, 4, 5]
+    assert start[0] > start[1] > start[2]
+
+
+def test_invalid_policy_rejected() -> None:
+    """Choosing a fruit with none left is an error."""
+
+    def always_first(counts, raven):
+        probs = np.zeros(counts.shape)
+        probs[:, 0] = 1.0
+        return probs
+
+    with pytest.raises(ValueError):
+        evaluate_policy(always_first)
+
+
+def test_other_rule_sets() -> None:
+    """Extra raven spaces raise the win rate, as in the README design example."""
+    longer_track = evaluate_policy("most", RuleSet(raven_spaces=6))
+    assert longer_track[4, 4, 4, 4, 6] == pytest.approx(0.769, abs=0.002)
+    one_fruit = evaluate_policy("most", RuleSet(fruit_types=1, fruit_per_type=1))
+    # One color, the raven and the wild: the fruit comes first 2 times in 3
+    assert one_fruit[1, 1] == pytest.approx(2 / 3)
+
+
+def test_expected_lengths() -> None:
+    """Finished games have no rolls left and every roll from the start is counted."""
+    lengths = expected_lengths(["most", "random"])
+    assert lengths[0, 0, 0, 0, 0, 3] == 0.0 and lengths[0, 4, 4, 4, 4, 0] == 0.0
+    # One fruit and one space left: the fruit, raven or wild side ends it in 3 of 6
+    assert lengths[:, 1, 0, 0, 0, 1] == pytest.approx(2.0)
+    assert lengths[0, 4, 4, 4, 4, 5] == pytest.approx(20.88, abs=0.01)
+
+
+def test_rule_sets_solve_like_single_rule_sets() -> None:
+    """A batched sweep gives every rule set exactly its own tables."""
+    rule_sets = [
+        RuleSet(3, fruit_per_type, raven_spaces, wild_faces)
+        for fruit_per_type, raven_spaces, wild_faces in product(
+            range(1, 4), range(1, 5), range(3)
+        )
+    ]
+    policies = ["most", "random"]
+    wins = evaluate_rule_sets(rule_sets, policies)
+    lengths = expected_lengths_rule_sets(rule_sets, policies)
+    for rules, win, length in zip(rule_sets, wins, lengths):
+        assert np.array_equal(win, evaluate_policies(policies, rules))
+        assert np.array_equal(length, expected_lengths(policies, rules))
+    # One fruit and one space: the fruit face and every wild win, the raven loses
+    for wild_faces in range(4):
+        (win,) = evaluate_rule_sets([RuleSet(1, 1, 1, wild_faces)])
+        assert win[0, 1, 1] == pytest.approx((1 + wild_faces) / (2 + wild_faces))
+    with pytest.raises(ValueError):
+        evaluate_rule_sets([RuleSet(3, 2, 2), RuleSet(4, 2, 2)])
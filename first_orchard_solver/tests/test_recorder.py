@@ -0,0 +1,85 @@
+"""Unit tests for recording and replaying simulated games."""
+
+from pathlib import Path
+
+import numpy as np
+
+from first_orchard_solver.gameplay.gamelogic import GameState
+from first_orchard_solver.gameplay.gamesims import _play_with_strat, run_batches
+from first_orchard_solver.gameplay.recorder import (
+    GameRecorder,
+    TrajectoryReader,
+    TrajectoryRecorder,
+    decode_event,
+    encode_event,
+)
+
+
+def test_encode_decode_event() -> None:
+    """An event byte round trips the die face and wild choice."""
+    for die_result in range(1, 7):
+        for choice in range(4):
+            assert decode_event(encode_event(die_result, choice)) == (
+                die_result,
+                choice,
+            )
+
+
+def test_scalar_game_replays(tmp_path: Path) -> None:
+    """A game recorded by _play_with_strat replays to the same final state."""
+    path = tmp_path / "games.bin"
+    with TrajectoryRecorder(path) as recorder:
+        final_states = [
+            _play_with_strat(GameState(), "random", recorder).game_status
+            for _ in range(20)
+        ]
+    reader = TrajectoryReader(path)
+    assert len(reader) == 20
+    for game, final_state in enumerate(final_states):
+        assert reader.replay(game)[-1] == final_state
+
+
+def test_batch_recording_filters_by_outcome(tmp_path: Path) -> None:
+    """Recorded batches match the simulation results and replay to their outcome."""
+    path = tmp_path / "games.bin"
+    with TrajectoryRecorder(path) as recorder:
+        batches = run_batches(GameState(), 200, 5, ["most"], seed=1, recorder=recorder)
+    reader = TrajectoryReader(path)
+    assert len(reader) == 1000
+    assert len(reader.filter(True)) == sum(batches.most_strat_runs)
+    for game in reader.filter(True)[:50]:
+        *fruit, raven = reader.replay(int(game))[-1]
+        assert sum(fruit) == 0 and raven > 0
+    for game in reader.filter(False)[:50]:
+        assert reader.replay(int(game))[-1][-1] == 0
+    assert reader.events.nbytes == int(np.sum(reader.index["length"]))
+
+
+def test_recording_appends(tmp_path: Path) -> None:
+    """Opening an existing recording appends games after the old ones."""
+    path = tmp_path / "games.bin"
+    for seed in range(2):
+        with TrajectoryRecorder(path) as recorder:
+            run_batches(GameState(), 10, 1, ["fewest"], seed=seed, recorder=recorder)
+    reader = TrajectoryReader(path)
+    assert len(reader) == 20
+    assert reader.index["offset"][10] == np.sum(reader.index["length"][:10])
+
+
+def test_game_recorder_matches_play_with_strat(tmp_path: Path) -> None:
+    """Games recorded from change events match the recording of _play_with_strat."""
+    with TrajectoryRecorder(tmp_path / "direct.bin") as direct:
+        with TrajectoryRecorder(tmp_path / "events.bin") as from_events:
+            game_state = GameState()
+            game_recorder = GameRecorder(from_events, game_state)
+            for _ in range(20):
+                game_state.reset()
+                _play_with_strat(game_state, "random", direct)
+            game_recorder.close()
+            game_state.reset()
+            _play_with_strat(game_state, "random", direct)
+    expected = TrajectoryReader(tmp_path / "direct.bin")
+    reader = TrajectoryReader(tmp_path / "events.bin")
+    assert len(expected) == 21 and len(reader) == 20
+    assert reader.index.tobytes() == expected.index[:20].tobytes()
+    assert reader.events.tobytes() == expected.events[: len(reader.events)].tobytes()
@@ -0,0 +1,76 @@
+"""Unit tests for the regret analysis of recorded games."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from first_orchard_solver.gameplay.gamelogic import GameState
+from first_orchard_solver.gameplay.gameplay_text import FIRST_FRUIT, coach_choice
+from first_orchard_solver.gameplay.gamesims import run_batches
+from first_orchard_solver.gameplay.recorder import (
+    TrajectoryReader,
+    TrajectoryRecorder,
+    decode_event,
+    encode_event,
+)
+from first_orchard_solver.gameplay.regret import analyze_regret, grade_decisions
+
+
+@pytest.fixture
+def reader(tmp_path: Path) -> TrajectoryReader:
+    """Record games of a random player, whose wild choices are often wrong."""
+    path = tmp_path / "games.bin"
+    with TrajectoryRecorder(path) as recorder:
+        run_batches(GameState(), 300, 1, ["random"], seed=7, recorder=recorder)
+    return TrajectoryReader(path)
+
+
+def test_decisions_match_coaching(reader: TrajectoryReader) -> None:
+    """Every wild choice is graded like coach_choice, up to its rounded odds."""
+    batches = list(grade_decisions(reader, chunk_games=64))
+    assert len(batches) == 5
+    checked = 0
+    for batch in batches:
+        for i in range(len(batch)):
+            game, roll = int(batch.game[i]), int(batch.roll[i])
+            state = reader.replay(game)[roll]
+            _, choice = decode_event(int(reader.game_events(game)[roll]))
+            assert state == (*batch.fruit[i], batch.raven[i])
+            assert choice == batch.choice[i]
+            decision = coach_choice(state[:-1], state[-1], choice + FIRST_FRUIT)
+            assert decision.player_win == pytest.approx(batch.chosen[i], abs=2e-3)
+            assert decision.best_win == pytest.approx(batch.best[i], abs=2e-3)
+            checked += 1
+    assert checked == int((np.asarray(reader.events) & 0b111 == 2).sum())
+
+
+def test_summary_sums_every_decision(reader: TrajectoryReader) -> None:
+    """Totals, state tables and state types all add up to the same decisions."""
+    summary = analyze_regret(reader, chunk_games=100)
+    regret = np.concatenate([batch.regret for batch in grade_decisions(reader)])
+    assert summary.games == 300 and summary.decisions == len(regret)
+    assert summary.mistakes == int((regret > 0).sum()) > 0
+    assert summary.total_regret == pytest.approx(regret.sum())
+    types = summary.by_state_type()
+    assert sum(n for n, _, _ in types.values()) == summary.decisions
+    assert all(list(fruit) == sorted(fruit) for fruit, _ in types)
+    worst = summary.worst_state_types(3)
+    assert worst[0][1] == max(lost for _, _, lost in types.values())
+
+    won = analyze_regret(reader, reader.filter(True))
+    lost = analyze_regret(reader, reader.filter(False))
+    assert won.decisions + lost.decisions == summary.decisions
+
+
+def test_best_play_has_no_regret(tmp_path: Path) -> None:
+    """Games played with the assumed strategy lose nothing, bad choices are caught."""
+    path = tmp_path / "games.bin"
+    with TrajectoryRecorder(path) as recorder:
+        run_batches(GameState(), 200, 1, ["most"], seed=1, recorder=recorder)
+        recorder.record_game((0, 1, 4, 4), 3, bytes([encode_event(2, 0)]), False)
+    reader = TrajectoryReader(path)
+    summary = analyze_regret(reader, range(200))
+    assert summary.decisions > 0 and summary.total_regret == summary.mistakes == 0
+    with pytest.raises(ValueError, match="Game 200"):
+        analyze_regret(reader)
@@ -0,0 +1,210 @@
+"""Unit tests for drawing the pygame screen, run on the SDL dummy video driver."""
+
+import copy
+import dataclasses
+import tracemalloc
+from typing import Any, List
+
+import pygame
+import pytest
+
+from first_orchard_solver.gameplay import eventhandler as eh
+from first_orchard_solver.gameplay import rend_dynamic as dyna
+from first_orchard_solver.gameplay.context import GameContext, init_game_context
+from first_orchard_solver.gameplay.gamesolver import win_perc_comp
+from first_orchard_solver.gameplay.textcache import TextCache
+
+
+@pytest.fixture
+def game_context() -> GameContext:
+    """Set up a headless game context."""
+    return init_game_context(headless=True)
+
+
+@pytest.fixture
+def updates(monkeypatch: pytest.MonkeyPatch) -> List[List[pygame.Rect]]:
+    """Record the rects of every display update instead of updating the display."""
+    calls: List[List[pygame.Rect]] = []
+    monkeypatch.setattr(pygame.display, "update", lambda rects: calls.append(rects))
+    return calls
+
+
+def test_idle_frames_not_drawn(
+    game_context: GameContext, updates: List[List[pygame.Rect]]
+) -> None:
+    """Frames with nothing changed do not touch the display."""
+    eh.draw_all_screen(game_context, None, None)
+    eh.draw_all_screen(game_context, None, None)
+    assert len(updates) == 1
+
+
+def test_only_changed_areas_updated(
+    game_context: GameContext, updates: List[List[pygame.Rect]]
+) -> None:
+    """A roll updates small areas and erases what the last frame drew."""
+    eh.draw_all_screen(game_context, None, None)
+    first_frame = list(game_context.dirty_rects)
+    game_context.game_state.orchard_die.die_result = 3
+    color = eh.die_results_color(game_context)
+    eh.draw_all_screen(game_context, color, None)
+    assert len(updates) == 2
+    for rect in first_frame:
+        assert rect in updates[1]
+    screen_area = game_context.screen.get_width() * game_context.screen.get_height()
+    assert sum(r.width * r.height for r in updates[1]) < screen_area / 4
+
+
+def test_change_redraws_only_its_parts(
+    game_context: GameContext,
+    updates: List[List[pygame.Rect]],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A raven move redraws the raven track and odds, not the fruit or the die."""
+    eh.draw_all_screen(game_context, None, None)
+    fruit_rects = game_context.part_rects["fruit"]
+
+    def not_drawn(*args: Any) -> None:
+        raise AssertionError("drawn without a change")
+
+    monkeypatch.setattr(dyna, "draw_fruit_circle_texts", not_drawn)
+    monkeypatch.setattr(dyna, "draw_die", not_drawn)
+    game_context.game_state.raven_track.decrement_raven()
+    eh.draw_all_screen(game_context, None, None)
+    assert len(updates) == 2
+    assert game_context.part_rects["raven"]
+    assert game_context.part_rects["fruit"] == fruit_rects
+    assert not set(map(tuple, fruit_rects)) & set(map(tuple, updates[1]))
+    game_context.game_state.fruit_click_enabled = True
+    eh.draw_all_screen(game_context, None, None)
+    assert len(updates) == 2
+
+
+def test_text_cache_evicts_least_recently_used(game_context: GameContext) -> None:
+    """Cached surfaces are reused, the least recently used one is evicted first."""
+    font = game_context.assets.ODDS_FONT
+    cache = TextCache(maxsize=2)
+    first = cache.render(font, "a", True, (0, 0, 0))
+    cache.render(font, "b", True, (0, 0, 0))
+    assert cache.render(font, "a", True, (0, 0, 0)) is first
+    cache.render(font, "c", True, (0, 0, 0))
+    assert len(cache) == 2 and cache.misses == 3 and cache.hits == 1
+    cache.render(font, "a", True, (0, 0, 0))
+    cache.render(font, "b", True, (0, 0, 0))
+    assert cache.misses == 4
+
+
+def test_text_cache_drops_volatile_text_on_state_change(
+    game_context: GameContext, updates: List[List[pygame.Rect]]
+) -> None:
+    """Redrawing the same state renders no text, a new state only drops its odds."""
+    cache = game_context.text_cache
+    eh.draw_all_screen(game_context, None, None)
+    rendered = cache.misses
+    game_context.screen_changes.mark_all()
+    eh.draw_all_screen(game_context, None, None)
+    assert cache.misses == rendered
+    game_context.game_state.raven_track.decrement_raven()
+    eh.draw_all_screen(game_context, None, None)
+    assert cache.misses == rendered + 1
+    assert len(cache) == rendered
+
+
+def test_restart_reuses_context(
+    game_context: GameContext, updates: List[List[pygame.Rect]]
+) -> None:
+    """Restarting resets the game in place and clears the raven track."""
+    assets = game_context.assets
+    game_state = game_context.game_state
+    font = assets.ODDS_FONT
+    for _ in range(5):
+        game_state.raven_track.decrement_raven()
+        eh.draw_all_screen(game_context, None, None)
+    raven_pos = assets.RECTANGLES.RECTANGLE_5.center
+    assert game_context.background.get_at(raven_pos) == pygame.Color(
+        assets.COLORS.BLACK
+    )
+    eh.restart_game(game_context)
+    assert game_context.game_state is game_state
+    assert game_state.game_status == (4, 4, 4, 4, 5)
+    assert game_context.assets.ODDS_FONT is font
+    assert game_context.background.get_at(raven_pos) == pygame.Color(
+        assets.COLORS.PURPLE
+    )
+    assert game_context.screen.get_at(raven_pos) == pygame.Color(assets.COLORS.PURPLE)
+
+
+def test_restart_memory_stays_flat(
+    game_context: GameContext, updates: List[List[pygame.Rect]]
+) -> None:
+    """Hundreds of restarts do not keep memory from the games before."""
+    game_state = game_context.game_state
+
+    def play_and_restart() -> None:
+        game_state.raven_track.spaces = 0
+        eh.draw_all_screen(game_context, None, None)
+        eh.restart_game(game_context)
+        eh.draw_all_screen(game_context, None, None)
+        updates.clear()
+
+    for _ in range(20):
+        play_and_restart()
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        for _ in range(300):
+            play_and_restart()
+        growth = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+    assert growth < 16 * 1024
+
+
+@pytest.mark.parametrize(
+    "fruit, raven, choice",
+    [((4, 3, 2, 4), 3, 5), ((4, 3, 2, 4), 3, 3), ((2, 2, 0, 2), 1, 4)],
+)
+def test_click_uses_odds_solved_on_wild(
+    game_context: GameContext,
+    monkeypatch: pytest.MonkeyPatch,
+    fruit: List[int],
+    raven: int,
+    choice: int,
+) -> None:
+    """The odds solved on the wild roll give the same coaching without solving."""
+    game_state = game_context.game_state
+    for fruit_id, count in zip(game_state.fruit_inventory.fruit_inventory, fruit):
+        game_state.fruit_inventory.fruit_inventory[fruit_id] = count
+    game_state.raven_track.spaces = raven
+    game_state.orchard_die.die_result = 2
+    eh.apply_die_result(game_context)
+    assert set(game_state.wild_odds) == {
+        fruit_id for fruit_id, count in zip(range(3, 7), fruit) if count > 0
+    }
+
+    optimal = copy.deepcopy(game_state)
+    optimal.fruit_inventory.most_strat()
+    game_state.fruit_inventory.decrement_fruit(choice)
+    expected = win_perc_comp(game_state, optimal)
+
+    def no_solving(*args: Any) -> None:
+        raise AssertionError("solved on click")
+
+    monkeypatch.setattr(dyna, "wild_choice_odds", no_solving)
+    odds_result = dyna.get_compare_odds(game_context, choice)
+    assert odds_result is not None and odds_result[:3] == expected
+
+
+def test_wild_odds_shown_beside_circles(
+    game_context: GameContext, updates: List[List[pygame.Rect]]
+) -> None:
+    """With the option on, a wild roll draws the odds of every choice."""
+    game_state = game_context.game_state
+    game_state.orchard_die.die_result = 2
+    eh.apply_die_result(game_context)
+    eh.draw_all_screen(game_context, None, None)
+    hidden = len(game_context.dirty_rects)
+    options = dataclasses.replace(game_context.assets.OPTIONS, SHOW_WILD_ODDS=True)
+    game_context.assets = dataclasses.replace(game_context.assets, OPTIONS=options)
+    game_context.screen_changes.mark_all()
+    eh.draw_all_screen(game_context, None, None)
+    assert len(game_context.dirty_rects) == hidden + 4
@@ -0,0 +1,80 @@
+"""Unit tests for the SQLite result store."""
+
+from pathlib import Path
+
+import numpy as np
+
+from first_orchard_solver.gameplay.gamelogic import GameState, RuleSet
+from first_orchard_solver.gameplay.gamesims import run_batches
+from first_orchard_solver.gameplay.gamesolver import win_perc, win_perc_stored
+from first_orchard_solver.gameplay.resultstore import (
+    ResultStore,
+    SolveRecord,
+    code_version,
+)
+
+
+def test_solves_stored_in_bulk(tmp_path: Path) -> None:
+    """A stored solve saves every smaller state and survives reopening the store."""
+    path = tmp_path / "results.db"
+    with ResultStore(path) as store:
+        result = win_perc_stored((1, 2, 0, 1), 2, "most", store)
+        assert result == win_perc((1, 2, 0, 1), 2, "most")
+        assert len(store.query_solves(strat="most")) == 2 * 3 * 1 * 2 * 3
+    with ResultStore(path) as store:
+        assert store.get_solve((1, 2, 0, 1), 2, "most") == result
+        assert store.get_solve((0, 1, 0, 1), 1, "most") == win_perc(
+            (0, 1, 0, 1), 1, "most"
+        )
+        assert store.get_solve((1, 2, 0, 1), 2, "fewest") is None
+
+
+def test_query_filters_by_rules_and_version() -> None:
+    """Rows of other rule sets or code versions are only returned when asked for."""
+    with ResultStore() as store:
+        store.put_solves(
+            [
+                SolveRecord((1, 0, 0), 1, "most", 0.5, 0.5, RuleSet(3, 1, 1)),
+                SolveRecord((1, 0, 0, 0), 1, "most", 0.667, 0.333),
+                SolveRecord((1, 0, 0, 0), 1, "most", 0.6, 0.4, code_version="old"),
+            ]
+        )
+        assert [r.win for r in store.query_solves()] == [0.667]
+        assert [r.win for r in store.query_solves(rules=RuleSet(3, 1, 1))] == [0.5]
+        assert len(store.query_solves(rules=None, version=None)) == 3
+        assert store.query_solves(version="old")[0].code_version == "old"
+    assert len(code_version()) == 12
+
+
+def test_wild_faces_get_their_own_rows() -> None:
+    """Rule sets that only differ in wild faces are stored and queried separately."""
+    with ResultStore() as store:
+        store.put_solves(
+            [
+                SolveRecord((1, 0, 0, 0), 1, "most", 0.6, 0.4),
+                SolveRecord((1, 0, 0, 0), 1, "most", 0.75, 0.25, RuleSet(wild_faces=2)),
+            ]
+        )
+        assert store.get_solve((1, 0, 0, 0), 1, "most") == (0.6, 0.4)
+        wild = store.get_solve((1, 0, 0, 0), 1, "most", RuleSet(wild_faces=2))
+        assert wild == (0.75, 0.25)
+        assert len(store.query_solves(rules=None)) == 2
+
+
+def test_run_batches_uses_store() -> None:
+    """A seeded run is stored and returned unchanged, unseeded runs are not stored."""
+    with ResultStore() as store:
+        first = run_batches(GameState(), 100, 5, None, seed=4, store=store)
+        assert len(store.query_simulations(seed=4)) == 3
+        second = run_batches(GameState(), 100, 5, None, seed=4, store=store)
+        assert second.strat_runs == first.strat_runs
+        for strat in first.strat_runs:
+            assert np.array_equal(
+                second.stats(strat).length_hist, first.stats(strat).length_hist
+            )
+        run_batches(GameState(), 100, 5, ["most"], seed=None, store=store)
+        assert len(store.query_simulations()) == 3
+        record = store.get_simulation((4, 4, 4, 4), 5, "most", 4, 100, 5)
+        assert record is not None
+        assert record.n_times == 5
+        assert record.batch_wins == tuple(first.most_strat_runs)
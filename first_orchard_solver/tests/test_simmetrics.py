@@ -0,0 +1,79 @@
+"""Unit tests for simulation throughput metrics and progress reporting."""
+
+import json
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from first_orchard_solver.gameplay import gamesims
+from first_orchard_solver.gameplay.gamelogic import GameState
+from first_orchard_solver.gameplay.gamesims import run_batches
+from first_orchard_solver.gameplay.simmetrics import SimulationMetrics
+from first_orchard_solver.gameplay.validation import (
+    canonical_states,
+    simulate_win_counts,
+)
+
+
+def test_run_batches_reports_progress(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Progress is reported per chunk and the final metrics are dumped as JSON."""
+    monkeypatch.setattr(gamesims, "CHUNK_GAMES", 1000)
+    updates: List[int] = []
+    path = tmp_path / "metrics.json"
+    batches = run_batches(
+        GameState(),
+        200,
+        20,
+        ["most", "fewest"],
+        seed=0,
+        progress=lambda metrics: updates.append(metrics.games_done),
+        metrics_path=path,
+    )
+    # 4 chunks of 5 batches per strategy, then the final report
+    assert updates == [1000, 2000, 3000, 4000, 5000, 6000, 7000, 8000, 8000]
+    metrics = batches.metrics
+    assert metrics is not None and metrics.finished
+    assert metrics.fraction_done == 1.0 and metrics.eta == 0.0
+    assert metrics.rolls_done == sum(
+        batches.stats(s).mean_length * 4000 for s in ("most", "fewest")
+    )
+    assert metrics.games_per_sec > 0 and metrics.rolls_per_sec > 0
+    assert 0 < metrics.worker_utilization["main"] <= 1
+    assert json.loads(path.read_text())["games_done"] == 8000
+
+
+def test_chunking_keeps_results_reproducible(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Chunked runs count every game, with the same seed giving the same results."""
+    monkeypatch.setattr(gamesims, "CHUNK_GAMES", 300)
+    first = run_batches(GameState(), 100, 10, ["random"], seed=2)
+    second = run_batches(GameState(), 100, 10, ["random"], seed=2)
+    assert first.random_strat_runs == second.random_strat_runs
+    assert first.stats("random").n_games == 1000
+
+
+@pytest.mark.parametrize("n_runs", [0, -5])
+def test_run_batches_needs_games(n_runs: int) -> None:
+    """Batches of no games, or a negative number, raise a ValueError."""
+    with pytest.raises(ValueError, match="n_runs"):
+        run_batches(GameState(), n_runs, 10, ["most"])
+
+
+def test_metrics_eta() -> None:
+    """The ETA extrapolates the current rate to the games left."""
+    metrics = SimulationMetrics(total_games=1000, games_done=250, elapsed=2.0)
+    assert metrics.eta == pytest.approx(6.0)
+    assert SimulationMetrics(total_games=1000).eta is None
+
+
+def test_sharded_simulation_reports_workers() -> None:
+    """Every worker process shows up in the utilization of a sharded simulation."""
+    reports: List[SimulationMetrics] = []
+    scenarios = canonical_states()[:16]
+    simulate_win_counts(scenarios, ["most"], 500, workers=2, progress=reports.append)
+    final = reports[-1]
+    assert final.finished and final.games_done == 16 * 500
+    assert 1 <= len(final.worker_utilization) <= 2
+    assert len(reports) == 16 + 1
@@ -0,0 +1,57 @@
+"""Unit tests for the dense ranks of canonical states."""
+
+from itertools import product
+
+import numpy as np
+import pytest
+
+from first_orchard_solver.gameplay.gamelogic import RuleSet
+from first_orchard_solver.gameplay.policyeval import state_grid
+from first_orchard_solver.gameplay.stateindex import CanonicalIndex, canonical_index
+from first_orchard_solver.gameplay.validation import canonical_states
+
+
+@pytest.mark.parametrize(
+    "rules", [RuleSet(), RuleSet(3, 2, 3), RuleSet(1, 5, 2), RuleSet(6, 3, 4)]
+)
+def test_ranks_are_dense_and_invertible(rules: RuleSet) -> None:
+    """Every state ranks like its fruit in any order, and ranks unrank back."""
+    index = CanonicalIndex(rules)
+    fruit, raven = index.states()
+    assert len(raven) == index.size
+    assert (np.diff(fruit, axis=1) >= 0).all()
+    assert np.array_equal(index.rank(fruit, raven), np.arange(index.size))
+
+    counts, spaces = state_grid(rules)
+    ranks = index.rank(counts, spaces)
+    assert len(np.unique(ranks)) == index.size
+    canonical, canonical_raven = index.unrank(ranks)
+    assert np.array_equal(canonical, np.sort(counts, axis=1))
+    assert np.array_equal(canonical_raven, spaces)
+    entries = index.table_index(ranks)
+    assert np.array_equal(np.sort(counts[entries], axis=1), canonical)
+
+
+def test_base_game_matches_canonical_states() -> None:
+    """The 350 canonical states in play have distinct ranks of the base index."""
+    index = canonical_index()
+    assert index is canonical_index() and index.size == 70 * 6
+    fruit = [state[0] for state in canonical_states()]
+    raven = [state[1] for state in canonical_states()]
+    ranks = index.rank(fruit, raven)
+    assert len(set(ranks.tolist())) == 350
+    assert index.rank((4, 0, 1, 4), 3) == index.rank((0, 1, 4, 4), 3)
+    for scalar in product(range(5), repeat=4):
+        assert index.unrank(index.rank(scalar, 1))[0].tolist() == sorted(scalar)
+
+
+def test_out_of_range_states_rejected() -> None:
+    """Fruit counts, raven spaces and ranks outside the rule set are errors."""
+    index = canonical_index()
+    for fruit, raven in [((5, 0, 0, 0), 1), ((0, 0, 0, -1), 1), ((1, 1, 1, 1), 6)]:
+        with pytest.raises(ValueError):
+            index.rank(fruit, raven)
+    with pytest.raises(ValueError):
+        index.rank((1, 1, 1), 1)
+    with pytest.raises(ValueError):
+        index.unrank(index.size)
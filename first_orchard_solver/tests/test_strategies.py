@@ -0,0 +1,130 @@
+"""Unit tests for the strategy registry and the vectorized simulator."""
+
+from itertools import product
+from typing import Dict
+
+import numpy as np
+import pytest
+
+from first_orchard_solver.gameplay import strategies
+from first_orchard_solver.gameplay.gamelogic import FruitInventory, GameState
+from first_orchard_solver.gameplay.gamesims import GameStats, run_batches
+from first_orchard_solver.gameplay.gamesolver import win_perc
+from first_orchard_solver.gameplay.strategies import (
+    StrategySpec,
+    available_strategies,
+    get_strategy,
+    register_strategy,
+)
+from first_orchard_solver.tests.test_gamelogic import _set_inventory, _set_state
+
+
+@pytest.fixture
+def game_state_fixture() -> GameState:
+    """Set up a fresh GameState for testing."""
+    return GameState()
+
+
+@pytest.fixture
+def last_fruit_strat():
+    """Register a throwaway strategy and remove it after the test."""
+
+    def scalar(fruit_inventory: FruitInventory) -> None:
+        keys = [k for k, v in fruit_inventory.fruit_inventory.items() if v > 0]
+        fruit_inventory.fruit_inventory[keys[-1]] -= 1
+
+    def vectorized(counts, rng):
+        return counts.shape[1] - 1 - np.argmax(counts[:, ::-1] > 0, axis=1)
+
+    yield register_strategy("last", scalar, vectorized)
+    del strategies._REGISTRY["last"]
+
+
+def test_builtin_strategies_registered() -> None:
+    """Fewest, most and random are registered in that order."""
+    assert available_strategies()[:3] == ("fewest", "most", "random")
+
+
+def test_unknown_strategy() -> None:
+    """Looking up an unregistered strategy raises a ValueError."""
+    with pytest.raises(ValueError):
+        get_strategy("favorite")
+
+
+def test_duplicate_registration() -> None:
+    """A strategy can only be registered twice if replace is set."""
+    spec = get_strategy("most")
+    with pytest.raises(ValueError):
+        register_strategy("most", spec.scalar, spec.vectorized)
+
+
+@pytest.mark.parametrize("strat", ["fewest", "most"])
+def test_vectorized_matches_scalar(game_state_fixture: GameState, strat: str) -> None:
+    """Deterministic vectorized strategies choose the same fruit as the scalar ones."""
+    spec = get_strategy(strat)
+    states = [s for s in product(range(5), repeat=4) if any(s)]
+    choices = spec.vectorized(np.array(states, dtype=np.int64), np.random.default_rng())
+    for state, choice in zip(states, choices):
+        fruit_inventory: Dict[int, int] = {k + 3: v for k, v in enumerate(state)}
+        _set_inventory(game_state_fixture, fruit_inventory)
+        spec.scalar(game_state_fixture.fruit_inventory)
+        expected = dict(fruit_inventory)
+        expected[int(choice) + 3] -= 1
+        assert game_state_fixture.fruit_inventory.fruit_inventory == expected
+
+
+def test_random_vectorized_only_non_empty() -> None:
+    """The random strategy never chooses an empty fruit and covers every other."""
+    counts = np.tile(np.array([0, 2, 0, 1], dtype=np.int64), (1000, 1))
+    choices = get_strategy("random").vectorized(counts, np.random.default_rng(0))
+    assert set(choices.tolist()) == {1, 3}
+
+
+def test_run_batches_seeded(game_state_fixture: GameState) -> None:
+    """The same seed gives the same batch results."""
+    first = run_batches(game_state_fixture, 50, 4, None, seed=7)
+    second = run_batches(game_state_fixture, 50, 4, None, seed=7)
+    assert first.strat_runs == second.strat_runs
+    assert len(first.most_strat_runs) == 4
+
+
+def test_registered_strategy_picked_up(
+    game_state_fixture: GameState, last_fruit_strat: StrategySpec
+) -> None:
+    """A newly registered strategy is usable by run_batches and win_perc."""
+    _set_state(game_state_fixture, {3: 0, 4: 0, 5: 0, 6: 2}, 2)
+    batches = run_batches(game_state_fixture, 1000, 10, ["last"], seed=3)
+    solved = win_perc((0, 0, 0, 2), 2, "last")
+    assert solved[0] == pytest.approx(0.741, abs=0.001)
+    assert np.mean(batches.runs("last")) / 1000 == pytest.approx(solved[0], abs=0.03)
+
+
+def test_game_stats_match_results(game_state_fixture: GameState) -> None:
+    """Histograms count every game and agree with the win counts."""
+    batches = run_batches(game_state_fixture, 100, 10, ["most"], seed=5)
+    stats = batches.stats("most")
+    wins = sum(batches.most_strat_runs)
+    assert stats.n_games == 1000
+    assert stats.raven_at_win_hist.sum() == wins
+    assert stats.raven_at_win_hist[0] == 0
+    assert stats.fruit_at_loss_hist.sum() == 1000 - wins
+    assert stats.wild_rolls_hist.sum() == 1000
+    # Every game needs at least one roll per fruit or raven space
+    assert stats.length_hist[:5].sum() == 0
+    assert stats.mean_length > 16 * 0.5
+
+
+def test_game_stats_merge(game_state_fixture: GameState) -> None:
+    """Merging stats from separate runs gives the same counts as one run."""
+    first = run_batches(game_state_fixture, 100, 2, ["fewest"], seed=1)
+    second = run_batches(game_state_fixture, 100, 3, ["fewest"], seed=2)
+    merged = GameStats()
+    merged.merge(first.stats("fewest"))
+    merged.merge(second.stats("fewest"))
+    assert merged.n_games == 500
+    assert np.array_equal(
+        merged.wild_rolls_hist,
+        first.stats("fewest").wild_rolls_hist + second.stats("fewest").wild_rolls_hist,
+    )
+    with pytest.raises(ValueError):
+        merged.merge(GameStats(max_length=10))
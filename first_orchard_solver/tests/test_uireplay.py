@@ -0,0 +1,81 @@
+"""Unit tests for replaying scripted games through the headless UI."""
+
+from pathlib import Path
+
+import pytest
+
+from first_orchard_solver.gameplay.context import GameContext, init_game_context
+from first_orchard_solver.gameplay.gamelogic import GameState
+from first_orchard_solver.gameplay.gamesims import run_batches
+from first_orchard_solver.gameplay.recorder import (
+    GameRecorder,
+    TrajectoryReader,
+    TrajectoryRecorder,
+)
+from first_orchard_solver.gameplay.uireplay import (
+    FrameStats,
+    play_recording,
+    play_script,
+)
+
+
+@pytest.fixture
+def game_context() -> GameContext:
+    """Set up a headless game context."""
+    return init_game_context(headless=True)
+
+
+def test_script_drives_event_handlers(game_context: GameContext) -> None:
+    """Rolls and wild clicks change the game like a player would, one frame each."""
+    script = [(3, 0), (2, 1), (1, 0), (6, 0)]
+    stats = play_script(game_context, script, fruit=(1, 2, 1, 1), raven=2)
+    game_state = game_context.game_state
+    assert game_state.game_status == (0, 1, 1, 0, 1)
+    assert game_state.stats_flag is False
+    assert stats.games == 1 and stats.frames == 1 + len(script) + 1
+    assert all(t > 0 for t in stats.frame_times)
+
+
+def test_replay_stops_at_game_over(game_context: GameContext) -> None:
+    """Events after the end of the game are ignored and the end screen is drawn."""
+    stats = play_script(
+        game_context, [(1, 0), (1, 0), (3, 0)], fruit=(1, 1, 1, 1), raven=1
+    )
+    assert game_context.game_state.is_game_over()
+    assert stats.frames == 2
+    screen_rect = game_context.screen.get_rect()
+    assert screen_rect in game_context.dirty_rects
+
+
+def test_recorded_games_replay_to_recorded_end(
+    tmp_path: Path, game_context: GameContext
+) -> None:
+    """Replaying recorded games ends each one in the state the recording ended in."""
+    path = tmp_path / "games.bin"
+    with TrajectoryRecorder(path) as recorder:
+        run_batches(GameState(), 5, 1, ["fewest"], seed=3, recorder=recorder)
+    reader = TrajectoryReader(path)
+    total = FrameStats()
+    for game in range(len(reader)):
+        stats = play_recording(game_context, reader, [game])
+        assert game_context.game_state.game_status == reader.replay(game)[-1]
+        total.merge(stats)
+    assert total.games == 5
+    summary = total.as_dict()
+    assert summary["frames"] > 5 and summary["p50_ms"] <= summary["max_ms"]
+
+
+def test_replayed_games_record_the_same(
+    tmp_path: Path, game_context: GameContext
+) -> None:
+    """Recording the UI from its change events gives back the replayed recording."""
+    path = tmp_path / "games.bin"
+    with TrajectoryRecorder(path) as recorder:
+        run_batches(GameState(), 20, 1, ["random"], seed=5, recorder=recorder)
+    reader = TrajectoryReader(path)
+    with TrajectoryRecorder(tmp_path / "ui.bin") as recorder:
+        GameRecorder(recorder, game_context.game_state)
+        play_recording(game_context, reader)
+    replayed = TrajectoryReader(tmp_path / "ui.bin")
+    assert replayed.index.tobytes() == reader.index.tobytes()
+    assert replayed.events.tobytes() == reader.events.tobytes()
@@ -0,0 +1,93 @@
+"""Unit tests for the vectorized Orchard environment."""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pytest
+
+from first_orchard_solver.gameplay.gamelogic import GameState, RuleSet
+from first_orchard_solver.gameplay.gamesims import _play_with_strat
+from first_orchard_solver.gameplay.policyeval import evaluate_policies
+from first_orchard_solver.gameplay.strategies import get_strategy
+from first_orchard_solver.gameplay.vecenv import OrchardVecEnv
+
+
+def test_matches_play_with_strat(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The first game of every env plays out like _play_with_strat on its rolls."""
+    env, rng = OrchardVecEnv(seed=3), np.random.default_rng(0)
+    most = get_strategy("most").vectorized
+    observation = env.reset(300)
+    faces: List[List[int]] = [[] for _ in range(300)]
+    finished: Dict[int, Tuple[Tuple[int, ...], int, bool]] = {}
+    while len(finished) < 300:
+        for i in set(range(300)) - set(finished):
+            faces[i].append(int(observation.die[i]))
+        result = env.step(most(observation.fruit, rng))
+        for i in np.flatnonzero(result.done).tolist():
+            if i not in finished:
+                state = (*result.final_fruit[i], result.final_raven[i])
+                finished[i] = (
+                    state,
+                    int(result.episode_length[i]),
+                    bool(result.reward[i]),
+                )
+        observation = result.observation
+
+    for i, (state, length, won) in finished.items():
+        assert len(faces[i]) == length
+        game_state = GameState()
+        monkeypatch.setattr(game_state.orchard_die, "roll", iter(faces[i]).__next__)
+        game_state = _play_with_strat(game_state, "most")
+        assert game_state.game_status == state
+        assert (game_state.raven_track.spaces > 0) == won
+
+
+def test_auto_reset_and_seed() -> None:
+    """Ended games restart from the start state, and a seed replays the same rolls."""
+    env = OrchardVecEnv(seed=5)
+    first = env.reset(1000)
+    assert first.fruit.shape == (1000, 4) and (first.raven == 5).all()
+    observation, ended = first, 0
+    for _ in range(40):
+        result = env.step(np.argmax(observation.fruit, axis=1))
+        observation = result.observation
+        assert (observation.fruit[result.done] == 4).all()
+        assert (observation.raven[result.done] == 5).all()
+        assert (result.reward == (result.final_fruit.sum(axis=1) == 0)).all()
+        assert (result.episode_length[~result.done] == 0).all()
+        assert (result.episode_length[result.done] >= 5).all()
+        ended += int(result.done.sum())
+    assert ended > 0
+
+    other = OrchardVecEnv(seed=1)
+    assert (other.reset(1000, seed=5).die == first.die).all()
+    assert other.reset().die.shape == (1000,)
+    assert other.reset(10).fruit.shape == (10, 4)
+
+
+def test_invalid_actions() -> None:
+    """Actions need one column per env, and a wild must take fruit that is left."""
+    env = OrchardVecEnv(seed=0)
+    observation = env.reset(50)
+    with pytest.raises(ValueError, match="Expected 50 actions"):
+        env.step(np.zeros(49, dtype=np.int64))
+    with pytest.raises(ValueError, match="fruit left"):
+        env.step(np.full(50, 4))
+    env.step(np.zeros(50, dtype=np.int64))
+    assert observation.wild.any()
+
+
+@pytest.mark.parametrize("rules", [RuleSet(), RuleSet(3, 3, 4, 2)])
+def test_win_rate_matches_solver(rules: RuleSet) -> None:
+    """The share of games won agrees with the exact win probability."""
+    env, rng = OrchardVecEnv(rules, seed=11), np.random.default_rng(0)
+    most = get_strategy("most").vectorized
+    observation = env.reset(20_000)
+    wins = games = 0
+    for _ in range(150):
+        result = env.step(most(observation.fruit, rng))
+        wins += int(result.reward.sum())
+        games += int(result.done.sum())
+        observation = result.observation
+    exact = evaluate_policies(["most"], rules)[(0, *rules.start)]
+    assert wins / games == pytest.approx(exact, abs=0.01)